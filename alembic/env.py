@@ -8,14 +8,19 @@ from sqlalchemy import pool
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import SQLModel
 
+from src.core.settings import settings
 from src.models.authors import Author
 from src.models.books import Book, BookTagLink
 from src.models.cabinets import Cabinet
+from src.models.jobs import Job
 from src.models.shelves import Shelf
+from src.models.table_versions import TableVersion
 from src.models.tags import Tag
 
 target_metadata = SQLModel.metadata
 config = context.config
+# URL базы берётся из настроек приложения (DATABASE_URL, .env); % экранируется для configparser
+config.set_main_option("sqlalchemy.url", settings.database_url.replace("%", "%%"))
 fileConfig(config.config_file_name)
 
 
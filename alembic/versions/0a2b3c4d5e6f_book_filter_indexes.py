@@ -0,0 +1,25 @@
+"""index for /books tag filter: book_tag.tag_id
+
+Revision ID: 0a2b3c4d5e6f
+Revises: f9a1b2c3d4e5
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0a2b3c4d5e6f"
+down_revision: Union[str, Sequence[str], None] = "f9a1b2c3d4e5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ix_book_author_id создан в b9aa06eecfe0, ix_book_shelf_id и ix_shelf_cabinet_id — в b5e7f8a9c0d1 и c6d8e9f0a1b2.
+    op.create_index("ix_book_tag_tag_id", "book_tag", ["tag_id", "book_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_book_tag_tag_id", table_name="book_tag")
@@ -0,0 +1,59 @@
+"""table_version: per-table change counters maintained by statement triggers (ETag)
+
+Revision ID: 1b3c4d5e6f70
+Revises: 0a2b3c4d5e6f
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "1b3c4d5e6f70"
+down_revision: Union[str, Sequence[str], None] = "0a2b3c4d5e6f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+VERSIONED_TABLES = ("author", "book", "book_tag", "cabinet", "shelf", "tag")
+
+# Триггер уровня инструкции (FOR EACH STATEMENT): массовые изменения увеличивают счётчик один раз.
+BUMP_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE table_version SET version = version + 1 WHERE name = TG_TABLE_NAME;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "table_version",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.execute(
+        "INSERT INTO table_version (name, version) VALUES "
+        + ", ".join(f"('{table}', 0)" for table in VERSIONED_TABLES)
+    )
+    op.execute(BUMP_FUNCTION)
+    for table in VERSIONED_TABLES:
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_bump_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()
+            """
+        )
+
+
+def downgrade() -> None:
+    for table in VERSIONED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_bump_version ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_table_version()")
+    op.drop_table("table_version")
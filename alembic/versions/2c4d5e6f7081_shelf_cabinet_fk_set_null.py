@@ -0,0 +1,28 @@
+"""shelf.cabinet_id: ON DELETE SET NULL (удаление шкафа одним DELETE)
+
+Revision ID: 2c4d5e6f7081
+Revises: 1b3c4d5e6f70
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "2c4d5e6f7081"
+down_revision: Union[str, Sequence[str], None] = "1b3c4d5e6f70"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_constraint("fk_shelf_cabinet_id", "shelf", type_="foreignkey")
+    op.create_foreign_key(
+        "fk_shelf_cabinet_id", "shelf", "cabinet", ["cabinet_id"], ["id"], ondelete="SET NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("fk_shelf_cabinet_id", "shelf", type_="foreignkey")
+    op.create_foreign_key("fk_shelf_cabinet_id", "shelf", "cabinet", ["cabinet_id"], ["id"])
@@ -0,0 +1,24 @@
+"""index on book.cover_path (cover reference lookups for garbage collection)
+
+Revision ID: 3d5e6f708192
+Revises: 2c4d5e6f7081
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "3d5e6f708192"
+down_revision: Union[str, Sequence[str], None] = "2c4d5e6f7081"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_book_cover_path"), "book", ["cover_path"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_book_cover_path"), table_name="book")
@@ -0,0 +1,56 @@
+"""job: background job queue (claimed with FOR UPDATE SKIP LOCKED)
+
+Revision ID: 4e6f708192a3
+Revises: 3d5e6f708192
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "4e6f708192a3"
+down_revision: Union[str, Sequence[str], None] = "3d5e6f708192"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column("key", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("run_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # Частичные индексы: выполненные задачи удаляются, упавшие (failed) в выборку готовых не попадают
+    op.create_index(
+        "ix_job_ready",
+        "job",
+        ["run_at"],
+        unique=False,
+        postgresql_where=sa.text("status IN ('queued', 'running')"),
+    )
+    op.create_index(
+        "ux_job_queued_key",
+        "job",
+        ["key"],
+        unique=True,
+        postgresql_where=sa.text("status = 'queued'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_job_queued_key", table_name="job")
+    op.drop_index("ix_job_ready", table_name="job")
+    op.drop_table("job")
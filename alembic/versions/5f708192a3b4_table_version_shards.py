@@ -0,0 +1,71 @@
+"""table_version: split each counter into per-connection shards (no single hot row)
+
+Revision ID: 5f708192a3b4
+Revises: 4e6f708192a3
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "5f708192a3b4"
+down_revision: Union[str, Sequence[str], None] = "4e6f708192a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SHARDS = 64
+
+# Соединение (backend) всегда увеличивает одну и ту же строку: длинная транзакция импорта
+# или массового изменения блокирует только её, а не счётчик таблицы целиком.
+SHARDED_BUMP_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE table_version SET version = version + 1
+    WHERE name = TG_TABLE_NAME AND shard = pg_backend_pid() % {SHARDS};
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+BUMP_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE table_version SET version = version + 1 WHERE name = TG_TABLE_NAME;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    op.add_column("table_version", sa.Column("shard", sa.SmallInteger(), nullable=False, server_default="0"))
+    op.drop_constraint("table_version_pkey", "table_version", type_="primary")
+    op.create_primary_key("table_version_pkey", "table_version", ["name", "shard"])
+    # Текущее значение остаётся в строке 0, остальные начинают с нуля: сумма не меняется
+    op.execute(
+        f"""
+        INSERT INTO table_version (name, shard, version)
+        SELECT name, shard, 0 FROM table_version, generate_series(1, {SHARDS - 1}) AS shard
+        WHERE table_version.shard = 0
+        """
+    )
+    op.execute(SHARDED_BUMP_FUNCTION)
+
+
+def downgrade() -> None:
+    op.execute(BUMP_FUNCTION)
+    op.execute(
+        """
+        UPDATE table_version AS t SET version = s.total
+        FROM (SELECT name, sum(version) AS total FROM table_version GROUP BY name) AS s
+        WHERE t.name = s.name AND t.shard = 0
+        """
+    )
+    op.execute("DELETE FROM table_version WHERE shard <> 0")
+    op.drop_constraint("table_version_pkey", "table_version", type_="primary")
+    op.create_primary_key("table_version_pkey", "table_version", ["name"])
+    op.drop_column("table_version", "shard")
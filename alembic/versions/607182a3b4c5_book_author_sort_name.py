@@ -0,0 +1,50 @@
+"""book.author_sort_name (author name copied by trigger) with (author_sort_name, id) index for sort=author
+
+Revision ID: 607182a3b4c5
+Revises: 5f708192a3b4
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "607182a3b4c5"
+down_revision: Union[str, Sequence[str], None] = "5f708192a3b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Имя автора книги ('' без автора). При переименовании автора author_search_vector_refresh
+# делает UPDATE book SET author_id = author_id, так что этот триггер срабатывает и тогда.
+BOOK_AUTHOR_SORT_NAME_FUNCTION = """
+CREATE OR REPLACE FUNCTION book_author_sort_name_update() RETURNS trigger AS $$
+BEGIN
+    NEW.author_sort_name := coalesce((SELECT name FROM author WHERE id = NEW.author_id), '');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    op.add_column("book", sa.Column("author_sort_name", sa.Text(), server_default="", nullable=False))
+    op.execute(BOOK_AUTHOR_SORT_NAME_FUNCTION)
+    op.execute(
+        """
+        CREATE TRIGGER book_author_sort_name_trigger
+        BEFORE INSERT OR UPDATE OF author_id ON book
+        FOR EACH ROW EXECUTE FUNCTION book_author_sort_name_update()
+        """
+    )
+    op.execute("UPDATE book SET author_sort_name = author.name FROM author WHERE author.id = book.author_id")
+    op.create_index("ix_book_author_sort_name_id", "book", ["author_sort_name", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_book_author_sort_name_id", table_name="book")
+    op.execute("DROP TRIGGER IF EXISTS book_author_sort_name_trigger ON book")
+    op.execute("DROP FUNCTION IF EXISTS book_author_sort_name_update()")
+    op.drop_column("book", "author_sort_name")
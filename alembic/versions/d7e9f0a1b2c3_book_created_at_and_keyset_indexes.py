@@ -0,0 +1,43 @@
+"""book.created_at and composite (sort_key, id) indexes for keyset pagination
+
+Revision ID: d7e9f0a1b2c3
+Revises: c6d8e9f0a1b2
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "d7e9f0a1b2c3"
+down_revision: Union[str, Sequence[str], None] = "c6d8e9f0a1b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "book",
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+    op.create_index("ix_book_title_id", "book", ["title", "id"], unique=False)
+    op.create_index("ix_book_created_at_id", "book", ["created_at", "id"], unique=False)
+    op.create_index("ix_author_name_id", "author", ["name", "id"], unique=False)
+    op.create_index("ix_tag_name_id", "tag", ["name", "id"], unique=False)
+    op.create_index("ix_cabinet_name_id", "cabinet", ["name", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_cabinet_name_id", table_name="cabinet")
+    op.drop_index("ix_tag_name_id", table_name="tag")
+    op.drop_index("ix_author_name_id", table_name="author")
+    op.drop_index("ix_book_created_at_id", table_name="book")
+    op.drop_index("ix_book_title_id", table_name="book")
+    op.drop_column("book", "created_at")
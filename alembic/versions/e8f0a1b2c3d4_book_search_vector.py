@@ -0,0 +1,87 @@
+"""book.search_vector (tsvector, russian) with GIN index and maintenance triggers
+
+Revision ID: e8f0a1b2c3d4
+Revises: d7e9f0a1b2c3
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "e8f0a1b2c3d4"
+down_revision: Union[str, Sequence[str], None] = "d7e9f0a1b2c3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Вектор книги: название (A), имя автора (B), краткое и полное описание (C).
+BOOK_SEARCH_VECTOR_FUNCTION = """
+CREATE OR REPLACE FUNCTION book_search_vector_update() RETURNS trigger AS $$
+DECLARE
+    author_name text;
+BEGIN
+    IF NEW.author_id IS NOT NULL THEN
+        SELECT name INTO author_name FROM author WHERE id = NEW.author_id;
+    END IF;
+    NEW.search_vector :=
+        setweight(to_tsvector('russian', coalesce(NEW.title, '')), 'A')
+        || setweight(to_tsvector('russian', coalesce(author_name, '')), 'B')
+        || setweight(to_tsvector('russian', coalesce(NEW.short_description, '')), 'C')
+        || setweight(to_tsvector('russian', coalesce(NEW.full_description, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+# При переименовании автора пересчитываем векторы его книг (срабатывает триггер book).
+AUTHOR_RENAME_FUNCTION = """
+CREATE OR REPLACE FUNCTION author_search_vector_refresh() RETURNS trigger AS $$
+BEGIN
+    UPDATE book SET author_id = author_id WHERE author_id = NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    op.add_column("book", sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True))
+    op.execute(BOOK_SEARCH_VECTOR_FUNCTION)
+    op.execute(AUTHOR_RENAME_FUNCTION)
+    op.execute(
+        """
+        CREATE TRIGGER book_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF title, short_description, full_description, author_id ON book
+        FOR EACH ROW EXECUTE FUNCTION book_search_vector_update()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER author_search_vector_trigger
+        AFTER UPDATE OF name ON author
+        FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE FUNCTION author_search_vector_refresh()
+        """
+    )
+    # Заполняем вектор для существующих книг через триггер.
+    op.execute("UPDATE book SET title = title")
+    op.create_index(
+        "ix_book_search_vector",
+        "book",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_book_search_vector", table_name="book", postgresql_using="gin")
+    op.execute("DROP TRIGGER IF EXISTS author_search_vector_trigger ON author")
+    op.execute("DROP TRIGGER IF EXISTS book_search_vector_trigger ON book")
+    op.execute("DROP FUNCTION IF EXISTS author_search_vector_refresh()")
+    op.execute("DROP FUNCTION IF EXISTS book_search_vector_update()")
+    op.drop_column("book", "search_vector")
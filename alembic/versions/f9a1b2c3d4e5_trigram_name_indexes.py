@@ -0,0 +1,42 @@
+"""pg_trgm GIN indexes on author.name, tag.name, cabinet.name and book.title
+
+Revision ID: f9a1b2c3d4e5
+Revises: e8f0a1b2c3d4
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "f9a1b2c3d4e5"
+down_revision: Union[str, Sequence[str], None] = "e8f0a1b2c3d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TRGM_INDEXES = (
+    ("ix_author_name_trgm", "author", "name"),
+    ("ix_tag_name_trgm", "tag", "name"),
+    ("ix_cabinet_name_trgm", "cabinet", "name"),
+    ("ix_book_title_trgm", "book", "title"),
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for index_name, table, column in TRGM_INDEXES:
+        op.create_index(
+            index_name,
+            table,
+            [column],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    for index_name, table, _ in reversed(TRGM_INDEXES):
+        op.drop_index(index_name, table_name=table, postgresql_using="gin")
@@ -0,0 +1,64 @@
+"""
+Замер массового импорта: BooksService.import_books на сгенерированном NDJSON
+(тот же путь, что POST /books/import, без HTTP).
+
+Запуск из корня проекта (нужна БД с применёнными миграциями; книги остаются в БД):
+    python -m benchmarks.books_import --count 100000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import AsyncIterator
+
+from src.repositories.books import BooksRepository
+from src.services.books import BooksService
+from src.utils.book_import import ImportFormat, iter_import_records
+
+CHUNK_SIZE = 64 * 1024
+
+
+async def generate_ndjson(count: int) -> AsyncIterator[bytes]:
+    """Тело запроса кусками по CHUNK_SIZE, как его отдаёт request.stream()."""
+    authors = [f"bench-автор-{i}" for i in range(max(count // 20, 1))]
+    shelves = [f"bench-полка-{i}" for i in range(50)]
+    tags = [f"bench-тэг-{i}" for i in range(200)]
+    buffer = bytearray()
+    for i in range(count):
+        row = {
+            "title": f"Книга {i}",
+            "short_description": "Краткое описание " * 5,
+            "full_description": "Полное описание " * 100,
+            "author": random.choice(authors),
+            "shelf": random.choice(shelves),
+            "tags": random.sample(tags, random.randint(0, 5)),
+        }
+        buffer += json.dumps(row, ensure_ascii=False).encode() + b"\n"
+        if len(buffer) >= CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def run(count: int) -> None:
+    service = BooksService(BooksRepository())
+    started = time.perf_counter()
+    report = await service.import_books(iter_import_records(generate_ndjson(count), ImportFormat.ndjson))
+    elapsed = time.perf_counter() - started
+    print(
+        f"imported {report.imported}, failed {report.failed} in {elapsed:.1f}s "
+        f"({report.imported / elapsed:.0f} books/s)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100_000, help="сколько книг импортировать")
+    args = parser.parse_args()
+    asyncio.run(run(args.count))
+
+
+if __name__ == "__main__":
+    main()
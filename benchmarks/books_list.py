@@ -0,0 +1,154 @@
+"""
+Сравнение пути списка книг: прежний (count + страница + запрос тэгов + группировка в Python)
+и текущий BooksRepository.list (array_agg тэгов в запросе страницы) с count=exact (отдельный count)
+и count=window (count(*) OVER () в том же запросе).
+
+Запуск из корня проекта (нужна БД с применёнными миграциями):
+    python -m benchmarks.books_list --seed 20000      # один раз: добавить тестовые книги
+    python -m benchmarks.books_list --repeat 50
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from uuid import UUID, uuid4
+
+from sqlalchemy import func, insert, select
+
+from src.core.database import AsyncSessionFactory
+from src.models.authors import Author
+from src.models.base import CountMode, CursorPaginationRequest
+from src.models.books import Book, BookInList, BookTagLink
+from src.models.shelves import Shelf
+from src.models.tags import Tag
+from src.repositories.books import BooksRepository
+
+PER_PAGE_SIZES = (10, 50, 100)
+
+
+async def legacy_list(session, pagination: CursorPaginationRequest) -> tuple[list[BookInList], int]:
+    """Прежняя реализация: три обращения к БД и сборка тэгов в Python."""
+    offset = (pagination.page - 1) * pagination.per_page
+    total_count = await session.scalar(select(func.count(Book.id))) or 0
+    stmt = (
+        select(Book, Author.name.label("author_name"), Shelf.name.label("shelf_name"))
+        .outerjoin(Author, Book.author_id == Author.id)
+        .outerjoin(Shelf, Book.shelf_id == Shelf.id)
+        .order_by(Book.title, Book.id)
+        .offset(offset)
+        .limit(pagination.per_page)
+    )
+    rows = (await session.execute(stmt)).all()
+    book_ids = [r[0].id for r in rows]
+    tag_rows = (await session.execute(
+        select(BookTagLink.book_id, BookTagLink.tag_id, Tag.name)
+        .join(Tag, BookTagLink.tag_id == Tag.id)
+        .where(BookTagLink.book_id.in_(book_ids))
+    )).all()
+    tags_by_book: dict[UUID, list[tuple[UUID, str]]] = {bid: [] for bid in book_ids}
+    for book_id, tag_id, tag_name in tag_rows:
+        tags_by_book[book_id].append((tag_id, tag_name))
+    books = [
+        BookInList(
+            id=book.id,
+            title=book.title,
+            cover_path=book.cover_path,
+            short_description=book.short_description,
+            author_id=book.author_id,
+            author_name=author_name,
+            shelf_id=book.shelf_id,
+            shelf_name=shelf_name,
+            tag_ids=[t[0] for t in tags_by_book[book.id]],
+            tag_names=[t[1] for t in tags_by_book[book.id]],
+        )
+        for book, author_name, shelf_name in rows
+    ]
+    return books, total_count
+
+
+async def seed(count: int) -> None:
+    """Добавляет count книг с авторами и 0–5 тэгами у каждой."""
+    authors = [{"id": uuid4(), "name": f"Автор {i}"} for i in range(max(count // 20, 1))]
+    tags = [{"id": uuid4(), "name": f"bench-тэг-{uuid4().hex[:8]}"} for _ in range(50)]
+    books, links = [], []
+    for i in range(count):
+        book_id = uuid4()
+        books.append({
+            "id": book_id,
+            "title": f"Книга {random.randint(0, count)} {i}",
+            "short_description": "Краткое описание " * 5,
+            "full_description": "Полное описание " * 500,
+            "author_id": random.choice(authors)["id"],
+        })
+        links.extend({"book_id": book_id, "tag_id": t["id"]} for t in random.sample(tags, random.randint(0, 5)))
+    async with AsyncSessionFactory() as session:
+        await session.execute(insert(Author), authors)
+        await session.execute(insert(Tag), tags)
+        for start in range(0, len(books), 5000):
+            await session.execute(insert(Book), books[start:start + 5000])
+        for start in range(0, len(links), 10000):
+            await session.execute(insert(BookTagLink), links[start:start + 10000])
+        await session.commit()
+    print(f"seeded {count} books, {len(links)} tag links")
+
+
+async def measure(fn, repeat: int) -> tuple[float, float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+async def run(repeat: int) -> None:
+    repo = BooksRepository()
+    print(
+        f"{'per_page':>8} {'page':>5} {'legacy p50':>11} {'p95':>8} "
+        f"{'exact p50':>11} {'p95':>8} {'window p50':>11} {'p95':>8}"
+    )
+    for per_page in PER_PAGE_SIZES:
+        for page in (1, 20):
+            pagination = CursorPaginationRequest(page=page, per_page=per_page)
+            windowed = CursorPaginationRequest(page=page, per_page=per_page, count=CountMode.window)
+
+            async def legacy():
+                async with AsyncSessionFactory() as session:
+                    await legacy_list(session, pagination)
+
+            async def exact():
+                await repo.list(pagination)
+
+            async def window():
+                await repo.list(windowed)
+
+            await legacy()
+            await exact()
+            await window()
+            legacy_p50, legacy_p95 = await measure(legacy, repeat)
+            exact_p50, exact_p95 = await measure(exact, repeat)
+            window_p50, window_p95 = await measure(window, repeat)
+            print(
+                f"{per_page:>8} {page:>5} {legacy_p50:>9.2f}ms {legacy_p95:>6.2f}ms "
+                f"{exact_p50:>9.2f}ms {exact_p95:>6.2f}ms {window_p50:>9.2f}ms {window_p95:>6.2f}ms"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0, help="добавить столько тестовых книг перед замером")
+    parser.add_argument("--repeat", type=int, default=30, help="повторов на каждую конфигурацию")
+    args = parser.parse_args()
+    asyncio.run(_main(args.seed, args.repeat))
+
+
+async def _main(seed_count: int, repeat: int) -> None:
+    if seed_count:
+        await seed(seed_count)
+    await run(repeat)
+
+
+if __name__ == "__main__":
+    main()
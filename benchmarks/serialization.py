@@ -0,0 +1,87 @@
+"""
+Микро-бенчмарк сериализации списка книг (CPU на строку, без БД).
+
+before — прежний путь: BookInList(...) с валидацией, затем FastAPI валидирует ответ
+         по response_model=ListBooksResponse и кодирует его через JSONResponse (json.dumps);
+after  — быстрый путь: строки-словари без моделей, ListBooksResponse.model_construct
+         и FastJSONResponse (orjson).
+
+Запуск из корня проекта:
+    python -m benchmarks.serialization --per-page 100 --repeat 500
+"""
+import argparse
+import time
+from typing import Callable
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+from fastapi.utils import create_model_field
+
+from src.core.responses import FastJSONResponse
+from src.models.base import CursorPaginationRequest
+from src.models.books import BookInList, ListBooksResponse
+from src.utils.pagination import PageMeta, build_pagination
+
+
+def make_rows(count: int) -> list[dict]:
+    """Строки в том виде, в каком их отдаёт BooksRepository.list (полная проекция)."""
+    return [
+        {
+            "id": uuid4(),
+            "title": f"Книга {i}",
+            "cover_path": f"covers/{uuid4()}.jpg",
+            "short_description": "Краткое описание книги " * 4,
+            "author_id": uuid4(),
+            "author_name": f"Автор {i}",
+            "shelf_id": uuid4(),
+            "shelf_name": "Полка 1",
+            "tag_ids": [uuid4() for _ in range(3)],
+            "tag_names": ["фантастика", "классика", "детектив"],
+        }
+        for i in range(count)
+    ]
+
+
+_RESPONSE_FIELD = create_model_field(name="response", type_=ListBooksResponse, mode="serialization")
+
+
+def before(rows: list[dict], pagination: CursorPaginationRequest) -> bytes:
+    books = [BookInList(**r) for r in rows]
+    page = build_pagination(page=PageMeta(total_count=1000), pagination_request=pagination)
+    response = ListBooksResponse(books=books, pagination=page, facets=None)
+    # То же, что делает fastapi.routing.serialize_response для response_model
+    value, _ = _RESPONSE_FIELD.validate(response, {}, loc=("response",))
+    return JSONResponse(_RESPONSE_FIELD.serialize(value, exclude_unset=True)).body
+
+
+def after(rows: list[dict], pagination: CursorPaginationRequest) -> bytes:
+    books = [dict(r) for r in rows]
+    page = build_pagination(page=PageMeta(total_count=1000), pagination_request=pagination)
+    response = ListBooksResponse.model_construct(books=books, pagination=page, facets=None)
+    return FastJSONResponse(response, exclude_unset=True).body
+
+
+def per_row_us(fn: Callable[[], bytes], repeat: int, rows: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat / rows * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    rows = make_rows(args.per_page)
+    pagination = CursorPaginationRequest(per_page=args.per_page)
+    before_us = per_row_us(lambda: before(rows, pagination), args.repeat, args.per_page)
+    after_us = per_row_us(lambda: after(rows, pagination), args.repeat, args.per_page)
+    print(f"per_page={args.per_page}: before {before_us:.2f} us/row, after {after_us:.2f} us/row "
+          f"({before_us / after_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
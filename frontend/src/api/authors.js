@@ -5,6 +5,8 @@ export function listAuthors(params = {}) {
   if (params.page != null) sp.set('page', params.page);
   if (params.per_page != null) sp.set('per_page', params.per_page);
   if (params.q != null && params.q !== '') sp.set('q', params.q);
+  if (params.match != null) sp.set('match', params.match);
+  if (params.cursor != null) sp.set('cursor', params.cursor);
   const qs = sp.toString();
   return api.get(`/authors/${qs ? `?${qs}` : ''}`);
 }
@@ -5,12 +5,26 @@ export function listBooks(params = {}) {
   if (params.page != null) sp.set('page', params.page);
   if (params.per_page != null) sp.set('per_page', params.per_page);
   if (params.q != null && params.q !== '') sp.set('q', params.q);
+  if (params.sort != null) sp.set('sort', params.sort);
+  if (params.cursor != null) sp.set('cursor', params.cursor);
+  (params.tag_ids || []).forEach((id) => sp.append('tag_ids', id));
+  if (params.tag_match != null) sp.set('tag_match', params.tag_match);
+  if (params.author_id != null) sp.set('author_id', params.author_id);
+  if (params.shelf_id != null) sp.set('shelf_id', params.shelf_id);
+  if (params.cabinet_id != null) sp.set('cabinet_id', params.cabinet_id);
+  if (params.facets) sp.set('facets', 'true');
+  if (params.fields != null) sp.set('fields', params.fields);
+  if (params.include != null) sp.set('include', params.include);
   const qs = sp.toString();
   return api.get(`/books/${qs ? `?${qs}` : ''}`);
 }
 
-export function getBook(id) {
-  return api.get(`/books/${id}`);
+export function getBook(id, params = {}) {
+  const sp = new URLSearchParams();
+  if (params.fields != null) sp.set('fields', params.fields);
+  if (params.include != null) sp.set('include', params.include);
+  const qs = sp.toString();
+  return api.get(`/books/${id}${qs ? `?${qs}` : ''}`);
 }
 
 /**
@@ -27,6 +41,14 @@ export function updateBook(id, data) {
   return api.patch(`/books/${id}`, data);
 }
 
+/**
+ * Массовое изменение книг. data: ids и/или filter ({ tag_ids, tag_match, author_id, shelf_id, cabinet_id }) и q;
+ * операции: add_tag_ids, remove_tag_ids, shelf_id, author_id или delete: true.
+ */
+export function bulkUpdateBooks(data) {
+  return api.post('/books/bulk', data);
+}
+
 export function deleteBook(id) {
   return api.delete(`/books/${id}`);
 }
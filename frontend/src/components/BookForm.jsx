@@ -50,7 +50,7 @@ export default function BookForm({ form, setForm, listAuthors, getAuthor, shelve
           id="book-author"
           value={form?.author_id ?? ''}
           onChange={(authorId) => setForm((f) => ({ ...f, author_id: authorId }))}
-          onSearch={(q, perPage) => listAuthors({ q: q ?? undefined, per_page: perPage || 25 })}
+          onSearch={(q, perPage) => listAuthors({ q: q ?? undefined, per_page: perPage || 25, cursor: '' })}
           getAuthor={(id) => getAuthor(id)}
           placeholder="Введите имя для поиска или выберите из списка"
         />
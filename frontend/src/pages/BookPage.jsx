@@ -75,8 +75,8 @@ export default function BookPage() {
     if (!id || !form) return
     setSubmitLoading(true)
     updateBook(id, buildBookFormData(form))
-      .then(() => {
-        getBook(id).then(setBook)
+      .then((updated) => {
+        setBook(updated)
         setEditing(false)
         setForm((f) => ({ ...f, cover_file: null }))
       })
@@ -132,14 +132,14 @@ export default function BooksList() {
     let cancelled = false
     setLoading(true)
     setError(null)
-    const params = { page, per_page: 10 }
+    const params = { page, per_page: 10, tag_ids: selectedTagIds }
     if (debouncedSearch.trim()) params.q = debouncedSearch.trim()
     listBooks(params)
       .then((res) => { if (!cancelled) setData(res) })
       .catch((e) => { if (!cancelled) setError(e.message || 'Ошибка загрузки') })
       .finally(() => { if (!cancelled) setLoading(false) })
     return () => { cancelled = true }
-  }, [page, debouncedSearch])
+  }, [page, debouncedSearch, selectedTagIds])
 
   const openCreate = () => {
     setForm(emptyForm)
@@ -157,7 +157,7 @@ export default function BooksList() {
       .then(() => {
         setModalOpen(false)
         setPage(1)
-        const params = { page: 1, per_page: 10 }
+        const params = { page: 1, per_page: 10, tag_ids: selectedTagIds }
         if (debouncedSearch.trim()) params.q = debouncedSearch.trim()
         listBooks(params).then(setData)
       })
@@ -200,7 +200,7 @@ export default function BooksList() {
           onSearchChange={setSearchQuery}
           onSubmitSearch={submitSearch}
           selectedTagIds={selectedTagIds}
-          onTagToggle={(id) => setSelectedTagIds((prev) => prev.includes(id) ? prev.filter((x) => x !== id) : [...prev, id])}
+          onTagToggle={(id) => { setSelectedTagIds((prev) => prev.includes(id) ? prev.filter((x) => x !== id) : [...prev, id]); setPage(1) }}
         />
         <div className="books-content">
           {error ? (
@@ -3,8 +3,9 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query
 
 from src.core.container import get_authors_service
+from src.core.responses import FastJSONResponse
 from src.models.authors import Author, AuthorCreate, AuthorUpdate, ListAuthorsResponse
-from src.models.base import PaginationRequest
+from src.models.base import CursorPaginationRequest, SearchMatch
 from src.services.authors import AuthorsService
 
 router = APIRouter(prefix="/authors", tags=["authors"])
@@ -21,21 +22,25 @@ async def add_author(
 @router.get("/", response_model=ListAuthorsResponse)
 async def list_authors(
     service: AuthorsService = Depends(get_authors_service),
-    pagination: PaginationRequest = Depends(),
+    pagination: CursorPaginationRequest = Depends(),
     q: str | None = Query(None, description="Поиск по имени (без учёта регистра)"),
-):
-    return await service.list_authors(pagination, search_q=q)
+    match: SearchMatch = Query(
+        SearchMatch.prefix,
+        description="prefix — начало одного из слов, contains — подстрока, fuzzy — похожие слова",
+    ),
+) -> FastJSONResponse:
+    return FastJSONResponse(await service.list_authors(pagination, search_q=q, match=match))
 
 
 @router.get("/{author_id}", response_model=Author)
 async def get_author(
     author_id: UUID,
     service: AuthorsService = Depends(get_authors_service),
-) -> Author:
+) -> FastJSONResponse:
     author = await service.get_author(author_id)
     if not author:
         raise HTTPException(status_code=404, detail="Author not found")
-    return author
+    return FastJSONResponse(author)
 
 
 @router.patch("/{author_id}", response_model=Author)
@@ -1,12 +1,37 @@
-from uuid import UUID, uuid4
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile
 
 from src.core.container import get_books_service
+from src.core.responses import FastJSONResponse
 from src.core.covers import save_cover
-from src.models.base import PaginationRequest
-from src.models.books import Book, BookCreate, BookDetail, BookUpdate, ListBooksResponse
+from src.core.settings import settings
+from src.models.base import CursorPaginationRequest
+from src.models.books import (
+    BOOK_DETAIL_FIELDS,
+    BOOK_DETAIL_INCLUDES,
+    BOOK_EXPORT_COLUMNS,
+    BOOK_LIST_FIELDS,
+    BOOK_LIST_INCLUDES,
+    Book,
+    BookBulkRequest,
+    BookBulkResult,
+    BookCreate,
+    BookDetail,
+    BookEnrichRequest,
+    BookEnrichResponse,
+    BookFilter,
+    BookImportReport,
+    BookProjection,
+    BookSearchMode,
+    BookSort,
+    BookUpdate,
+    ListBooksResponse,
+    TagMatch,
+)
 from src.services.books import BooksService
+from src.utils.export import EXPORT_BATCH_SIZE, ExportFormat, export_response
+from src.utils.book_import import import_format_from_content_type, iter_import_records
 
 router = APIRouter(prefix="/books", tags=["books"])
 
@@ -34,6 +59,34 @@ def _parse_uuid_list(value: str | None) -> list[UUID]:
     return result
 
 
+def _parse_names(value: str | None, allowed: tuple[str, ...], param: str) -> set[str] | None:
+    """Разбирает список через запятую (fields=, include=); неизвестные имена — 400."""
+    if value is None:
+        return None
+    names = {part.strip() for part in value.split(",") if part.strip()}
+    unknown = names - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Неизвестные значения {param}: {', '.join(sorted(unknown))}. Допустимо: {', '.join(allowed)}",
+        )
+    return names
+
+
+def _parse_projection(
+    fields: str | None,
+    include: str | None,
+    allowed_fields: tuple[str, ...],
+    allowed_includes: tuple[str, ...],
+) -> BookProjection | None:
+    if fields is None and include is None:
+        return None
+    return BookProjection(
+        fields=_parse_names(fields, allowed_fields, "fields"),
+        include=_parse_names(include, allowed_includes, "include"),
+    )
+
+
 @router.post("/")
 async def add_book(
     title: str = Form(...),
@@ -50,7 +103,7 @@ async def add_book(
         raise HTTPException(status_code=400, detail="Название книги не может быть пустым")
     cover_path = None
     if cover and cover.filename:
-        cover_path = await save_cover(cover, name_without_ext=str(uuid4()))
+        cover_path = await save_cover(cover)
     book_data = BookCreate(
         title=title_clean,
         short_description=short_description.strip() if short_description else None,
@@ -63,27 +116,163 @@ async def add_book(
     return await service.add_book(book_data)
 
 
+@router.post("/import", response_model=BookImportReport)
+async def import_books(
+    request: Request,
+    service: BooksService = Depends(get_books_service),
+) -> BookImportReport:
+    """
+    Массовый импорт книг. Тело читается потоком:
+    NDJSON (Content-Type: application/x-ndjson) — по объекту на строку с полями
+    title, short_description, full_description, author, shelf, tags (список имён);
+    CSV (Content-Type: text/csv) — с заголовком из тех же колонок, тэги через «|».
+    Автор, полка и тэги ищутся по имени и создаются при отсутствии.
+    В ответе — количество загруженных книг и ошибки по номерам строк.
+    Тело больше IMPORT_MAX_BYTES — 413 (по Content-Length; без него — ошибка в отчёте).
+    """
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > settings.import_max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Тело запроса больше {settings.import_max_bytes} байт",
+        )
+    import_format = import_format_from_content_type(request.headers.get("content-type"))
+    if import_format is None:
+        raise HTTPException(
+            status_code=415,
+            detail="Ожидается Content-Type application/x-ndjson или text/csv",
+        )
+    return await service.import_books(iter_import_records(request.stream(), import_format))
+
+
+@router.post("/bulk", response_model=BookBulkResult)
+async def bulk_update_books(
+    request: BookBulkRequest,
+    service: BooksService = Depends(get_books_service),
+) -> BookBulkResult:
+    """
+    Массовые операции над книгами, выбранными по ids и/или filter и q:
+    добавить/убрать тэги, задать полку или автора, удалить. Всё в одной транзакции.
+    """
+    if not request.has_selection():
+        raise HTTPException(status_code=400, detail="Укажите ids, filter или q")
+    if not request.has_changes():
+        raise HTTPException(status_code=400, detail="Не задано ни одного изменения")
+    if request.delete and (
+        request.add_tag_ids or request.remove_tag_ids or {"shelf_id", "author_id"} & request.model_fields_set
+    ):
+        raise HTTPException(status_code=400, detail="delete нельзя сочетать с другими изменениями")
+    return await service.bulk_update_books(request)
+
+
+@router.post("/enrich", response_model=BookEnrichResponse, status_code=202)
+async def enrich_books(
+    request: BookEnrichRequest,
+    service: BooksService = Depends(get_books_service),
+) -> BookEnrichResponse:
+    """
+    Заполнить пустые описания и обложки по данным Open Library. Выполняется в фоне
+    (задача очереди books.enrich), ответ возвращается сразу; заполненные вручную поля не меняются.
+    """
+    return BookEnrichResponse(job_id=await service.enqueue_enrichment(request.ids))
+
+
 @router.get("/", response_model=ListBooksResponse)
 async def list_books(
     service: BooksService = Depends(get_books_service),
-    pagination: PaginationRequest = Depends(),
+    pagination: CursorPaginationRequest = Depends(),
     q: str | None = Query(None, description="Поиск по названию (без учёта регистра)"),
+    sort: BookSort | None = Query(
+        None,
+        description="Сортировка: title, author, recent (сначала новые), relevance (для search_mode=fulltext/fuzzy)",
+    ),
+    search_mode: BookSearchMode = Query(
+        BookSearchMode.prefix,
+        description=(
+            "prefix — начало слова в названии, contains — подстрока, fuzzy — похожие слова; "
+            "fulltext — по названию, автору и описаниям с учётом морфологии"
+        ),
+    ),
+    headline: bool = Query(False, description="Вернуть фрагменты описания с выделенными совпадениями (fulltext)"),
+    tag_ids: list[UUID] = Query([], description="Фильтр по тэгам (параметр можно повторять)"),
+    tag_match: TagMatch = Query(TagMatch.any, description="any — хотя бы один из тэгов, all — все тэги"),
+    author_id: UUID | None = Query(None),
+    shelf_id: UUID | None = Query(None),
+    cabinet_id: UUID | None = Query(None, description="Книги на полках этого шкафа"),
+    facets: bool = Query(False, description="Добавить в ответ количество книг по тэгам и полкам"),
+    fields: str | None = Query(
+        None,
+        description=f"Поля книги через запятую (id возвращается всегда): {', '.join(BOOK_LIST_FIELDS)}",
+    ),
+    include: str | None = Query(
+        None,
+        description=(
+            f"Связанные данные через запятую: {', '.join(BOOK_LIST_INCLUDES)}. "
+            "По умолчанию все, если не задан fields, иначе никаких"
+        ),
+    ),
+) -> FastJSONResponse:
+    projection = _parse_projection(fields, include, BOOK_LIST_FIELDS, BOOK_LIST_INCLUDES)
+    filters = BookFilter(
+        tag_ids=tag_ids,
+        tag_match=tag_match,
+        author_id=author_id,
+        shelf_id=shelf_id,
+        cabinet_id=cabinet_id,
+    )
+    result = await service.list_books(
+        pagination,
+        search_q=q,
+        sort=sort,
+        search_mode=search_mode,
+        with_headline=headline,
+        filters=filters,
+        with_facets=facets,
+        projection=projection,
+    )
+    return FastJSONResponse(result, exclude_unset=True)
+
+
+@router.get("/export")
+async def export_books(
+    service: BooksService = Depends(get_books_service),
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format", description="ndjson или csv"),
+    gzip: bool = Query(False, description="Сжать выгрузку (файл .gz)"),
 ):
-    return await service.list_books(pagination, search_q=q)
+    """Все книги потоком (серверный курсор, пачки по EXPORT_BATCH_SIZE); память не зависит от размера таблицы."""
+    return export_response(
+        service.export_books(EXPORT_BATCH_SIZE),
+        export_format,
+        columns=BOOK_EXPORT_COLUMNS,
+        filename="books",
+        compress=gzip,
+    )
 
 
 @router.get("/{book_id}", response_model=BookDetail)
 async def get_book(
     book_id: UUID,
     service: BooksService = Depends(get_books_service),
-) -> BookDetail:
-    book = await service.get_book_detail(book_id)
+    fields: str | None = Query(
+        None,
+        description=f"Поля книги через запятую (id возвращается всегда): {', '.join(BOOK_DETAIL_FIELDS)}",
+    ),
+    include: str | None = Query(
+        None,
+        description=(
+            f"Связанные данные через запятую: {', '.join(BOOK_DETAIL_INCLUDES)}. "
+            "По умолчанию все, если не задан fields, иначе никаких"
+        ),
+    ),
+) -> FastJSONResponse:
+    projection = _parse_projection(fields, include, BOOK_DETAIL_FIELDS, BOOK_DETAIL_INCLUDES)
+    book = await service.get_book_detail(book_id, projection=projection)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
-    return book
+    return FastJSONResponse(book, exclude_unset=True)
 
 
-@router.patch("/{book_id}", response_model=Book)
+@router.patch("/{book_id}", response_model=BookDetail)
 async def update_book(
     book_id: UUID,
     title: str | None = Form(None),
@@ -94,13 +283,13 @@ async def update_book(
     tag_ids: str | None = Form(None),
     cover: UploadFile | None = File(None),
     service: BooksService = Depends(get_books_service),
-) -> Book:
+) -> FastJSONResponse:
     book = await service.get_book(book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
     cover_path = None
     if cover and cover.filename:
-        cover_path = await save_cover(cover, name_without_ext=str(book_id))
+        cover_path = await save_cover(cover)
     updates = {}
     if title is not None:
         t = title.strip()
@@ -123,7 +312,7 @@ async def update_book(
     updated = await service.update_book(book_id, data)
     if not updated:
         raise HTTPException(status_code=404, detail="Book not found")
-    return updated
+    return FastJSONResponse(updated)
 
 
 @router.delete("/{book_id}", status_code=204)
@@ -3,18 +3,22 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query
 
 from src.core.container import get_cabinets_service
-from src.models.base import PaginationRequest
+from src.core.responses import FastJSONResponse
+from src.models.base import CursorPaginationRequest, SearchMatch
 from src.models.cabinets import Cabinet, CabinetCreate, CabinetUpdate, ListCabinetsResponse
 from src.services.cabinets import CabinetsService
+from src.utils.export import EXPORT_BATCH_SIZE, ExportFormat, export_response
 
 router = APIRouter(prefix="/cabinets", tags=["cabinets"])
 
+CABINETS_EXPORT_COLUMNS = ("id", "name")
+
 
 @router.get("/all", response_model=list[Cabinet])
 async def list_all_cabinets(
     service: CabinetsService = Depends(get_cabinets_service),
-) -> list[Cabinet]:
-    return await service.list_all_cabinets()
+) -> FastJSONResponse:
+    return FastJSONResponse(await service.list_all_cabinets())
 
 
 @router.post("/", response_model=Cabinet)
@@ -28,21 +32,41 @@ async def add_cabinet(
 @router.get("/", response_model=ListCabinetsResponse)
 async def list_cabinets(
     service: CabinetsService = Depends(get_cabinets_service),
-    pagination: PaginationRequest = Depends(),
+    pagination: CursorPaginationRequest = Depends(),
     q: str | None = Query(None, description="Поиск по названию шкафа (без учёта регистра)"),
-) -> ListCabinetsResponse:
-    return await service.list_cabinets(pagination, search_q=q)
+    match: SearchMatch = Query(
+        SearchMatch.prefix,
+        description="prefix — начало одного из слов, contains — подстрока, fuzzy — похожие слова",
+    ),
+) -> FastJSONResponse:
+    return FastJSONResponse(await service.list_cabinets(pagination, search_q=q, match=match))
+
+
+@router.get("/export")
+async def export_cabinets(
+    service: CabinetsService = Depends(get_cabinets_service),
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format", description="ndjson или csv"),
+    gzip: bool = Query(False, description="Сжать выгрузку (файл .gz)"),
+):
+    """Все шкафы потоком (серверный курсор, пачки по EXPORT_BATCH_SIZE); память не зависит от размера таблицы."""
+    return export_response(
+        service.export_cabinets(EXPORT_BATCH_SIZE),
+        export_format,
+        columns=CABINETS_EXPORT_COLUMNS,
+        filename="cabinets",
+        compress=gzip,
+    )
 
 
 @router.get("/{cabinet_id}", response_model=Cabinet)
 async def get_cabinet(
     cabinet_id: UUID,
     service: CabinetsService = Depends(get_cabinets_service),
-) -> Cabinet:
+) -> FastJSONResponse:
     cabinet = await service.get_cabinet(cabinet_id)
     if not cabinet:
         raise HTTPException(status_code=404, detail="Cabinet not found")
-    return cabinet
+    return FastJSONResponse(cabinet)
 
 
 @router.patch("/{cabinet_id}", response_model=Cabinet)
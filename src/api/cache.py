@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+
+from src.core.reference_cache import reference_cache
+
+router = APIRouter(prefix="/cache", tags=["cache"])
+
+
+@router.get("/stats")
+async def cache_stats() -> dict[str, int]:
+    """Счётчики кэша справочников текущего процесса (у каждого воркера свои)."""
+    return reference_cache.stats()
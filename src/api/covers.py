@@ -0,0 +1,71 @@
+import os
+
+from anyio import to_thread
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse, RedirectResponse
+
+from src.core.cover_storage import IMMUTABLE_CACHE_CONTROL, cover_storage
+from src.core.covers import COVER_MEDIA_TYPES, cover_digest, cover_key
+from src.core.etag import etag_matches
+from src.core.settings import settings
+
+router = APIRouter(prefix="/covers", tags=["covers"])
+
+# Старые файлы (covers/<uuid>.jpg) могли перезаписываться, их браузер перепроверяет по ETag
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+
+def _stat(path) -> os.stat_result | None:
+    try:
+        stat = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return stat if os.path.isfile(path) else None
+
+
+@router.api_route("/{cover_path:path}", methods=["GET", "HEAD"])
+async def get_cover(cover_path: str, request: Request) -> Response:
+    """
+    Файл обложки с ETag, 304 по If-None-Match и Range (или X-Accel-Redirect/X-Sendfile для прокси).
+    Для S3 — редирект на presigned/публичный URL. Существование файла с хэшем в имени при этом
+    не проверяется (на него ссылается книга, сборщик мусора такие не удаляет; если файла всё же нет,
+    404 ответит само хранилище), старые файлы (covers/<uuid>.jpg) проверяются запросом HEAD.
+    """
+    key = cover_key(cover_path)
+    if key is None:
+        raise HTTPException(status_code=404, detail="Cover not found")
+    digest = cover_digest(key)
+    if_none_match = request.headers.get("if-none-match")
+
+    url = await cover_storage.read_url(key)
+    if url is not None:
+        if digest is None and not await cover_storage.existing({key}):
+            raise HTTPException(status_code=404, detail="Cover not found")
+        if digest and if_none_match and etag_matches(if_none_match, f'"{digest}"'):
+            return Response(status_code=304, headers={"ETag": f'"{digest}"', "Cache-Control": IMMUTABLE_CACHE_CONTROL})
+        return RedirectResponse(
+            url,
+            status_code=302,
+            headers={"Cache-Control": f"private, max-age={cover_storage.redirect_max_age}"},
+        )
+
+    path = cover_storage.local_path(key)
+    stat = await to_thread.run_sync(_stat, path) if path else None
+    if stat is None:
+        raise HTTPException(status_code=404, detail="Cover not found")
+
+    if digest:
+        headers = {"ETag": f'"{digest}"', "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    else:
+        headers = {"ETag": f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"', "Cache-Control": REVALIDATE_CACHE_CONTROL}
+    if if_none_match and etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    media_type = COVER_MEDIA_TYPES.get(path.suffix.lower(), "application/octet-stream")
+    if settings.cover_offload == "x-accel-redirect":
+        headers["X-Accel-Redirect"] = settings.cover_offload_prefix + key
+        return Response(media_type=media_type, headers=headers)
+    if settings.cover_offload == "x-sendfile":
+        headers["X-Sendfile"] = str(path)
+        return Response(media_type=media_type, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat)
@@ -1,20 +1,24 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from src.core.container import get_shelves_service
+from src.core.responses import FastJSONResponse
 from src.models.base import PaginationRequest
 from src.models.shelves import ListShelvesResponse, Shelf, ShelfCreate, ShelfUpdate, ShelfWithCabinet
 from src.services.shelves import ShelvesService
+from src.utils.export import EXPORT_BATCH_SIZE, ExportFormat, export_response
 
 router = APIRouter(prefix="/shelves", tags=["shelves"])
 
+SHELVES_EXPORT_COLUMNS = ("id", "name", "cabinet_id", "cabinet_name")
+
 
 @router.get("/all", response_model=list[ShelfWithCabinet])
 async def list_all_shelves(
     service: ShelvesService = Depends(get_shelves_service),
-) -> list[ShelfWithCabinet]:
-    return await service.list_all_shelves()
+) -> FastJSONResponse:
+    return FastJSONResponse(await service.list_all_shelves())
 
 
 @router.post("/", response_model=Shelf)
@@ -29,19 +33,35 @@ async def add_shelf(
 async def list_shelves(
     service: ShelvesService = Depends(get_shelves_service),
     pagination: PaginationRequest = Depends(),
-) -> ListShelvesResponse:
-    return await service.list_shelves(pagination)
+) -> FastJSONResponse:
+    return FastJSONResponse(await service.list_shelves(pagination))
+
+
+@router.get("/export")
+async def export_shelves(
+    service: ShelvesService = Depends(get_shelves_service),
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format", description="ndjson или csv"),
+    gzip: bool = Query(False, description="Сжать выгрузку (файл .gz)"),
+):
+    """Все полки с названиями шкафов потоком (серверный курсор, пачки по EXPORT_BATCH_SIZE); память не зависит от размера таблицы."""
+    return export_response(
+        service.export_shelves(EXPORT_BATCH_SIZE),
+        export_format,
+        columns=SHELVES_EXPORT_COLUMNS,
+        filename="shelves",
+        compress=gzip,
+    )
 
 
 @router.get("/{shelf_id}", response_model=Shelf)
 async def get_shelf(
     shelf_id: UUID,
     service: ShelvesService = Depends(get_shelves_service),
-) -> Shelf:
+) -> FastJSONResponse:
     shelf = await service.get_shelf(shelf_id)
     if not shelf:
         raise HTTPException(status_code=404, detail="Shelf not found")
-    return shelf
+    return FastJSONResponse(shelf)
 
 
 @router.patch("/{shelf_id}", response_model=Shelf)
@@ -3,18 +3,22 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query
 
 from src.core.container import get_tags_service
-from src.models.base import PaginationRequest
+from src.core.responses import FastJSONResponse
+from src.models.base import CursorPaginationRequest, SearchMatch
 from src.models.tags import ListTagsResponse, Tag, TagCreate, TagUpdate
 from src.services.tags import TagsService
+from src.utils.export import EXPORT_BATCH_SIZE, ExportFormat, export_response
 
 router = APIRouter(prefix="/tags", tags=["tags"])
 
+TAGS_EXPORT_COLUMNS = ("id", "name")
+
 
 @router.get("/all", response_model=list[Tag])
 async def list_all_tags(
     service: TagsService = Depends(get_tags_service),
-) -> list[Tag]:
-    return await service.list_all_tags()
+) -> FastJSONResponse:
+    return FastJSONResponse(await service.list_all_tags())
 
 
 @router.post("/", response_model=Tag)
@@ -28,21 +32,41 @@ async def add_tag(
 @router.get("/", response_model=ListTagsResponse)
 async def list_tags(
     service: TagsService = Depends(get_tags_service),
-    pagination: PaginationRequest = Depends(),
+    pagination: CursorPaginationRequest = Depends(),
     q: str | None = Query(None, description="Поиск по названию (без учёта регистра)"),
-) -> ListTagsResponse:
-    return await service.list_tags(pagination, search_q=q)
+    match: SearchMatch = Query(
+        SearchMatch.prefix,
+        description="prefix — начало одного из слов, contains — подстрока, fuzzy — похожие слова",
+    ),
+) -> FastJSONResponse:
+    return FastJSONResponse(await service.list_tags(pagination, search_q=q, match=match))
+
+
+@router.get("/export")
+async def export_tags(
+    service: TagsService = Depends(get_tags_service),
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format", description="ndjson или csv"),
+    gzip: bool = Query(False, description="Сжать выгрузку (файл .gz)"),
+):
+    """Все тэги потоком (серверный курсор, пачки по EXPORT_BATCH_SIZE); память не зависит от размера таблицы."""
+    return export_response(
+        service.export_tags(EXPORT_BATCH_SIZE),
+        export_format,
+        columns=TAGS_EXPORT_COLUMNS,
+        filename="tags",
+        compress=gzip,
+    )
 
 
 @router.get("/{tag_id}", response_model=Tag)
 async def get_tag(
     tag_id: UUID,
     service: TagsService = Depends(get_tags_service),
-) -> Tag:
+) -> FastJSONResponse:
     tag = await service.get_tag(tag_id)
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
-    return tag
+    return FastJSONResponse(tag)
 
 
 @router.patch("/{tag_id}", response_model=Tag)
@@ -1,8 +1,11 @@
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.database import get_session
 from src.repositories.authors import AuthorsRepository
 from src.repositories.books import BooksRepository
 from src.repositories.cabinets import CabinetsRepository
+from src.repositories.jobs import JobsRepository
 from src.repositories.shelves import ShelvesRepository
 from src.repositories.tags import TagsRepository
 from src.services.authors import AuthorsService
@@ -12,28 +15,47 @@ from src.services.shelves import ShelvesService
 from src.services.tags import TagsService
 
 
-def get_books_repository() -> BooksRepository:
-    return BooksRepository()
+# Все репозитории запроса получают одну сессию (Depends кэширует её в пределах запроса);
+# scope="function": commit выполняется до отправки ответа, а не после
+def get_books_repository(
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> BooksRepository:
+    return BooksRepository(session)
 
 
-def get_authors_repository() -> AuthorsRepository:
-    return AuthorsRepository()
+def get_authors_repository(
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> AuthorsRepository:
+    return AuthorsRepository(session)
 
 
-def get_shelves_repository() -> ShelvesRepository:
-    return ShelvesRepository()
+def get_shelves_repository(
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> ShelvesRepository:
+    return ShelvesRepository(session)
 
 
-def get_tags_repository() -> TagsRepository:
-    return TagsRepository()
+def get_tags_repository(
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> TagsRepository:
+    return TagsRepository(session)
+
+def get_cabinets_repository(
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> CabinetsRepository:
+    return CabinetsRepository(session)
+
+def get_jobs_repository(
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> JobsRepository:
+    return JobsRepository(session)
 
-def get_cabinets_repository() -> CabinetsRepository:
-    return CabinetsRepository()
 
 def get_books_service(
     repo: BooksRepository = Depends(get_books_repository),
+    jobs: JobsRepository = Depends(get_jobs_repository),
 ) -> BooksService:
-    return BooksService(repo)
+    return BooksService(repo, jobs)
 
 
 def get_authors_service(
@@ -0,0 +1,162 @@
+"""
+Сборка мусора в хранилище обложек (core/cover_storage.py).
+
+Файл обложки может быть общим для нескольких книг, ссылки на него — значения book.cover_path.
+Проход удаляет файлы, на которые не ссылается ни одна книга (и брошенные временные файлы загрузок),
+и находит cover_path, указывающие на отсутствующие файлы. Файлы моложе grace_seconds не трогаются:
+обложка сохраняется на диск до commit книги, которая на неё сошлётся.
+
+Фоновая задача CoverGarbageCollector запускается в каждом воркере, но проход выполняет один:
+остальные не получают advisory lock и пропускают его. Вручную:
+    python -m src.core.cover_gc [--dry-run] [--fix-missing]
+"""
+import argparse
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import func, select
+
+from src.core.cover_storage import UPLOAD_TEMP_PREFIX, cover_storage
+from src.core.covers import COVERS_URL_PREFIX
+from src.core.database import session_scope
+from src.core.settings import settings
+from src.repositories.books import BooksRepository
+
+logger = logging.getLogger(__name__)
+
+COVER_GC_BATCH_SIZE = 1000
+# Ключ pg_try_advisory_xact_lock: один проход на весь кластер воркеров
+COVER_GC_LOCK_KEY = 0x636F7665725F6763  # "cover_gc"
+
+
+@dataclass
+class CoverGCReport:
+    skipped: bool = False  # проход уже выполняется в другом процессе
+    scanned_files: int = 0
+    orphan_files: int = 0
+    deleted_files: int = 0
+    freed_bytes: int = 0
+    missing_references: int = 0
+    cleared_references: int = 0
+
+
+def _is_service_file(key: str) -> bool:
+    """Служебные dot-файлы (.gitkeep и т.п.) не трогаем; временные файлы загрузок — собираем."""
+    name = key.rsplit("/", 1)[-1]
+    return name.startswith(".") and not name.startswith(UPLOAD_TEMP_PREFIX)
+
+
+async def collect_cover_garbage(
+    grace_seconds: float,
+    dry_run: bool = False,
+    fix_missing: bool = False,
+) -> CoverGCReport:
+    """
+    Один проход сборки мусора. dry_run — только посчитать; fix_missing — обнулить cover_path
+    у книг, чей файл отсутствует (по умолчанию такие ссылки только считаются и пишутся в лог).
+    """
+    repo = BooksRepository()
+    report = CoverGCReport()
+    async with session_scope() as session:
+        if not await session.scalar(select(func.pg_try_advisory_xact_lock(COVER_GC_LOCK_KEY))):
+            report.skipped = True
+            return report
+        if not await cover_storage.available():
+            # Том не подключён или бакета нет: иначе все ссылки оказались бы «битыми»
+            logger.warning("cover garbage collection skipped: cover storage is not available")
+            report.skipped = True
+            return report
+
+        cutoff = time.time() - grace_seconds
+        async for keys in cover_storage.list_older_than(cutoff):
+            keys = [key for key in keys if not _is_service_file(key)]
+            if not keys:
+                continue
+            report.scanned_files += len(keys)
+            referenced = await repo.referenced_cover_paths(
+                [COVERS_URL_PREFIX + key for key in keys], session=session
+            )
+            orphans = [key for key in keys if COVERS_URL_PREFIX + key not in referenced]
+            report.orphan_files += len(orphans)
+            if orphans and not dry_run:
+                deleted, freed = await cover_storage.delete_stale(orphans, cutoff)
+                report.deleted_files += deleted
+                report.freed_bytes += freed
+
+        after_id = None
+        while rows := await repo.cover_paths_after(after_id, COVER_GC_BATCH_SIZE, session=session):
+            after_id = rows[-1][0]
+            keys = {path.removeprefix(COVERS_URL_PREFIX) for _, path in rows if path.startswith(COVERS_URL_PREFIX)}
+            existing = await cover_storage.existing(keys)
+            missing = [
+                book_id
+                for book_id, path in rows
+                if path.startswith(COVERS_URL_PREFIX) and path.removeprefix(COVERS_URL_PREFIX) not in existing
+            ]
+            if not missing:
+                continue
+            report.missing_references += len(missing)
+            logger.warning("books with missing cover files: %s", ", ".join(str(i) for i in missing))
+            if fix_missing and not dry_run:
+                report.cleared_references += await repo.clear_cover_paths(missing, session=session)
+    return report
+
+
+class CoverGarbageCollector:
+    """Фоновая задача: проход сборки мусора раз в interval секунд."""
+
+    def __init__(
+        self,
+        interval: float = settings.cover_gc_interval_seconds,
+        grace: float = settings.cover_gc_grace_seconds,
+    ) -> None:
+        self.interval = interval
+        self.grace = grace
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                report = await collect_cover_garbage(self.grace)
+            except Exception:
+                logger.exception("cover garbage collection failed")
+                continue
+            if not report.skipped:
+                logger.info("cover garbage collection: %s", asdict(report))
+
+
+async def _run_once(grace: float, dry_run: bool, fix_missing: bool) -> CoverGCReport:
+    await cover_storage.start()
+    try:
+        return await collect_cover_garbage(grace, dry_run=dry_run, fix_missing=fix_missing)
+    finally:
+        await cover_storage.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="только посчитать, ничего не удалять")
+    parser.add_argument("--fix-missing", action="store_true", help="обнулить cover_path с отсутствующими файлами")
+    parser.add_argument("--grace", type=float, default=settings.cover_gc_grace_seconds, help="минимальный возраст файла, с")
+    args = parser.parse_args()
+    print(asdict(asyncio.run(_run_once(args.grace, args.dry_run, args.fix_missing))))
+
+
+if __name__ == "__main__":
+    main()
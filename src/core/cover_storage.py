@@ -0,0 +1,176 @@
+"""
+Хранилище файлов обложек: локальная папка (LocalCoverStorage) или S3-совместимое
+хранилище (core/cover_storage_s3.py), выбирается настройкой COVER_STORAGE.
+Ключ файла — путь без префикса covers/ (например ab/cd/<sha256>.jpg), в БД хранится covers/<ключ>.
+"""
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO
+
+from anyio import to_thread
+
+from src.core.settings import settings
+
+COVERS_DIR = Path(__file__).resolve().parent.parent.parent / "covers"
+# Временные файлы незавершённых загрузок (брошенные удаляет сборщик мусора)
+UPLOAD_TEMP_PREFIX = ".upload-"
+# Файлы с хэшем содержимого в имени не меняются
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+LIST_BATCH_SIZE = 1000
+
+
+class CoverUpload(ABC):
+    """Запись одного файла кусками; ключ становится известен только в конце (хэш содержимого)."""
+
+    @abstractmethod
+    async def write(self, chunk: bytes) -> None: ...
+
+    @abstractmethod
+    async def commit(self, key: str, content_type: str) -> None:
+        """Сохраняет файл под ключом key; если такой уже есть — оставляет его, обновив время изменения."""
+
+    @abstractmethod
+    async def abort(self) -> None: ...
+
+
+class CoverStorage(ABC):
+    # Сколько секунд клиент может кэшировать редирект на read_url
+    redirect_max_age = 0
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    @abstractmethod
+    async def open_upload(self) -> CoverUpload: ...
+
+    def local_path(self, key: str) -> Path | None:
+        """Путь к файлу на диске этого узла, если хранилище локальное."""
+        return None
+
+    async def read_url(self, key: str) -> str | None:
+        """URL, с которого клиент может скачать файл сам (редирект), или None."""
+        return None
+
+    @abstractmethod
+    async def available(self) -> bool:
+        """Хранилище доступно (папка смонтирована, бакет существует)."""
+
+    @abstractmethod
+    def list_older_than(self, cutoff: float) -> AsyncIterator[list[str]]:
+        """Ключи всех файлов, изменённых раньше cutoff (unix time), пачками."""
+
+    @abstractmethod
+    async def delete_stale(self, keys: list[str], cutoff: float) -> tuple[int, int]:
+        """Удаляет файлы, если они всё ещё старше cutoff; возвращает (сколько удалено, сколько байт)."""
+
+    @abstractmethod
+    async def existing(self, keys: set[str]) -> set[str]: ...
+
+
+class _LocalUpload(CoverUpload):
+    def __init__(self, root: Path, file: BinaryIO) -> None:
+        self.root = root
+        self.file = file
+
+    async def write(self, chunk: bytes) -> None:
+        await to_thread.run_sync(self.file.write, chunk)
+
+    async def commit(self, key: str, content_type: str) -> None:
+        await to_thread.run_sync(self._store, key)
+
+    async def abort(self) -> None:
+        await to_thread.run_sync(self._discard)
+
+    def _store(self, key: str) -> None:
+        path = self.root / key
+        if path.exists():
+            # mtime обновляется, чтобы сборщик мусора не удалил файл до того, как ссылка на него попадёт в БД
+            os.utime(path)
+            self._discard()
+            return
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self.file.name, path)
+
+    def _discard(self) -> None:
+        self.file.close()
+        Path(self.file.name).unlink(missing_ok=True)
+
+
+class LocalCoverStorage(CoverStorage):
+    """Папка на диске; временный файл загрузки в той же папке, чтобы переименование было атомарным."""
+
+    def __init__(self, root: Path = COVERS_DIR) -> None:
+        self.root = root
+
+    async def open_upload(self) -> CoverUpload:
+        return _LocalUpload(self.root, await to_thread.run_sync(self._open_temp_file))
+
+    def _open_temp_file(self) -> BinaryIO:
+        self.root.mkdir(exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=self.root, prefix=UPLOAD_TEMP_PREFIX, suffix=".part", delete=False)
+
+    def local_path(self, key: str) -> Path | None:
+        path = (self.root / key).resolve()
+        return path if path.is_relative_to(self.root.resolve()) else None
+
+    async def available(self) -> bool:
+        return self.root.is_dir()
+
+    async def list_older_than(self, cutoff: float) -> AsyncIterator[list[str]]:
+        keys = await to_thread.run_sync(self._old_keys, cutoff)
+        for start in range(0, len(keys), LIST_BATCH_SIZE):
+            yield keys[start:start + LIST_BATCH_SIZE]
+
+    def _old_keys(self, cutoff: float) -> list[str]:
+        keys = []
+        for root, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.stat(path).st_mtime >= cutoff:
+                        continue
+                except FileNotFoundError:
+                    continue
+                keys.append(os.path.relpath(path, self.root).replace(os.sep, "/"))
+        return keys
+
+    async def delete_stale(self, keys: list[str], cutoff: float) -> tuple[int, int]:
+        return await to_thread.run_sync(self._delete_stale, keys, cutoff)
+
+    def _delete_stale(self, keys: list[str], cutoff: float) -> tuple[int, int]:
+        deleted = freed = 0
+        for key in keys:
+            path = self.root / key
+            try:
+                stat = os.stat(path)
+                if stat.st_mtime >= cutoff:
+                    continue
+                os.unlink(path)
+            except FileNotFoundError:
+                continue
+            deleted += 1
+            freed += stat.st_size
+        return deleted, freed
+
+    async def existing(self, keys: set[str]) -> set[str]:
+        return await to_thread.run_sync(lambda: {k for k in keys if (self.root / k).is_file()})
+
+
+def create_cover_storage() -> CoverStorage:
+    if settings.cover_storage == "s3":
+        # aiobotocore нужен только этому драйверу
+        from src.core.cover_storage_s3 import S3CoverStorage
+
+        return S3CoverStorage()
+    return LocalCoverStorage()
+
+
+cover_storage = create_cover_storage()
@@ -0,0 +1,223 @@
+"""
+S3-совместимое хранилище обложек (AWS S3, MinIO и т.п.) на aiobotocore.
+
+Один клиент с пулом HTTP-соединений на процесс: создаётся в start() (lifespan) и закрывается в close().
+Загрузка идёт во временный объект .upload-<uuid> частями multipart upload (в памяти — не больше одной
+части), затем копируется на стороне S3 под ключ по хэшу содержимого. Файлы не больше одной части
+загружаются сразу под итоговым ключом одним PUT. Чтение — редирект на presigned URL или на
+COVER_S3_PUBLIC_URL (CDN / публичный бакет).
+"""
+import asyncio
+from contextlib import AsyncExitStack
+from typing import Any, AsyncIterator
+from uuid import uuid4
+
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
+from botocore.exceptions import ClientError
+
+from src.core.cover_storage import (
+    IMMUTABLE_CACHE_CONTROL,
+    UPLOAD_TEMP_PREFIX,
+    CoverStorage,
+    CoverUpload,
+)
+from src.core.settings import settings
+
+
+def _is_not_found(e: ClientError) -> bool:
+    return e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound", "NoSuchBucket")
+
+
+class _S3Upload(CoverUpload):
+    def __init__(self, storage: "S3CoverStorage") -> None:
+        self.storage = storage
+        self.temp_key = f"{UPLOAD_TEMP_PREFIX}{uuid4().hex}"
+        self.buffer = bytearray()
+        self.upload_id: str | None = None
+        self.parts: list[dict[str, Any]] = []
+        self.temp_object = False
+
+    async def write(self, chunk: bytes) -> None:
+        self.buffer += chunk
+        if len(self.buffer) >= self.storage.part_size:
+            await self._upload_part()
+
+    async def _upload_part(self) -> None:
+        client, bucket = self.storage.client, self.storage.bucket
+        if self.upload_id is None:
+            response = await client.create_multipart_upload(Bucket=bucket, Key=self.temp_key)
+            self.upload_id = response["UploadId"]
+        part_number = len(self.parts) + 1
+        response = await client.upload_part(
+            Bucket=bucket,
+            Key=self.temp_key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=bytes(self.buffer),
+        )
+        self.parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+        self.buffer.clear()
+
+    async def commit(self, key: str, content_type: str) -> None:
+        client, bucket = self.storage.client, self.storage.bucket
+        if await self.storage.head(key) is not None:
+            await self.storage.touch(key, content_type)
+            await self.abort()
+            return
+        if self.upload_id is None:
+            await client.put_object(
+                Bucket=bucket,
+                Key=key,
+                Body=bytes(self.buffer),
+                ContentType=content_type,
+                CacheControl=IMMUTABLE_CACHE_CONTROL,
+            )
+            return
+        if self.buffer:
+            await self._upload_part()
+        await client.complete_multipart_upload(
+            Bucket=bucket,
+            Key=self.temp_key,
+            UploadId=self.upload_id,
+            MultipartUpload={"Parts": self.parts},
+        )
+        self.upload_id = None
+        self.temp_object = True
+        await client.copy_object(
+            Bucket=bucket,
+            Key=key,
+            CopySource={"Bucket": bucket, "Key": self.temp_key},
+            MetadataDirective="REPLACE",
+            ContentType=content_type,
+            CacheControl=IMMUTABLE_CACHE_CONTROL,
+        )
+        await self.abort()
+
+    async def abort(self) -> None:
+        client, bucket = self.storage.client, self.storage.bucket
+        self.buffer.clear()
+        if self.upload_id is not None:
+            await client.abort_multipart_upload(Bucket=bucket, Key=self.temp_key, UploadId=self.upload_id)
+            self.upload_id = None
+        if self.temp_object:
+            await client.delete_object(Bucket=bucket, Key=self.temp_key)
+            self.temp_object = False
+
+
+class S3CoverStorage(CoverStorage):
+    def __init__(self) -> None:
+        self.bucket = settings.cover_s3_bucket
+        self.part_size = settings.cover_s3_part_size
+        self.public_url = settings.cover_s3_public_url
+        self.presign_expires = settings.cover_s3_presign_expires
+        # Редирект кэшируется не дольше, чем действует подписанная ссылка
+        self.redirect_max_age = 86400 if self.public_url else self.presign_expires // 2
+        self._exit_stack = AsyncExitStack()
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            raise RuntimeError("S3CoverStorage.start() не вызван")
+        return self._client
+
+    async def start(self) -> None:
+        if self._client is not None:
+            return
+        config = AioConfig(
+            max_pool_connections=settings.cover_s3_max_connections,
+            s3={"addressing_style": "path" if settings.cover_s3_force_path_style else "auto"},
+        )
+        self._client = await self._exit_stack.enter_async_context(
+            get_session().create_client(
+                "s3",
+                endpoint_url=settings.cover_s3_endpoint_url,
+                region_name=settings.cover_s3_region,
+                aws_access_key_id=settings.cover_s3_access_key_id,
+                aws_secret_access_key=settings.cover_s3_secret_access_key,
+                config=config,
+            )
+        )
+
+    async def close(self) -> None:
+        await self._exit_stack.aclose()
+        self._client = None
+
+    async def open_upload(self) -> CoverUpload:
+        return _S3Upload(self)
+
+    async def head(self, key: str) -> dict[str, Any] | None:
+        try:
+            return await self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if _is_not_found(e):
+                return None
+            raise
+
+    async def touch(self, key: str, content_type: str) -> None:
+        """Обновляет LastModified копированием объекта в себя (S3 не умеет менять время иначе)."""
+        await self.client.copy_object(
+            Bucket=self.bucket,
+            Key=key,
+            CopySource={"Bucket": self.bucket, "Key": key},
+            MetadataDirective="REPLACE",
+            ContentType=content_type,
+            CacheControl=IMMUTABLE_CACHE_CONTROL,
+        )
+
+    async def read_url(self, key: str) -> str | None:
+        if self.public_url:
+            return f"{self.public_url.rstrip('/')}/{key}"
+        return await self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=self.presign_expires,
+        )
+
+    async def available(self) -> bool:
+        try:
+            await self.client.head_bucket(Bucket=self.bucket)
+        except ClientError as e:
+            if _is_not_found(e):
+                return False
+            raise
+        return True
+
+    async def list_older_than(self, cutoff: float) -> AsyncIterator[list[str]]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        async for page in paginator.paginate(Bucket=self.bucket):
+            keys = [obj["Key"] for obj in page.get("Contents", []) if obj["LastModified"].timestamp() < cutoff]
+            if keys:
+                yield keys
+
+    async def delete_stale(self, keys: list[str], cutoff: float) -> tuple[int, int]:
+        heads = await self._head_many(keys)
+        stale = {
+            key: head["ContentLength"]
+            for key, head in heads.items()
+            if head is not None and head["LastModified"].timestamp() < cutoff
+        }
+        if not stale:
+            return 0, 0
+        response = await self.client.delete_objects(
+            Bucket=self.bucket,
+            Delete={"Objects": [{"Key": key} for key in stale], "Quiet": True},
+        )
+        failed = {error["Key"] for error in response.get("Errors", [])}
+        deleted = [key for key in stale if key not in failed]
+        return len(deleted), sum(stale[key] for key in deleted)
+
+    async def existing(self, keys: set[str]) -> set[str]:
+        heads = await self._head_many(list(keys))
+        return {key for key, head in heads.items() if head is not None}
+
+    async def _head_many(self, keys: list[str]) -> dict[str, dict[str, Any] | None]:
+        # Не больше запросов одновременно, чем соединений в пуле
+        semaphore = asyncio.Semaphore(settings.cover_s3_max_connections)
+
+        async def head(key: str) -> dict[str, Any] | None:
+            async with semaphore:
+                return await self.head(key)
+
+        return dict(zip(keys, await asyncio.gather(*(head(key) for key in keys))))
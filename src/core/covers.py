@@ -1,28 +1,181 @@
-"""Путь к папке обложек и сохранение загруженных файлов."""
-from pathlib import Path
-from uuid import uuid4
+"""
+Проверка и сохранение загруженных обложек в хранилище (core/cover_storage.py).
+Обложки адресуются по содержимому: covers/ab/cd/<sha256><расширение>, так что одинаковые
+изображения хранятся один раз. Файл может быть общим для нескольких книг (book.cover_path);
+ненужные файлы удаляет сборщик мусора (core/cover_gc.py).
+"""
+import hashlib
+import re
+from typing import AsyncIterator
 
-from fastapi import UploadFile
+from anyio import CancelScope
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-COVERS_DIR = Path(__file__).resolve().parent.parent.parent / "covers"
-ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+from src.core.cover_storage import cover_storage
+from src.core.settings import settings
 
+COVER_CHUNK_SIZE = 256 * 1024
+# Префикс cover_path в БД и путь роута /covers
+COVERS_URL_PREFIX = "covers/"
+COVER_MEDIA_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".gif": "image/gif",
+}
+# Сколько первых байт нужно detect_image_extension
+SIGNATURE_SIZE = 12
+_CONTENT_ADDRESSED_PATH = re.compile(r"[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})\.[a-z]+")
+# Запросы с обложкой в форме (POST /books/, PATCH /books/{id}) и запас на остальные поля формы
+_COVER_FORM_ROUTES = (("POST", re.compile(r"/books/?")), ("PATCH", re.compile(r"/books/[^/]+")))
+COVER_FORM_OVERHEAD_BYTES = 1024 * 1024
 
-def get_extension(filename: str) -> str:
-    """Возвращает расширение файла (нижний регистр) или .jpg по умолчанию."""
-    ext = Path(filename).suffix.lower()
-    return ext if ext in ALLOWED_EXTENSIONS else ".jpg"
 
+class CoverError(ValueError):
+    """Загруженная обложка отклонена; status_code — код ответа API."""
 
-async def save_cover(upload: UploadFile, name_without_ext: str) -> str:
+    status_code = 400
+
+
+class CoverTooLargeError(CoverError):
+    status_code = 413
+
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(f"Обложка больше {round(max_bytes / (1024 * 1024), 1):g} МБ")
+
+
+class UnsupportedCoverFormatError(CoverError):
+    status_code = 415
+
+    def __init__(self) -> None:
+        super().__init__("Обложка должна быть изображением JPEG, PNG, WebP или GIF")
+
+
+def detect_image_extension(head: bytes) -> str | None:
+    """Расширение по сигнатуре в начале файла (SIGNATURE_SIZE байт) или None, если формат не поддерживается."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return ".gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+
+def cover_relative_path(digest: str, ext: str) -> str:
+    """Ключ в хранилище: два уровня каталогов по первым символам хэша."""
+    return f"{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+
+def cover_digest(relative: str) -> str | None:
+    """SHA-256 из имени файла, если путь в формате cover_relative_path (содержимое по нему не меняется)."""
+    match = _CONTENT_ADDRESSED_PATH.fullmatch(relative)
+    return match.group(1) if match else None
+
+
+def cover_key(relative: str) -> str | None:
+    """Ключ в хранилище по части URL после /covers/; None для «..», пустых частей и служебных файлов."""
+    parts = relative.split("/")
+    if not relative or any(not part or part.startswith(".") for part in parts):
+        return None
+    return relative
+
+
+async def save_cover(upload: UploadFile) -> str:
+    """Сохраняет загруженный через форму файл обложки (см. store_cover)."""
+
+    async def chunks() -> AsyncIterator[bytes]:
+        while chunk := await upload.read(COVER_CHUNK_SIZE):
+            yield chunk
+
+    return await store_cover(chunks(), upload.size)
+
+
+async def store_cover(chunks: AsyncIterator[bytes], size_hint: int | None = None) -> str:
     """
-    Сохраняет загруженный файл в COVERS_DIR.
-    Возвращает относительный путь для БД, например covers/uuid.jpg.
+    Сохраняет файл из потока кусков в хранилище обложек под ключом по SHA-256 содержимого.
+    Файл передаётся в хранилище кусками и фиксируется под итоговым ключом, только если прошёл
+    проверки: формат по сигнатуре, размер не больше settings.cover_max_bytes. Иначе — CoverError.
+    size_hint — заявленный размер (Content-Length), чтобы отклонить слишком большой файл сразу.
+    Возвращает относительный путь для БД, например covers/ab/cd/abcd….jpg.
     """
-    COVERS_DIR.mkdir(exist_ok=True)
-    ext = get_extension(upload.filename or "cover.jpg")
-    filename = f"{name_without_ext}{ext}"
-    path = COVERS_DIR / filename
-    content = await upload.read()
-    path.write_bytes(content)
-    return f"covers/{filename}"
+    max_bytes = settings.cover_max_bytes
+    if size_hint is not None and size_hint > max_bytes:
+        raise CoverTooLargeError(max_bytes)
+
+    writer = await cover_storage.open_upload()
+    try:
+        ext = None
+        head = b""
+        size = 0
+        digest = hashlib.sha256()
+        async for chunk in chunks:
+            if ext is None:
+                # Куски из сети бывают короче сигнатуры
+                head += chunk[: SIGNATURE_SIZE - len(head)]
+                if len(head) == SIGNATURE_SIZE:
+                    ext = detect_image_extension(head)
+                    if ext is None:
+                        raise UnsupportedCoverFormatError()
+            size += len(chunk)
+            if size > max_bytes:
+                raise CoverTooLargeError(max_bytes)
+            digest.update(chunk)
+            await writer.write(chunk)
+        if ext is None:
+            ext = detect_image_extension(head)
+        if ext is None:
+            raise UnsupportedCoverFormatError()
+        key = cover_relative_path(digest.hexdigest(), ext)
+        await writer.commit(key, COVER_MEDIA_TYPES[ext])
+    except BaseException:
+        # Временные данные убираются и при отмене запроса
+        with CancelScope(shield=True):
+            await writer.abort()
+        raise
+    return f"{COVERS_URL_PREFIX}{key}"
+
+
+class CoverUploadLimitMiddleware:
+    """
+    ASGI-middleware: предельный размер тела запросов с обложкой — cover_max_bytes + COVER_FORM_OVERHEAD_BYTES.
+    python-multipart принимает всю форму (во временный файл) до вызова обработчика, так что проверка
+    в store_cover срабатывает, только когда тело уже прочитано. Здесь слишком большое тело отклоняется
+    с 413 сразу по Content-Length, а без него — как только прочитано больше предела.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not any(
+            scope["method"] == method and path.fullmatch(scope["path"]) for method, path in _COVER_FORM_ROUTES
+        ):
+            await self.app(scope, receive, send)
+            return
+        max_bytes = settings.cover_max_bytes + COVER_FORM_OVERHEAD_BYTES
+        detail = str(CoverTooLargeError(settings.cover_max_bytes))
+        content_length = Headers(scope=scope).get("content-length", "")
+        if content_length.isdigit() and int(content_length) > max_bytes:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # FastAPI пропускает HTTPException из разбора формы как есть (а не как 400)
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,96 @@
+"""
+Условные GET-запросы (ETag / If-None-Match) для всего API.
+
+ETag ответа — хэш от пути с query-строкой и счётчиков изменений таблиц (table_version),
+от которых зависит ресурс. Счётчик таблицы разбит на строки по соединениям, версия — их сумма;
+она читается одним запросом по первичному ключу до вызова обработчика, поэтому при совпадении
+If-None-Match ответ 304 отдаётся без выборки строк и без сериализации.
+Версии читаются в сессии, которую middleware открывает для всего запроса и отдаёт обработчику
+через request.state (get_session), — лишнего соединения на GET нет. Счётчики читаются раньше
+данных: при параллельной записи ETag может оказаться «старше» тела ответа, что приводит лишь
+к лишней перезагрузке у клиента.
+"""
+import hashlib
+
+from sqlalchemy import BigInteger, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.database import REQUEST_SESSION_STATE, session_scope
+from src.models.table_versions import TableVersion
+
+# От каких таблиц зависят ответы ресурса (первый сегмент пути).
+RESOURCE_TABLES: dict[str, tuple[str, ...]] = {
+    "books": ("book", "book_tag", "author", "shelf", "cabinet", "tag"),
+    "authors": ("author",),
+    "tags": ("tag",),
+    "shelves": ("shelf", "cabinet"),
+    "cabinets": ("cabinet",),
+}
+
+
+async def load_versions(session: AsyncSession, tables: tuple[str, ...]) -> list[tuple[str, int]]:
+    version = cast(func.sum(TableVersion.version), BigInteger)
+    result = await session.execute(
+        select(TableVersion.name, version)
+        .where(TableVersion.name.in_(tables))
+        .group_by(TableVersion.name)
+        .order_by(TableVersion.name)
+    )
+    return [(name, version) for name, version in result.all()]
+
+
+def compute_etag(scope: Scope, versions: list[tuple[str, int]]) -> str:
+    key = f"{scope['path']}?{scope.get('query_string', b'').decode('latin-1')}|{versions}"
+    return '"' + hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Слабое сравнение, как требует RFC 9110 для If-None-Match."""
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class ETagMiddleware:
+    """ASGI-middleware: ETag для успешных GET/HEAD ресурсов из RESOURCE_TABLES и 304 по If-None-Match."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        resource = scope["path"].strip("/").split("/", 1)[0]
+        tables = RESOURCE_TABLES.get(resource)
+        if tables is None:
+            await self.app(scope, receive, send)
+            return
+
+        async with session_scope(read_only=True) as session:
+            scope.setdefault("state", {})[REQUEST_SESSION_STATE] = session
+            await self._respond(scope, receive, send, await load_versions(session, tables))
+
+    async def _respond(self, scope: Scope, receive: Receive, send: Send, versions: list[tuple[str, int]]) -> None:
+        etag = compute_etag(scope, versions)
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [(b"etag", etag.encode()), (b"cache-control", b"no-cache")],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_etag(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                headers["etag"] = etag
+                # Клиент может хранить ответ, но обязан перепроверять его через If-None-Match
+                headers.setdefault("cache-control", "no-cache")
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
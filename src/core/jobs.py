@@ -0,0 +1,214 @@
+"""
+Очередь фоновых задач в PostgreSQL (таблица job).
+
+Медленная работа (обработка изображений, обогащение метаданных, пересчёты, очистка) выносится
+из обработчика запроса: он вызывает enqueue() в своей транзакции и сразу отвечает, задача
+появляется в очереди только вместе с его данными. Обработчик задачи — корутина, принимающая
+payload, регистрируется декоратором @job_handler("вид") в одном из модулей JOB_HANDLER_MODULES.
+
+JobWorker захватывает готовые задачи (SELECT ... FOR UPDATE SKIP LOCKED, так что несколько
+воркеров не мешают друг другу) и выполняет их параллельно, не больше concurrency сразу.
+Задача арендуется на JOB_LEASE_SECONDS, аренда продлевается, пока задача выполняется; если
+воркер упал, после истечения аренды задачу возьмёт другой. Ошибка — повтор с экспоненциальной
+задержкой, после max_attempts попыток задача остаётся в таблице со статусом failed.
+Обработчик может выполниться больше одного раза, поэтому должен быть идемпотентным.
+
+Воркер запускается внутри каждого процесса API (JOB_WORKERS > 0) или отдельно:
+    python -m src.worker [--concurrency N]
+"""
+import asyncio
+import importlib
+import logging
+import random
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.settings import settings
+from src.models.jobs import Job
+from src.repositories.jobs import JobsRepository
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict[str, Any]], Awaitable[None]]
+
+# Модули с обработчиками (@job_handler); импортируются при старте воркера и приложения
+JOB_HANDLER_MODULES: tuple[str, ...] = ("src.services.enrichment",)
+# Сколько ждать завершения выполняющихся задач при остановке; остальные возвращаются в очередь
+JOB_SHUTDOWN_TIMEOUT_SECONDS = 25.0
+JOB_ERROR_MAX_LENGTH = 2000
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    handler: JobHandler
+    # Ограничение времени одной попытки, с; None — без ограничения (аренда всё равно продлевается)
+    timeout: float | None = None
+
+
+_handlers: dict[str, JobSpec] = {}
+
+
+def job_handler(kind: str, timeout: float | None = None) -> Callable[[JobHandler], JobHandler]:
+    """Регистрирует корутину func(payload) как обработчик задач вида kind."""
+
+    def register(func: JobHandler) -> JobHandler:
+        if kind in _handlers:
+            raise ValueError(f"Обработчик задач {kind!r} уже зарегистрирован")
+        _handlers[kind] = JobSpec(func, timeout)
+        return func
+
+    return register
+
+
+def load_job_handlers() -> None:
+    for module in JOB_HANDLER_MODULES:
+        importlib.import_module(module)
+
+
+async def enqueue(
+    kind: str,
+    payload: dict[str, Any] | None = None,
+    *,
+    session: AsyncSession | None = None,
+    delay: float = 0,
+    key: str | None = None,
+    max_attempts: int | None = None,
+) -> int | None:
+    """
+    Ставит задачу в очередь. С session — в транзакции запроса (задача не появится, если запрос
+    откатится), без неё — в отдельной транзакции. key — не ставить повторно, пока такая задача ждёт.
+    Возвращает id задачи или None, если она уже в очереди.
+    """
+    return await JobsRepository(session).enqueue(kind, payload or {}, delay=delay, key=key, max_attempts=max_attempts)
+
+
+def retry_delay(attempt: int) -> float:
+    """Задержка перед повтором после попытки attempt: удваивается, со случайным разбросом до 50%."""
+    delay = min(settings.job_retry_base_seconds * 2 ** (attempt - 1), settings.job_retry_max_seconds)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _error_text(e: BaseException) -> str:
+    return f"{type(e).__name__}: {e}"[:JOB_ERROR_MAX_LENGTH]
+
+
+class _LeaseLost(Exception):
+    pass
+
+
+class JobWorker:
+    """Фоновая задача: захват и выполнение задач из очереди, не больше concurrency одновременно."""
+
+    def __init__(
+        self,
+        concurrency: int = settings.job_workers,
+        poll_interval: float = settings.job_poll_interval_seconds,
+        lease_seconds: float = settings.job_lease_seconds,
+    ) -> None:
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.repo = JobsRepository()
+        self._task: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        if self._task is not None or self.concurrency <= 0:
+            return
+        if not _handlers:
+            logger.info("job worker not started: no job handlers registered")
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._running:
+            _, pending = await asyncio.wait(self._running, timeout=JOB_SHUTDOWN_TIMEOUT_SECONDS)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _run(self) -> None:
+        kinds = list(_handlers)
+        while True:
+            if len(self._running) >= self.concurrency:
+                await asyncio.wait(self._running, return_when=asyncio.FIRST_COMPLETED)
+                continue
+            free = self.concurrency - len(self._running)
+            try:
+                jobs = await self.repo.claim(kinds, free, self.lease_seconds)
+            except Exception:
+                logger.exception("job claim failed")
+                jobs = []
+            for job in jobs:
+                task = asyncio.create_task(self._execute(job))
+                self._running.add(task)
+                task.add_done_callback(self._on_done)
+            # Взяли всё, что было готово, — ждём новых задач; иначе сразу забираем следующие
+            if len(jobs) < free:
+                await asyncio.sleep(self.poll_interval)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            # Не удалось записать результат в БД: задача вернётся в очередь по истечении аренды
+            logger.error("job bookkeeping failed", exc_info=task.exception())
+
+    async def _execute(self, job: Job) -> None:
+        if job.attempts > job.max_attempts:
+            # Последняя попытка не завершилась: аренда истекла (воркер упал или завис)
+            await self.repo.fail(job.id, job.attempts, "lease expired on the last attempt")
+            logger.error("job %s (%s) failed: lease expired on the last attempt", job.id, job.kind)
+            return
+        spec = _handlers[job.kind]
+        runner = asyncio.create_task(asyncio.wait_for(spec.handler(job.payload), spec.timeout))
+        heartbeat = asyncio.create_task(self._heartbeat(job, runner))
+        try:
+            await runner
+        except asyncio.CancelledError:
+            if heartbeat.done() and heartbeat.exception() is not None:
+                # Аренду забрали: задача уже у другого воркера, строку не трогаем
+                logger.warning("job %s (%s) lost its lease and was cancelled", job.id, job.kind)
+                return
+            # Остановка воркера: вернуть задачу в очередь, не считая попытку
+            await asyncio.shield(self.repo.release(job.id, job.attempts))
+            raise
+        except Exception as e:
+            error = _error_text(e)
+            if job.attempts >= job.max_attempts:
+                await self.repo.fail(job.id, job.attempts, error)
+                logger.exception("job %s (%s) failed after %s attempts", job.id, job.kind, job.attempts)
+            else:
+                delay = retry_delay(job.attempts)
+                await self.repo.retry(job.id, job.attempts, delay, error)
+                logger.warning(
+                    "job %s (%s) attempt %s failed, retry in %.0f s: %s", job.id, job.kind, job.attempts, delay, error
+                )
+        else:
+            await self.repo.complete(job.id, job.attempts)
+        finally:
+            runner.cancel()
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job: Job, runner: asyncio.Task) -> None:
+        """Продлевает аренду каждую треть её срока; если аренда потеряна — отменяет выполнение."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                extended = await self.repo.extend(job.id, job.attempts, self.lease_seconds)
+            except Exception:
+                # Временная ошибка БД: аренда ещё действует, попробуем в следующий раз
+                logger.warning("job %s lease extension failed", job.id, exc_info=True)
+                continue
+            if not extended:
+                runner.cancel()
+                raise _LeaseLost()
@@ -0,0 +1,171 @@
+"""
+Кэш справочников (тэги, полки, шкафы) в памяти процесса.
+
+Списки /tags/all, /shelves/all, /cabinets/all меняются редко, а запрашиваются при каждом
+открытии списка книг. Записи живут REFERENCE_CACHE_TTL_SECONDS и сбрасываются сразу при
+изменении справочника через репозиторий. Чтобы сбросились и другие воркеры uvicorn,
+репозиторий в той же транзакции делает pg_notify, а ReferenceCacheListener каждого процесса
+слушает канал (LISTEN) и сбрасывает у себя соответствующие записи после commit.
+LISTEN требует постоянного соединения, поэтому идёт по settings.session_database_url(); если его нет
+(PgBouncer в режиме transaction без DATABASE_DIRECT_URL), кэш выключен: каждый запрос читает БД.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.settings import settings
+from src.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_CACHE_TTL_SECONDS = 300.0
+REFERENCE_CACHE_MAXSIZE = 64
+NOTIFY_CHANNEL = "reference_cache"
+LISTENER_RETRY_SECONDS = 5.0
+
+TAGS = "tags"
+SHELVES = "shelves"
+CABINETS = "cabinets"
+
+# Какие записи кэша зависят от справочника (в списке полок есть имя шкафа).
+_DEPENDENT = {
+    TAGS: (TAGS,),
+    SHELVES: (SHELVES,),
+    CABINETS: (CABINETS, SHELVES),
+}
+
+
+class ReferenceCache:
+    """
+    TTLCache со счётчиками попаданий/промахов и поколениями ключей:
+    если во время загрузки пришла инвалидация, загруженное значение не сохраняется.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = REFERENCE_CACHE_MAXSIZE,
+        ttl: float = REFERENCE_CACHE_TTL_SECONDS,
+        enabled: bool = True,
+    ) -> None:
+        # Выключенный кэш ничего не хранит: без инвалидаций от других процессов он отдавал бы устаревшее
+        self.enabled = enabled
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            self.misses += 1
+            return await loader()
+        value = self._cache.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        generation = self._generations.get(key, 0)
+        value = await loader()
+        if self._generations.get(key, 0) == generation:
+            self._cache.set(key, value)
+        return value
+
+    def invalidate(self, name: str) -> None:
+        """Сбрасывает записи, зависящие от справочника name (неизвестное имя — сбросить всё)."""
+        keys = _DEPENDENT.get(name)
+        if keys is None:
+            self.clear()
+            return
+        for key in keys:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._cache.delete(key)
+        self.invalidations += 1
+
+    def clear(self) -> None:
+        for key in list(self._generations) + [k for keys in _DEPENDENT.values() for k in keys]:
+            self._generations[key] = self._generations.get(key, 0) + 1
+        self._cache.clear()
+        self.invalidations += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "enabled": int(self.enabled),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "size": len(self._cache),
+        }
+
+
+reference_cache = ReferenceCache(enabled=settings.session_database_url() is not None)
+
+
+async def notify_reference_changed(session: AsyncSession, name: str) -> None:
+    """
+    Вызывается репозиторием после изменения справочника name.
+    Сбрасывает локальный кэш сразу, а pg_notify доставляется всем процессам (включая этот)
+    после commit — так запись, прочитанная до commit, тоже не задержится в кэше.
+    """
+    reference_cache.invalidate(name)
+    await session.execute(select(func.pg_notify(NOTIFY_CHANNEL, name)))
+
+
+class ReferenceCacheListener:
+    """Фоновая задача: LISTEN на канале инвалидации с переподключением при обрыве."""
+
+    def __init__(
+        self,
+        cache: ReferenceCache = reference_cache,
+        dsn: str | None = settings.session_database_url(),
+    ) -> None:
+        self.cache = cache
+        # asyncpg не понимает префикс диалекта SQLAlchemy
+        self.dsn = dsn.replace("postgresql+asyncpg://", "postgresql://", 1) if dsn else None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self.dsn is None:
+            logger.warning(
+                "reference cache disabled: DB_PGBOUNCER is set and DATABASE_DIRECT_URL is empty "
+                "(LISTEN needs a direct connection)"
+            )
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self.cache.invalidate(payload)
+
+    async def _run(self) -> None:
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(NOTIFY_CHANNEL, self._on_notify)
+                # Пока соединения не было, уведомления могли потеряться
+                self.cache.clear()
+                await closed.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("reference cache listener: соединение потеряно", exc_info=True)
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            self.cache.clear()
+            await asyncio.sleep(LISTENER_RETRY_SECONDS)
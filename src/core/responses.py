@@ -0,0 +1,44 @@
+"""
+Быстрый путь JSON-ответов: модели, собранные из доверенных данных (model_construct, строки ORM),
+кодируются orjson сразу в байты, без повторной валидации по response_model.
+Эндпоинт, вернувший FastJSONResponse, FastAPI отдаёт как есть; response_model в декораторе
+остаётся только для схемы OpenAPI.
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# Как у pydantic: datetime в UTC с суффиксом Z
+_ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def _dump_model(obj: Any) -> dict[str, Any]:
+    if not isinstance(obj, BaseModel):
+        raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+    if "_sa_instance_state" in obj.__dict__:
+        # Строка ORM: атрибуты читаем через getattr, в __dict__ есть служебное состояние SQLAlchemy
+        return {name: getattr(obj, name) for name in type(obj).model_fields}
+    return obj.__dict__
+
+
+def _dump_model_set(obj: Any) -> dict[str, Any]:
+    """Только явно заданные поля (аналог exclude_unset); у строк ORM — все поля."""
+    if not isinstance(obj, BaseModel) or "_sa_instance_state" in obj.__dict__:
+        return _dump_model(obj)
+    fields_set = obj.model_fields_set
+    if len(fields_set) == len(type(obj).model_fields):
+        return obj.__dict__
+    return {name: value for name, value in obj.__dict__.items() if name in fields_set}
+
+
+class FastJSONResponse(JSONResponse):
+    def __init__(self, content: Any, exclude_unset: bool = False, **kwargs: Any) -> None:
+        # render() вызывается из конструктора JSONResponse
+        self.exclude_unset = exclude_unset
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        default = _dump_model_set if self.exclude_unset else _dump_model
+        return orjson.dumps(content, default=default, option=_ORJSON_OPTIONS)
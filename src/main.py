@@ -1,21 +1,74 @@
+import logging
+from contextlib import asynccontextmanager
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse
 
 from src.api.authors import router as authors_router
 from src.api.books import router as books_router
+from src.api.cache import router as cache_router
+from src.api.covers import router as covers_router
 from src.api.cabinets import router as cabinets_router
 from src.api.shelves import router as shelves_router
 from src.api.tags import router as tags_router
-from src.core.covers import COVERS_DIR
+from src.core.cover_gc import CoverGarbageCollector
+from src.core.cover_storage import cover_storage
+from src.core.covers import CoverError, CoverUploadLimitMiddleware
+from src.core.etag import ETagMiddleware
+from src.core.jobs import JobWorker, load_job_handlers
+from src.core.reference_cache import ReferenceCacheListener
+from src.core.settings import settings
+from src.repositories.books import UnknownTagsError
+from src.utils.pagination import InvalidCursorError
+
+logger = logging.getLogger(__name__)
+
+
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError) -> JSONResponse:
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+
+async def unknown_tags_handler(request: Request, exc: UnknownTagsError) -> JSONResponse:
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+
+async def cover_error_handler(request: Request, exc: CoverError) -> JSONResponse:
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)})
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # uvicorn настраивает только свои логгеры; без обработчика у корневого логгера сообщения
+    # приложения уровня INFO (настройки, воркер задач, сборщик обложек) никуда не попадают.
+    # Если корневой логгер уже настроен (uvicorn --log-config), basicConfig ничего не меняет
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(name)s: %(message)s")
+    logger.info("effective settings: %s", settings.describe())
+    # Слушаем уведомления об изменении справочников от других воркеров
+    listener = ReferenceCacheListener()
+    listener.start()
+    await cover_storage.start()
+    cover_gc = CoverGarbageCollector()
+    cover_gc.start()
+    load_job_handlers()
+    job_worker = JobWorker()
+    job_worker.start()
+    try:
+        yield
+    finally:
+        await job_worker.stop()
+        await cover_gc.stop()
+        await cover_storage.close()
+        await listener.stop()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Library API")
+    app = FastAPI(title="Library API", lifespan=lifespan)
 
-    COVERS_DIR.mkdir(exist_ok=True)
-    app.mount("/covers", StaticFiles(directory=str(COVERS_DIR)), name="covers")
+    # Добавлены раньше CORS, чтобы ответы 304 и 413 тоже проходили через CORSMiddleware
+    app.add_middleware(ETagMiddleware)
+    app.add_middleware(CoverUploadLimitMiddleware)
 
     # Для доступа по локальной сети разрешаем любые источники (в проде лучше указать конкретные).
     app.add_middleware(
@@ -26,11 +79,17 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    app.add_exception_handler(InvalidCursorError, invalid_cursor_handler)
+    app.add_exception_handler(UnknownTagsError, unknown_tags_handler)
+    app.add_exception_handler(CoverError, cover_error_handler)
+
     app.include_router(books_router)
     app.include_router(authors_router)
     app.include_router(cabinets_router)
     app.include_router(shelves_router)
     app.include_router(tags_router)
+    app.include_router(cache_router)
+    app.include_router(covers_router)
     return app
 
 
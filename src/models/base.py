@@ -1,13 +1,61 @@
+from enum import Enum
+
+from pydantic import field_validator
 from sqlmodel import Field, SQLModel
 
 metadata = SQLModel.metadata
 
 
+class CountMode(str, Enum):
+    """Как считать общее количество записей для пагинации."""
+
+    exact = "exact"
+    # Точный count оконной функцией в запросе страницы (только /books): без второго запроса,
+    # но PostgreSQL строит всю выборку, даже если страница маленькая
+    window = "window"
+    estimate = "estimate"
+    cached = "cached"
+    none = "none"
+
+
 class PaginationRequest(SQLModel):
     """Параметры пагинации в запросе."""
 
     page: int = Field(default=1, ge=1)
     per_page: int = Field(default=10, ge=1)
+    count: CountMode = Field(
+        default=CountMode.exact,
+        description=(
+            "exact — точный count; window — точный count в том же запросе, что и страница (/books); estimate — оценка по статистике PostgreSQL (без фильтров); "
+            "cached — точный count из кэша на несколько секунд; none — без count, только has_next"
+        ),
+    )
+
+
+class CursorPaginationRequest(PaginationRequest):
+    """
+    Пагинация с опциональным режимом курсора (keyset).
+    Если cursor передан (в том числе пустой строкой для первой страницы),
+    page игнорируется, а следующая страница запрашивается по pagination.next_cursor.
+    """
+
+    cursor: str | None = Field(
+        default=None,
+        description="Курсор следующей страницы; пустая строка — первая страница в режиме курсора",
+    )
+
+    @field_validator("cursor", mode="before")
+    @classmethod
+    def cursor_strip(cls, v: str | None) -> str | None:
+        return v.strip() if isinstance(v, str) else v
+
+
+class SearchMatch(str, Enum):
+    """Режим сопоставления строки поиска q с названием."""
+
+    prefix = "prefix"
+    contains = "contains"
+    fuzzy = "fuzzy"
 
 
 class Pagination(SQLModel):
@@ -15,3 +63,7 @@ class Pagination(SQLModel):
 
     current_page: int = 1
     total_pages: int = 1
+    next_cursor: str | None = None
+    total_count: int | None = None
+    has_next: bool | None = None
+    is_estimate: bool = False
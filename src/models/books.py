@@ -1,5 +1,10 @@
+from datetime import datetime, timezone
+from enum import Enum
 from uuid import uuid4, UUID
 
+from pydantic import field_validator
+from sqlalchemy import Column, DateTime, Index, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlmodel import Field, SQLModel, Text
 
 from src.models.base import Pagination
@@ -7,22 +12,71 @@ from src.models.base import Pagination
 
 class BookTagLink(SQLModel, table=True):
     __tablename__ = "book_tag"
+    # PK (book_id, tag_id) не помогает искать книги по тэгу
+    __table_args__ = (Index("ix_book_tag_tag_id", "tag_id", "book_id"),)
+
     book_id: UUID = Field(foreign_key="book.id", primary_key=True)
     tag_id: UUID = Field(foreign_key="tag.id", primary_key=True)
 
 
+# Конфигурация полнотекстового поиска PostgreSQL (стемминг для русского языка).
+FTS_CONFIG = "russian"
+
+
+class BookSort(str, Enum):
+    """Порядок сортировки списка книг."""
+
+    title = "title"
+    author = "author"
+    recent = "recent"
+    relevance = "relevance"
+
+
+class BookSearchMode(str, Enum):
+    """Режим поиска по параметру q: по названию (см. SearchMatch) или полнотекстовый."""
+
+    prefix = "prefix"
+    contains = "contains"
+    fuzzy = "fuzzy"
+    fulltext = "fulltext"
+
+
 class Book(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_book_title_id", "title", "id"),
+        Index("ix_book_created_at_id", "created_at", "id"),
+        Index("ix_book_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+    )
+
     id: UUID = Field(default_factory=uuid4, primary_key=True, index=True)
     title: str = Field(index=True)
-    cover_path: str | None = Field(default=None)
+    cover_path: str | None = Field(default=None, index=True)
     short_description: str | None = Field(default=None)
     full_description: str | None = Field(sa_type=Text, default=None)
-    author_id: UUID | None = Field(default=None, foreign_key="author.id")
-    shelf_id: UUID | None = Field(default=None, foreign_key="shelf.id")
+    author_id: UUID | None = Field(default=None, foreign_key="author.id", index=True)
+    shelf_id: UUID | None = Field(default=None, foreign_key="shelf.id", index=True)
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_type=DateTime(timezone=True),
+        sa_column_kwargs={"server_default": func.now()},
+    )
 
     model_config = {"from_attributes": True}
 
 
+# tsvector (название — вес A, имя автора — B, описания — C) поддерживается триггерами в БД.
+# Колонка есть в таблице, но не отображается в модель, чтобы не загружаться вместе с Book.
+book_search_vector = Column("search_vector", TSVECTOR, nullable=True)
+Book.__table__.append_column(book_search_vector)
+Index("ix_book_search_vector", book_search_vector, postgresql_using="gin")
+
+# Имя автора для sort=author ('' без автора): копия author.name, которую поддерживают триггеры,
+# чтобы страницы курсора читались по индексу (author_sort_name, id) без join и сортировки всей выборки.
+book_author_sort_name = Column("author_sort_name", Text, nullable=False, server_default="")
+Book.__table__.append_column(book_author_sort_name)
+Index("ix_book_author_sort_name_id", book_author_sort_name, Book.__table__.c.id)
+
+
 class BookCreate(SQLModel):
     title: str
     cover_path: str | None = None
@@ -43,33 +97,213 @@ class BookUpdate(SQLModel):
     tag_ids: list[UUID] | None = None
 
 
+class BookImportRow(SQLModel):
+    """Строка массового импорта: автор, полка и тэги задаются именами."""
+
+    title: str
+    short_description: str | None = None
+    full_description: str | None = None
+    author: str | None = None
+    shelf: str | None = None
+    tags: list[str] = []
+
+    @field_validator("title", mode="after")
+    @classmethod
+    def title_not_empty(cls, v: str) -> str:
+        v = v.strip()
+        if not v:
+            raise ValueError("Название книги не может быть пустым")
+        return v
+
+    @field_validator("short_description", "full_description", "author", "shelf", mode="before")
+    @classmethod
+    def strip_empty(cls, v):
+        if isinstance(v, str):
+            v = v.strip()
+            return v or None
+        return v
+
+    @field_validator("tags", mode="before")
+    @classmethod
+    def tags_none_to_empty(cls, v):
+        return [] if v is None else v
+
+    @field_validator("tags", mode="after")
+    @classmethod
+    def tags_clean(cls, v: list[str]) -> list[str]:
+        # Без пустых имён и повторов, порядок сохраняется
+        return list(dict.fromkeys(t.strip() for t in v if t.strip()))
+
+
+# Колонки выгрузки /books/export; файл выгрузки можно снова загрузить через /books/import.
+BOOK_EXPORT_COLUMNS = (
+    "id",
+    "title",
+    "short_description",
+    "full_description",
+    "author",
+    "shelf",
+    "tags",
+    "cover_path",
+    "created_at",
+)
+
+
+class BookImportError(SQLModel):
+    line: int
+    error: str
+
+
+class BookImportReport(SQLModel):
+    imported: int = 0
+    failed: int = 0
+    errors: list[BookImportError] = []
+    errors_truncated: bool = False
+
+
 class BookInList(SQLModel):
+    """Книга в списке. При fields=/include= в ответ попадают только запрошенные поля."""
+
     id: UUID
-    title: str
-    cover_path: str | None
-    short_description: str | None
-    author_id: UUID | None
-    author_name: str | None
-    shelf_id: UUID | None
-    shelf_name: str | None
+    title: str | None = None
+    cover_path: str | None = None
+    short_description: str | None = None
+    author_id: UUID | None = None
+    author_name: str | None = None
+    shelf_id: UUID | None = None
+    shelf_name: str | None = None
     tag_ids: list[UUID] = []
     tag_names: list[str] = []
+    headline: str | None = None
 
 
 class BookDetail(SQLModel):
+    """Карточка книги. При fields=/include= в ответ попадают только запрошенные поля."""
+
     id: UUID
-    title: str
-    cover_path: str | None
-    short_description: str | None
-    full_description: str | None
-    author_id: UUID | None
-    author_name: str | None
-    shelf_id: UUID | None
-    shelf_name: str | None
+    title: str | None = None
+    cover_path: str | None = None
+    short_description: str | None = None
+    full_description: str | None = None
+    author_id: UUID | None = None
+    author_name: str | None = None
+    shelf_id: UUID | None = None
+    shelf_name: str | None = None
+    cabinet_id: UUID | None = None
+    cabinet_name: str | None = None
     tag_ids: list[UUID] = []
     tag_names: list[str] = []
 
 
+# Допустимые значения fields= и include= (id возвращается всегда).
+BOOK_LIST_FIELDS = ("id", "title", "cover_path", "short_description")
+BOOK_DETAIL_FIELDS = BOOK_LIST_FIELDS + ("full_description",)
+BOOK_LIST_INCLUDES = ("author", "shelf", "tags")
+BOOK_DETAIL_INCLUDES = BOOK_LIST_INCLUDES + ("cabinet",)
+
+
+class BookProjection(SQLModel):
+    """
+    Какие поля книги и связанные данные выбирать.
+    fields=None — все поля; include=None — все связи, если fields не задан, иначе никаких.
+    """
+
+    fields: set[str] | None = None
+    include: set[str] | None = None
+
+    def has_field(self, name: str) -> bool:
+        return self.fields is None or name == "id" or name in self.fields
+
+    def has_include(self, name: str) -> bool:
+        if self.include is None:
+            return self.fields is None
+        return name in self.include
+
+
+class TagMatch(str, Enum):
+    """Как сочетать несколько tag_ids в фильтре: любой из тэгов или все сразу."""
+
+    any = "any"
+    all = "all"
+
+
+class BookFilter(SQLModel):
+    """Фильтры списка книг (все условия объединяются через AND)."""
+
+    tag_ids: list[UUID] = []
+    tag_match: TagMatch = TagMatch.any
+    author_id: UUID | None = None
+    shelf_id: UUID | None = None
+    cabinet_id: UUID | None = None
+
+
+class BookBulkRequest(SQLModel):
+    """
+    Массовое изменение книг. Книги выбираются по ids и/или фильтру и поиску q (условия через AND);
+    пустой выбор запрещён, чтобы случайно не изменить весь каталог.
+    shelf_id/author_id меняются, только если переданы (null — убрать полку/автора).
+    """
+
+    ids: list[UUID] = []
+    filter: BookFilter | None = None
+    q: str | None = None
+    search_mode: BookSearchMode = BookSearchMode.prefix
+    add_tag_ids: list[UUID] = []
+    remove_tag_ids: list[UUID] = []
+    shelf_id: UUID | None = None
+    author_id: UUID | None = None
+    delete: bool = False
+
+    def has_selection(self) -> bool:
+        f = self.filter
+        has_filter = f is not None and bool(f.tag_ids or f.author_id or f.shelf_id or f.cabinet_id)
+        return bool(self.ids or has_filter or (self.q and self.q.strip()))
+
+    def has_changes(self) -> bool:
+        return bool(
+            self.add_tag_ids
+            or self.remove_tag_ids
+            or {"shelf_id", "author_id"} & self.model_fields_set
+            or self.delete
+        )
+
+
+class BookBulkResult(SQLModel):
+    """Сколько книг выбрано и сколько строк затронула каждая операция."""
+
+    matched: int = 0
+    updated: int = 0
+    tags_added: int = 0
+    tags_removed: int = 0
+    deleted: int = 0
+
+
+class BookEnrichRequest(SQLModel):
+    """Какие книги дополнить данными Open Library; пустой ids — все книги с незаполненными полями."""
+
+    ids: list[UUID] = []
+
+
+class BookEnrichResponse(SQLModel):
+    """id задачи в очереди; None — такая задача уже ждёт запуска."""
+
+    job_id: int | None = None
+
+
+class FacetCount(SQLModel):
+    id: UUID
+    name: str
+    count: int
+
+
+class BookFacets(SQLModel):
+    """Количество книг по тэгам и полкам среди книг, подходящих под текущий фильтр."""
+
+    tags: list[FacetCount] = []
+    shelves: list[FacetCount] = []
+
+
 class ListBooksResponse(SQLModel):
     books: list[BookInList]
     pagination: Pagination
+    facets: BookFacets | None = None
@@ -2,12 +2,18 @@ from __future__ import annotations
 
 from uuid import uuid4, UUID
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 from src.models.base import Pagination
 
 
 class Cabinet(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_cabinet_name_id", "name", "id"),
+        Index("ix_cabinet_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
+
     id: UUID = Field(default_factory=uuid4, primary_key=True, index=True)
     name: str = Field(index=True)
 
@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any
+
+from sqlalchemy import BigInteger, DateTime, Index, String, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field, SQLModel, Text
+
+
+class JobStatus(str, Enum):
+    """Состояние фоновой задачи; выполненные задачи удаляются из таблицы."""
+
+    queued = "queued"
+    running = "running"
+    failed = "failed"
+
+
+# Условия частичных индексов; запросы используют их буквально (не параметром), иначе
+# PostgreSQL не сопоставит их с индексом (и с ON CONFLICT по ux_job_queued_key)
+JOB_READY_CONDITION = text("status IN ('queued', 'running')")
+JOB_QUEUED_CONDITION = text("status = 'queued'")
+
+
+class Job(SQLModel, table=True):
+    """
+    Фоновая задача (core/jobs.py). run_at — когда задачу можно взять: для queued это время
+    запуска (с учётом задержки повтора), для running — конец аренды воркера; задача, чья аренда
+    истекла (воркер упал), снова становится доступной. attempts увеличивается при каждом захвате
+    и служит маркером аренды: воркер меняет строку, только если attempts не изменился.
+    """
+
+    __table_args__ = (
+        Index("ix_job_ready", "run_at", postgresql_where=JOB_READY_CONDITION),
+        # Не больше одной ожидающей задачи с таким ключом (enqueue с key= пропускает дубликат)
+        Index("ux_job_queued_key", "key", unique=True, postgresql_where=JOB_QUEUED_CONDITION),
+    )
+
+    id: int | None = Field(default=None, primary_key=True, sa_type=BigInteger)
+    kind: str
+    payload: dict[str, Any] = Field(default_factory=dict, sa_type=JSONB)
+    key: str | None = None
+    status: JobStatus = Field(default=JobStatus.queued, sa_type=String)
+    attempts: int = 0
+    max_attempts: int
+    run_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_type=DateTime(timezone=True),
+        sa_column_kwargs={"server_default": func.now()},
+    )
+    last_error: str | None = Field(default=None, sa_type=Text)
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_type=DateTime(timezone=True),
+        sa_column_kwargs={"server_default": func.now()},
+    )
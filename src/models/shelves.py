@@ -17,7 +17,7 @@ def _empty_str_to_none(v: UUID | None | str) -> UUID | None:
 class Shelf(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True, index=True)
     name: str = Field(index=True)
-    cabinet_id: UUID | None = Field(default=None, foreign_key="cabinet.id")
+    cabinet_id: UUID | None = Field(default=None, foreign_key="cabinet.id", ondelete="SET NULL", index=True)
 
     model_config = {"from_attributes": True}
 
@@ -0,0 +1,23 @@
+from sqlalchemy import BigInteger, SmallInteger
+from sqlmodel import Field, SQLModel
+
+# Таблицы, изменения которых отслеживаются счётчиком (для ETag ответов API).
+VERSIONED_TABLES = ("author", "book", "book_tag", "cabinet", "shelf", "tag")
+# Строк-счётчиков на таблицу; триггер выбирает строку по pg_backend_pid() % TABLE_VERSION_SHARDS
+TABLE_VERSION_SHARDS = 64
+
+
+class TableVersion(SQLModel, table=True):
+    """
+    Счётчик изменений таблицы: увеличивается триггером на каждую изменяющую её инструкцию
+    (в той же транзакции, поэтому новое значение видно только вместе с данными).
+    Счётчик разбит на TABLE_VERSION_SHARDS строк, версия таблицы — их сумма: соединение всегда
+    увеличивает свою строку, так что параллельные записи в одну таблицу не ждут друг друга
+    на блокировке одной строки до commit.
+    """
+
+    __tablename__ = "table_version"
+
+    name: str = Field(primary_key=True)
+    shard: int = Field(default=0, primary_key=True, sa_type=SmallInteger)
+    version: int = Field(default=0, sa_type=BigInteger)
@@ -1,32 +1,31 @@
 from uuid import UUID
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import delete, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.database import with_session
 from src.models.authors import Author, AuthorCreate, AuthorUpdate
-from src.models.base import PaginationRequest
-
-
-def _escape_like(s: str) -> str:
-    """Экранирует символы % и _ для использования в LIKE/ILIKE."""
-    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+from src.models.base import CursorPaginationRequest, SearchMatch
+from src.utils.pagination import PageMeta, count_total, paginate, split_page
+from src.utils.search import similarity, text_search_condition
 
 
 class AuthorsRepository:
     """Репозиторий для работы с Author через SQLModel ORM (SQLAlchemy 2.0 style)."""
 
+    def __init__(self, session: AsyncSession | None = None) -> None:
+        # Сессия запроса (см. core/container.py); без неё каждый вызов открывает свою транзакцию
+        self.session = session
+
     @with_session
     async def add(
         self,
         author_create: AuthorCreate,
         session: AsyncSession,
     ) -> Author:
-        author = Author(**(author_create.model_dump()))
-        session.add(author)
-        await session.flush()
-        await session.refresh(author)
-        return author
+        # id генерируется в модели; INSERT ... RETURNING сразу отдаёт строку без flush/refresh
+        stmt = insert(Author).values(**Author(**author_create.model_dump()).model_dump()).returning(Author)
+        return await session.scalar(stmt)
 
     @with_session
     async def get_by_id(
@@ -39,31 +38,36 @@ class AuthorsRepository:
     @with_session
     async def list(
         self,
-        pagination: PaginationRequest,
+        pagination: CursorPaginationRequest,
         session: AsyncSession,
         search_q: str | None = None,
-    ) -> tuple[list[Author], int]:
-        offset = (pagination.page - 1) * pagination.per_page
-        limit = pagination.per_page
-
-        stmt = select(Author).order_by(Author.name)
+        match: SearchMatch = SearchMatch.prefix,
+    ) -> tuple[list[Author], PageMeta]:
+        stmt = select(Author)
         count_stmt = select(func.count(Author.id))
 
+        keys, descending = (Author.name, Author.id), False
         if search_q and (q := search_q.strip()):
-            # Одно из слов в имени начинается с фрагмента (без учёта регистра)
-            esc = _escape_like(q)
-            cond = or_(
-                Author.name.ilike(esc + "%"),
-                Author.name.ilike("% " + esc + "%"),
-            )
+            # По умолчанию одно из слов в имени начинается с фрагмента (без учёта регистра)
+            cond = text_search_condition(Author.name, q, match)
             stmt = stmt.where(cond)
             count_stmt = count_stmt.where(cond)
+            if match == SearchMatch.fuzzy:
+                # Сначала наиболее похожие
+                keys, descending = (similarity(Author.name, q), Author.id), True
 
-        total_count = await session.scalar(count_stmt) or 0
-        stmt = stmt.offset(offset).limit(limit)
-        result = await session.scalars(stmt)
-        authors = list(result.all())
-        return authors, total_count
+        total_count, is_estimate = await count_total(session, count_stmt, pagination, table=Author.__tablename__)
+        stmt = paginate(stmt.add_columns(keys[0].label("sort_key")), pagination, keys, descending=descending)
+        result = await session.execute(stmt)
+        rows, page = split_page(
+            result.all(),
+            pagination,
+            key=lambda r: (r.sort_key, r.Author.id),
+            total_count=total_count,
+            is_estimate=is_estimate,
+        )
+        authors = [r.Author for r in rows]
+        return authors, page
 
     @with_session
     async def update(
@@ -72,14 +76,11 @@ class AuthorsRepository:
         data: AuthorUpdate,
         session: AsyncSession,
     ) -> Author | None:
-        author = await self.get_by_id(author_id, session=session)
-        if not author:
-            return None
-        for field, value in data.model_dump(exclude_unset=True).items():
-            setattr(author, field, value)
-        await session.flush()
-        await session.refresh(author)
-        return author
+        values = data.model_dump(exclude_unset=True)
+        if not values:
+            return await self.get_by_id(author_id, session=session)
+        stmt = update(Author).where(Author.id == author_id).values(**values).returning(Author)
+        return await session.scalar(stmt)
 
     @with_session
     async def delete(
@@ -87,9 +88,5 @@ class AuthorsRepository:
         author_id: UUID,
         session: AsyncSession,
     ) -> bool:
-        author = await self.get_by_id(author_id, session=session)
-        if not author:
-            return False
-        await session.delete(author)
-        await session.flush()
-        return True
+        result = await session.execute(delete(Author).where(Author.id == author_id))
+        return result.rowcount > 0
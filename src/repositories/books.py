@@ -1,24 +1,57 @@
-from uuid import UUID
+from typing import Any, AsyncIterator
+from uuid import UUID, uuid4
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import (
+    Float,
+    RowMapping,
+    Select,
+    Uuid,
+    all_,
+    any_,
+    bindparam,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, REGCONFIG, aggregate_order_by
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.core.database import with_session
+from src.core.database import session_scope, stream_partitions, with_session
+from src.core.reference_cache import SHELVES, TAGS, notify_reference_changed
 from src.models.authors import Author
 from src.models.books import (
+    BOOK_DETAIL_FIELDS,
+    BOOK_LIST_FIELDS,
+    FTS_CONFIG,
     Book,
     BookCreate,
     BookDetail,
-    BookInList,
+    BookBulkRequest,
+    BookBulkResult,
+    BookFacets,
+    BookFilter,
+    BookImportRow,
+    BookProjection,
+    BookSearchMode,
+    BookSort,
     BookTagLink,
     BookUpdate,
+    FacetCount,
+    TagMatch,
+    book_author_sort_name,
+    book_search_vector,
 )
+from src.models.cabinets import Cabinet
 from src.models.shelves import Shelf
 from src.models.tags import Tag
-from src.models.base import PaginationRequest
-
-
-def _escape_like(s: str) -> str:
-    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+from src.models.base import CountMode, CursorPaginationRequest, SearchMatch
+from src.utils.pagination import PageMeta, count_total, is_cursor_mode, paginate, split_page
+from src.utils.search import similarity, text_search_condition
 
 
 def _book_create_to_row(book_create: BookCreate) -> dict:
@@ -26,27 +59,273 @@ def _book_create_to_row(book_create: BookCreate) -> dict:
     return data
 
 
+async def _resolve_by_name(session: AsyncSession, model, names: set[str]) -> tuple[dict[str, UUID], bool]:
+    """
+    id записей справочника (автор, полка) по именам; недостающие создаются одним INSERT.
+    Имена у авторов и полок не уникальны: при повторах берётся запись с наименьшим id.
+    Возвращает (имя -> id, были ли созданы новые записи).
+    """
+    if not names:
+        return {}, False
+    stmt = (
+        select(model.name, model.id)
+        .where(model.name.in_(names))
+        .distinct(model.name)
+        .order_by(model.name, model.id)
+    )
+    ids = {name: id_ for name, id_ in (await session.execute(stmt)).all()}
+    missing = [{"id": uuid4(), "name": name} for name in sorted(names) if name not in ids]
+    if missing:
+        await session.execute(insert(model), missing)
+        ids.update((m["name"], m["id"]) for m in missing)
+    return ids, bool(missing)
+
+
+async def _resolve_tags(session: AsyncSession, names: set[str]) -> tuple[dict[str, UUID], bool]:
+    """id тэгов по именам; имя тэга уникально, поэтому недостающие вставляются с ON CONFLICT DO NOTHING."""
+    if not names:
+        return {}, False
+    stmt = pg_insert(Tag).on_conflict_do_nothing(index_elements=[Tag.name]).returning(Tag.id)
+    # Вставка в порядке имён, чтобы параллельные импорты не ловили взаимную блокировку
+    created = (await session.execute(stmt, [{"id": uuid4(), "name": name} for name in sorted(names)])).all()
+    rows = (await session.execute(select(Tag.name, Tag.id).where(Tag.name.in_(names)))).all()
+    return {name: id_ for name, id_ in rows}, bool(created)
+
+
+class UnknownTagsError(ValueError):
+    """Среди tag_ids книги есть несуществующие тэги."""
+
+    def __init__(self, tag_ids: list[UUID]) -> None:
+        self.tag_ids = tag_ids
+        super().__init__(f"Тэги не найдены: {', '.join(str(t) for t in tag_ids)}")
+
+
+async def _sync_book_tags(session: AsyncSession, book_id: UUID, tag_ids: list[UUID]) -> None:
+    """
+    Приводит связи книги с тэгами к tag_ids одной инструкцией: CTE удаляет лишние связи,
+    добавляет недостающие (ON CONFLICT — существующие не трогаются) и возвращает найденные тэги.
+    Если каких-то тэгов нет, бросает UnknownTagsError — транзакция откатывается вместе с изменениями.
+    """
+    tag_ids = list(dict.fromkeys(tag_ids))
+    ids_param = bindparam("tag_ids", tag_ids, type_=ARRAY(Uuid))
+    wanted = select(Tag.id).where(Tag.id == any_(ids_param)).cte("wanted")
+    removed = (
+        delete(BookTagLink)
+        .where(BookTagLink.book_id == book_id, BookTagLink.tag_id != all_(ids_param))
+        .returning(BookTagLink.tag_id)
+        .cte("removed")
+    )
+    added = (
+        pg_insert(BookTagLink)
+        .from_select(["book_id", "tag_id"], select(literal(book_id, Uuid), wanted.c.id))
+        .on_conflict_do_nothing()
+        .returning(BookTagLink.tag_id)
+        .cte("added")
+    )
+    # CTE попадают в запрос, только если на них есть ссылка, поэтому считаем и removed/added
+    stmt = select(
+        select(func.array_agg(wanted.c.id)).scalar_subquery(),
+        select(func.count()).select_from(removed).scalar_subquery(),
+        select(func.count()).select_from(added).scalar_subquery(),
+    )
+    found, _, _ = (await session.execute(stmt)).one()
+    missing = set(tag_ids) - set(found or [])
+    if missing:
+        raise UnknownTagsError([t for t in tag_ids if t in missing])
+
+
 def _book_update_to_row(data: BookUpdate) -> dict:
     return data.model_dump(exclude_unset=True, exclude={"tag_ids"})
 
 
+# Ключи сортировки: последний всегда Book.id, чтобы порядок был однозначным при равных значениях.
+_SORT_KEYS = {
+    BookSort.title: ((Book.title, Book.id), False),
+    BookSort.author: ((book_author_sort_name, Book.id), False),
+    BookSort.recent: ((Book.created_at, Book.id), True),
+}
+_FTS_REGCONFIG = cast(FTS_CONFIG, REGCONFIG)
+_HEADLINE_OPTIONS = "MaxWords=35, MinWords=15, MaxFragments=2"
+
+
+# Тэги книги агрегируются коррелированными подзапросами прямо в запросе списка/карточки.
+# Для списка PostgreSQL вычисляет их после ORDER BY/LIMIT, т.е. только для строк страницы.
+_TAG_IDS = (
+    select(func.array_agg(aggregate_order_by(Tag.id, Tag.name)))
+    .select_from(BookTagLink)
+    .join(Tag, BookTagLink.tag_id == Tag.id)
+    .where(BookTagLink.book_id == Book.id)
+    .scalar_subquery()
+    .label("tag_ids")
+)
+_TAG_NAMES = (
+    select(func.array_agg(aggregate_order_by(Tag.name, Tag.name)))
+    .select_from(BookTagLink)
+    .join(Tag, BookTagLink.tag_id == Tag.id)
+    .where(BookTagLink.book_id == Book.id)
+    .scalar_subquery()
+    .label("tag_names")
+)
+
+
+def _select_projection(
+    projection: BookProjection,
+    fields: tuple[str, ...],
+    detail: bool = False,
+) -> tuple[Select, list[str]]:
+    """
+    Строит SELECT только по запрошенным колонкам книги, присоединяя автора, полку, шкаф
+    и подзапросы тэгов лишь при необходимости. Возвращает запрос и имена полей ответа.
+    full_description и search_vector не выбираются, если их явно не запросили.
+    """
+    columns = [getattr(Book, f).label(f) for f in fields if projection.has_field(f)]
+    stmt = select(*columns)
+    keys = [c.name for c in columns]
+    if projection.has_include("author"):
+        stmt = stmt.add_columns(Book.author_id.label("author_id"), Author.name.label("author_name"))
+        stmt = stmt.outerjoin(Author, Book.author_id == Author.id)
+        keys += ["author_id", "author_name"]
+    with_cabinet = detail and projection.has_include("cabinet")
+    if projection.has_include("shelf") or with_cabinet:
+        stmt = stmt.outerjoin(Shelf, Book.shelf_id == Shelf.id)
+    if projection.has_include("shelf"):
+        stmt = stmt.add_columns(Book.shelf_id.label("shelf_id"), Shelf.name.label("shelf_name"))
+        keys += ["shelf_id", "shelf_name"]
+    if with_cabinet:
+        stmt = stmt.add_columns(Shelf.cabinet_id.label("cabinet_id"), Cabinet.name.label("cabinet_name"))
+        stmt = stmt.outerjoin(Cabinet, Shelf.cabinet_id == Cabinet.id)
+        keys += ["cabinet_id", "cabinet_name"]
+    if projection.has_include("tags"):
+        stmt = stmt.add_columns(_TAG_IDS, _TAG_NAMES)
+        keys += ["tag_ids", "tag_names"]
+    return stmt, keys
+
+
+def _row_to_dict(row, keys: list[str]) -> dict:
+    data = {k: row._mapping[k] for k in keys}
+    # array_agg по пустому набору даёт NULL
+    if "tag_ids" in data:
+        data["tag_ids"] = data["tag_ids"] or []
+        data["tag_names"] = data["tag_names"] or []
+    return data
+
+
+def _search_condition(q: str, search_mode: BookSearchMode) -> tuple:
+    """Возвращает (условие, выражение релевантности или None, tsquery или None)."""
+    if search_mode == BookSearchMode.fulltext:
+        ts_query = func.websearch_to_tsquery(_FTS_REGCONFIG, q)
+        rank = func.ts_rank(book_search_vector, ts_query, type_=Float)
+        return book_search_vector.op("@@")(ts_query), rank, ts_query
+    match = SearchMatch(search_mode.value)
+    rank = similarity(Book.title, q) if match == SearchMatch.fuzzy else None
+    return text_search_condition(Book.title, q, match), rank, None
+
+
+def _filter_conditions(filters: BookFilter | None) -> list:
+    """Условия WHERE для фильтров; тэги и шкаф — через подзапросы, чтобы не размножать строки книг."""
+    if filters is None:
+        return []
+    conds = []
+    if filters.tag_ids:
+        tag_ids = set(filters.tag_ids)
+        tagged = select(BookTagLink.book_id).where(BookTagLink.tag_id.in_(tag_ids))
+        if filters.tag_match == TagMatch.all and len(tag_ids) > 1:
+            tagged = tagged.group_by(BookTagLink.book_id).having(func.count() == len(tag_ids))
+        conds.append(Book.id.in_(tagged))
+    if filters.author_id is not None:
+        conds.append(Book.author_id == filters.author_id)
+    if filters.shelf_id is not None:
+        conds.append(Book.shelf_id == filters.shelf_id)
+    if filters.cabinet_id is not None:
+        conds.append(Book.shelf_id.in_(select(Shelf.id).where(Shelf.cabinet_id == filters.cabinet_id)))
+    return conds
+
+
 class BooksRepository:
+    def __init__(self, session: AsyncSession | None = None) -> None:
+        self.session = session
+
     @with_session
     async def add(
         self,
         book_create: BookCreate,
         session: AsyncSession,
     ) -> Book:
-        row = _book_create_to_row(book_create)
-        book = Book(**row)
-        session.add(book)
-        await session.flush()
-        for tag_id in book_create.tag_ids or []:
-            session.add(BookTagLink(book_id=book.id, tag_id=tag_id))
-        await session.flush()
-        await session.refresh(book)
+        row = Book(**_book_create_to_row(book_create)).model_dump()
+        book = await session.scalar(insert(Book).values(**row).returning(Book))
+        if book_create.tag_ids:
+            await _sync_book_tags(session, book.id, book_create.tag_ids)
         return book
 
+    async def import_batch(
+        self,
+        rows: list[BookImportRow],
+    ) -> int:
+        """
+        Импорт пачки книг в отдельной транзакции, а не в сессии запроса: загруженная пачка
+        фиксируется сразу (и её блокировки на новых тэгах и полках снимаются), ошибка откатывает
+        только эту пачку. Авторы, полки и тэги ищутся по именам и создаются пачкой, книги и связи
+        с тэгами загружаются через COPY (asyncpg).
+        """
+        async with session_scope() as session:
+            author_ids, _ = await _resolve_by_name(session, Author, {r.author for r in rows if r.author})
+            shelf_ids, shelves_created = await _resolve_by_name(session, Shelf, {r.shelf for r in rows if r.shelf})
+            tag_ids, tags_created = await _resolve_tags(session, {t for r in rows for t in r.tags})
+
+            book_records, link_records = [], []
+            for r in rows:
+                book_id = uuid4()
+                book_records.append((
+                    book_id,
+                    r.title,
+                    r.short_description,
+                    r.full_description,
+                    author_ids.get(r.author),
+                    shelf_ids.get(r.shelf),
+                ))
+                link_records.extend((book_id, tag_ids[t]) for t in r.tags)
+
+            # COPY выполняется на том же соединении и в той же транзакции, что и сессия
+            connection = await session.connection()
+            raw_connection = await connection.get_raw_connection()
+            driver = raw_connection.driver_connection
+            await driver.copy_records_to_table(
+                Book.__tablename__,
+                records=book_records,
+                columns=["id", "title", "short_description", "full_description", "author_id", "shelf_id"],
+            )
+            if link_records:
+                await driver.copy_records_to_table(
+                    BookTagLink.__tablename__,
+                    records=link_records,
+                    columns=["book_id", "tag_id"],
+                )
+            if shelves_created:
+                await notify_reference_changed(session, SHELVES)
+            if tags_created:
+                await notify_reference_changed(session, TAGS)
+        return len(book_records)
+
+    def export(self, batch_size: int) -> AsyncIterator[list[RowMapping]]:
+        """Все книги пачками через серверный курсор (колонки BOOK_EXPORT_COLUMNS)."""
+        stmt = (
+            select(
+                Book.id,
+                Book.title,
+                Book.short_description,
+                Book.full_description,
+                Author.name.label("author"),
+                Shelf.name.label("shelf"),
+                _TAG_NAMES.element.label("tags"),
+                Book.cover_path,
+                Book.created_at,
+            )
+            .outerjoin(Author, Book.author_id == Author.id)
+            .outerjoin(Shelf, Book.shelf_id == Shelf.id)
+            .order_by(Book.id)
+        )
+        return stream_partitions(stmt, batch_size)
+
     @with_session
     async def get_by_id(
         self,
@@ -60,96 +339,217 @@ class BooksRepository:
         self,
         book_id: UUID,
         session: AsyncSession,
+        projection: BookProjection | None = None,
     ) -> BookDetail | None:
-        book = await session.get(Book, book_id)
-        if not book:
+        """Книга с именами автора, полки, шкафа и тэгами — одним запросом (или только запрошенное)."""
+        stmt, keys = _select_projection(projection or BookProjection(), BOOK_DETAIL_FIELDS, detail=True)
+        r = (await session.execute(stmt.where(Book.id == book_id))).first()
+        if r is None:
             return None
-        author_name = None
-        if book.author_id:
-            author = await session.get(Author, book.author_id)
-            author_name = author.name if author else None
-        shelf_name = None
-        if book.shelf_id:
-            shelf = await session.get(Shelf, book.shelf_id)
-            shelf_name = shelf.name if shelf else None
-        rows = (await session.execute(
-            select(BookTagLink.tag_id, Tag.name).join(Tag, BookTagLink.tag_id == Tag.id).where(BookTagLink.book_id == book_id)
-        )).all()
-        tag_ids = [r[0] for r in rows]
-        tag_names = [r[1] for r in rows]
-        return BookDetail(
-            id=book.id,
-            title=book.title,
-            cover_path=book.cover_path,
-            short_description=book.short_description,
-            full_description=book.full_description,
-            author_id=book.author_id,
-            author_name=author_name,
-            shelf_id=book.shelf_id,
-            shelf_name=shelf_name,
-            tag_ids=tag_ids,
-            tag_names=tag_names,
-        )
+        return BookDetail.model_construct(**_row_to_dict(r, keys))
 
     @with_session
-    async def list(
+    async def referenced_cover_paths(
         self,
-        pagination: PaginationRequest,
+        paths: list[str],
         session: AsyncSession,
-        search_q: str | None = None,
-    ) -> tuple[list[BookInList], int]:
-        offset = (pagination.page - 1) * pagination.per_page
-        limit = pagination.per_page
+    ) -> set[str]:
+        """Какие из путей paths указаны в book.cover_path хотя бы у одной книги."""
+        paths_param = bindparam("paths", paths, type_=ARRAY(Book.cover_path.type))
+        stmt = select(Book.cover_path).where(Book.cover_path == any_(paths_param)).distinct()
+        return set(await session.scalars(stmt))
+
+    @with_session
+    async def cover_paths_after(
+        self,
+        after_id: UUID | None,
+        limit: int,
+        session: AsyncSession,
+    ) -> list[tuple[UUID, str]]:
+        """Следующая пачка (id, cover_path) книг с обложкой по возрастанию id (keyset)."""
+        stmt = select(Book.id, Book.cover_path).where(Book.cover_path.is_not(None)).order_by(Book.id).limit(limit)
+        if after_id is not None:
+            stmt = stmt.where(Book.id > after_id)
+        return [(book_id, path) for book_id, path in await session.execute(stmt)]
+
+    @with_session
+    async def enrichment_candidates(
+        self,
+        after_id: UUID | None,
+        limit: int,
+        session: AsyncSession,
+        book_ids: list[UUID] | None = None,
+    ) -> list[RowMapping]:
+        """
+        Следующая пачка книг (keyset по id), у которых не заполнено описание или обложка:
+        id, title, author, short_description, full_description, cover_path.
+        """
         stmt = (
-            select(Book, Author.name.label("author_name"), Shelf.name.label("shelf_name"))
+            select(
+                Book.id,
+                Book.title,
+                Author.name.label("author"),
+                Book.short_description,
+                Book.full_description,
+                Book.cover_path,
+            )
             .outerjoin(Author, Book.author_id == Author.id)
-            .outerjoin(Shelf, Book.shelf_id == Shelf.id)
+            .where(
+                (Book.short_description.is_(None))
+                | (Book.full_description.is_(None))
+                | (Book.cover_path.is_(None))
+            )
+            .order_by(Book.id)
+            .limit(limit)
         )
+        if after_id is not None:
+            stmt = stmt.where(Book.id > after_id)
+        if book_ids is not None:
+            stmt = stmt.where(Book.id == any_(bindparam("book_ids", book_ids, type_=ARRAY(Uuid))))
+        return list((await session.execute(stmt)).mappings())
+
+    @with_session
+    async def fill_missing_fields(
+        self,
+        rows: list[dict[str, Any]],
+        session: AsyncSession,
+    ) -> int:
+        """
+        Заполняет short_description, full_description, cover_path пачке книг одним executemany
+        (ключи строки: id и эти поля, None — не менять). Уже заполненные поля не перезаписываются,
+        даже если их изменили после выборки кандидатов.
+        """
+        if not rows:
+            return 0
+        table = Book.__table__
+        fields = ("short_description", "full_description", "cover_path")
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("book_id"))
+            .values({f: func.coalesce(table.c[f], bindparam(f"new_{f}")) for f in fields})
+        )
+        params = [{"book_id": r["id"], **{f"new_{f}": r.get(f) for f in fields}} for r in rows]
+        await session.execute(stmt, params)
+        return len(rows)
+
+    @with_session
+    async def clear_cover_paths(
+        self,
+        book_ids: list[UUID],
+        session: AsyncSession,
+    ) -> int:
+        ids_param = bindparam("book_ids", book_ids, type_=ARRAY(Uuid))
+        stmt = update(Book).where(Book.id == any_(ids_param)).values(cover_path=None)
+        return (await session.execute(stmt.execution_options(synchronize_session=False))).rowcount
+
+    @with_session
+    async def list(
+        self,
+        pagination: CursorPaginationRequest,
+        session: AsyncSession,
+        search_q: str | None = None,
+        sort: BookSort | None = None,
+        search_mode: BookSearchMode = BookSearchMode.prefix,
+        with_headline: bool = False,
+        filters: BookFilter | None = None,
+        projection: BookProjection | None = None,
+    ) -> tuple[list[dict[str, Any]], PageMeta]:
+        """
+        Возвращает (книги, метаданные страницы).
+        В режиме курсора и при count=none количество не считается.
+        По умолчанию fulltext/fuzzy-поиск сортируется по релевантности, остальное — по названию.
+        """
+        stmt, output_keys = _select_projection(projection or BookProjection(), BOOK_LIST_FIELDS)
+        count_stmt = select(func.count(Book.id))
+        rank = None
         if search_q and (q := search_q.strip()):
-            esc = _escape_like(q)
-            cond = or_(
-                Book.title.ilike(esc + "%"),
-                Book.title.ilike("% " + esc + "%"),
-            )
+            cond, rank, ts_query = _search_condition(q, search_mode)
+            if with_headline and ts_query is not None:
+                text = func.concat_ws(" ", Book.short_description, Book.full_description)
+                headline = func.ts_headline(_FTS_REGCONFIG, text, ts_query, _HEADLINE_OPTIONS)
+                stmt = stmt.add_columns(headline.label("headline"))
+                output_keys.append("headline")
             stmt = stmt.where(cond)
-            count_stmt = select(func.count(Book.id)).where(cond)
+            count_stmt = count_stmt.where(cond)
+        if conds := _filter_conditions(filters):
+            stmt = stmt.where(*conds)
+            count_stmt = count_stmt.where(*conds)
+        if sort is None or (sort == BookSort.relevance and rank is None):
+            sort = BookSort.relevance if rank is not None else BookSort.title
+        # count=window: количество оконной функцией из того же запроса. count(*) OVER () заставляет
+        # PostgreSQL построить всю выборку до LIMIT, поэтому по умолчанию (exact) — отдельный count,
+        # который обходится индексом, а страница читает только свои строки.
+        windowed_count = not is_cursor_mode(pagination) and pagination.count == CountMode.window
+        if windowed_count:
+            stmt = stmt.add_columns(func.count().over().label("total_count"))
+            total_count, is_estimate = None, False
+        else:
+            total_count, is_estimate = await count_total(session, count_stmt, pagination, table=Book.__tablename__)
+        if sort == BookSort.relevance:
+            keys, descending = (rank, Book.id), True
         else:
-            count_stmt = select(func.count(Book.id))
-        total_count = await session.scalar(count_stmt) or 0
-        stmt = stmt.order_by(Book.title).offset(offset).limit(limit)
+            keys, descending = _SORT_KEYS[sort]
+        stmt = stmt.add_columns(keys[0].label("sort_key"))
+        stmt = paginate(stmt, pagination, keys, descending=descending)
         result = await session.execute(stmt)
         rows = result.all()
-        if not rows:
-            return [], total_count
-        book_ids = [r[0].id for r in rows]
-        tag_stmt = (
-            select(BookTagLink.book_id, BookTagLink.tag_id, Tag.name)
-            .join(Tag, BookTagLink.tag_id == Tag.id)
-            .where(BookTagLink.book_id.in_(book_ids))
+        if windowed_count:
+            if rows:
+                total_count = rows[0].total_count
+            elif pagination.page > 1:
+                # Страница за пределами выборки: окно пустое, считаем отдельно.
+                total_count = await session.scalar(count_stmt) or 0
+            else:
+                total_count = 0
+        rows, page = split_page(
+            rows,
+            pagination,
+            key=lambda r: (r.sort_key, r.id),
+            total_count=total_count,
+            is_estimate=is_estimate,
         )
-        tag_result = await session.execute(tag_stmt)
-        tag_rows = tag_result.all()
-        tags_by_book: dict[UUID, list[tuple[UUID, str]]] = {bid: [] for bid in book_ids}
-        for book_id, tag_id, tag_name in tag_rows:
-            tags_by_book[book_id].append((tag_id, tag_name))
-        books_in_list = []
-        for book, author_name, shelf_name in rows:
-            tag_pairs = tags_by_book.get(book.id) or []
-            books_in_list.append(
-                BookInList(
-                    id=book.id,
-                    title=book.title,
-                    cover_path=book.cover_path,
-                    short_description=book.short_description,
-                    author_id=book.author_id,
-                    author_name=author_name,
-                    shelf_id=book.shelf_id,
-                    shelf_name=shelf_name,
-                    tag_ids=[t[0] for t in tag_pairs],
-                    tag_names=[t[1] for t in tag_pairs],
-                )
-            )
-        return books_in_list, total_count
+        # Строки из БД — доверенные данные: отдаём словари с полями BookInList без создания моделей,
+        # FastJSONResponse кодирует их orjson напрямую
+        books_in_list = [_row_to_dict(r, output_keys) for r in rows]
+        return books_in_list, page
+
+    @with_session
+    async def facets(
+        self,
+        session: AsyncSession,
+        search_q: str | None = None,
+        search_mode: BookSearchMode = BookSearchMode.prefix,
+        filters: BookFilter | None = None,
+    ) -> BookFacets:
+        """Считает книги по тэгам и полкам для текущего поиска и фильтра одним запросом (UNION ALL)."""
+        matched = select(Book.id, Book.shelf_id)
+        if search_q and (q := search_q.strip()):
+            cond, _, _ = _search_condition(q, search_mode)
+            matched = matched.where(cond)
+        if conds := _filter_conditions(filters):
+            matched = matched.where(*conds)
+        matched = matched.cte("matched")
+        tag_counts = (
+            select(literal("tag").label("kind"), Tag.id, Tag.name, func.count().label("count"))
+            .select_from(matched)
+            .join(BookTagLink, BookTagLink.book_id == matched.c.id)
+            .join(Tag, Tag.id == BookTagLink.tag_id)
+            .group_by(Tag.id, Tag.name)
+        )
+        shelf_counts = (
+            select(literal("shelf").label("kind"), Shelf.id, Shelf.name, func.count().label("count"))
+            .select_from(matched)
+            .join(Shelf, Shelf.id == matched.c.shelf_id)
+            .group_by(Shelf.id, Shelf.name)
+        )
+        result = await session.execute(union_all(tag_counts, shelf_counts))
+        facets = BookFacets()
+        for kind, facet_id, name, count in result.all():
+            target = facets.tags if kind == "tag" else facets.shelves
+            target.append(FacetCount(id=facet_id, name=name, count=count))
+        for items in (facets.tags, facets.shelves):
+            items.sort(key=lambda f: (-f.count, f.name))
+        return facets
 
     @with_session
     async def update(
@@ -157,22 +557,75 @@ class BooksRepository:
         book_id: UUID,
         data: BookUpdate,
         session: AsyncSession,
-    ) -> Book | None:
-        book = await self.get_by_id(book_id, session=session)
-        if not book:
-            return None
+    ) -> BookDetail | None:
+        """Обновляет книгу и возвращает её карточку (BookDetail), чтобы клиенту не нужен был повторный GET."""
         row = _book_update_to_row(data)
-        for field, value in row.items():
-            setattr(book, field, value)
+        if row:
+            stmt = update(Book).where(Book.id == book_id).values(**row).returning(Book.id)
+        else:
+            stmt = select(Book.id).where(Book.id == book_id).with_for_update()
+        if await session.scalar(stmt) is None:
+            return None
         if data.tag_ids is not None:
-            existing = await session.scalars(select(BookTagLink).where(BookTagLink.book_id == book_id))
-            for link in existing.all():
-                await session.delete(link)
-            for tag_id in data.tag_ids:
-                session.add(BookTagLink(book_id=book_id, tag_id=tag_id))
-        await session.flush()
-        await session.refresh(book)
-        return book
+            await _sync_book_tags(session, book_id, data.tag_ids)
+        return await self.get_detail(book_id, session=session)
+
+    @with_session
+    async def bulk_update(
+        self,
+        request: BookBulkRequest,
+        session: AsyncSession,
+    ) -> BookBulkResult:
+        """
+        Массовое изменение в одной транзакции: выбранные книги блокируются (FOR UPDATE)
+        и фиксируются списком id, дальше каждая операция — одна инструкция по этому списку,
+        так что изменение полки не влияет на выбор книг для тэгов.
+        """
+        stmt = select(Book.id).order_by(Book.id).with_for_update(of=Book)
+        if request.ids:
+            stmt = stmt.where(Book.id.in_(request.ids))
+        if request.q and (q := request.q.strip()):
+            stmt = stmt.where(_search_condition(q, request.search_mode)[0])
+        if conds := _filter_conditions(request.filter):
+            stmt = stmt.where(*conds)
+        book_ids = list(await session.scalars(stmt))
+        result = BookBulkResult(matched=len(book_ids))
+        if not book_ids:
+            return result
+
+        # Один параметр-массив вместо IN с тысячами параметров
+        ids_param = bindparam("book_ids", book_ids, type_=ARRAY(Uuid))
+        selected = Book.id == any_(ids_param)
+        # Объекты Book в сессии не загружались — синхронизировать нечего
+        no_sync = {"synchronize_session": False}
+        if request.delete:
+            # Связи book_tag удаляются каскадом (ON DELETE CASCADE)
+            stmt = delete(Book).where(selected).execution_options(**no_sync)
+            result.deleted = (await session.execute(stmt)).rowcount
+            return result
+        values = request.model_dump(include={"shelf_id", "author_id"}, exclude_unset=True)
+        if values:
+            stmt = update(Book).where(selected).values(**values).execution_options(**no_sync)
+            result.updated = (await session.execute(stmt)).rowcount
+        if request.remove_tag_ids:
+            stmt = (
+                delete(BookTagLink)
+                .where(BookTagLink.book_id == any_(ids_param), BookTagLink.tag_id.in_(request.remove_tag_ids))
+                .execution_options(**no_sync)
+            )
+            result.tags_removed = (await session.execute(stmt)).rowcount
+        if request.add_tag_ids:
+            # Несуществующие тэги отбрасываются соединением с tag, уже имеющиеся связи — ON CONFLICT
+            stmt = (
+                pg_insert(BookTagLink)
+                .from_select(
+                    ["book_id", "tag_id"],
+                    select(Book.id, Tag.id).where(selected, Tag.id.in_(request.add_tag_ids)),
+                )
+                .on_conflict_do_nothing()
+            )
+            result.tags_added = (await session.execute(stmt)).rowcount
+        return result
 
     @with_session
     async def delete(
@@ -180,9 +633,6 @@ class BooksRepository:
         book_id: UUID,
         session: AsyncSession,
     ) -> bool:
-        book = await self.get_by_id(book_id, session=session)
-        if not book:
-            return False
-        await session.delete(book)
-        await session.flush()
-        return True
+        # Связи book_tag удаляются каскадом
+        result = await session.execute(delete(Book).where(Book.id == book_id))
+        return result.rowcount > 0
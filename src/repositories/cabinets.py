@@ -1,31 +1,32 @@
 from __future__ import annotations
 
+from typing import AsyncIterator
 from uuid import UUID
 
-from sqlalchemy import func, or_, select, update
+from sqlalchemy import RowMapping, delete, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.database import with_session
-from src.models.base import PaginationRequest
+from src.core.database import stream_partitions, with_session
+from src.core.reference_cache import CABINETS, notify_reference_changed
+from src.models.base import CursorPaginationRequest, SearchMatch
 from src.models.cabinets import Cabinet, CabinetCreate, CabinetUpdate
-from src.models.shelves import Shelf
-
-
-def _escape_like(s: str) -> str:
-    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+from src.utils.pagination import PageMeta, count_total, paginate, split_page
+from src.utils.search import similarity, text_search_condition
 
 
 class CabinetsRepository:
+    def __init__(self, session: AsyncSession | None = None) -> None:
+        self.session = session
+
     @with_session
     async def add(
         self,
         cabinet_create: CabinetCreate,
         session: AsyncSession,
     ) -> Cabinet:
-        cabinet = Cabinet(**(cabinet_create.model_dump()))
-        session.add(cabinet)
-        await session.flush()
-        await session.refresh(cabinet)
+        stmt = insert(Cabinet).values(**Cabinet(**cabinet_create.model_dump()).model_dump()).returning(Cabinet)
+        cabinet = await session.scalar(stmt)
+        await notify_reference_changed(session, CABINETS)
         return cabinet
 
     @with_session
@@ -39,26 +40,37 @@ class CabinetsRepository:
     @with_session
     async def list(
         self,
-        pagination: PaginationRequest,
+        pagination: CursorPaginationRequest,
         session: AsyncSession,
         search_q: str | None = None,
-    ) -> tuple[list[Cabinet], int]:
-        offset = (pagination.page - 1) * pagination.per_page
-        limit = pagination.per_page
-        stmt = select(Cabinet).order_by(Cabinet.name)
+        match: SearchMatch = SearchMatch.prefix,
+    ) -> tuple[list[Cabinet], PageMeta]:
+        stmt = select(Cabinet)
         count_stmt = select(func.count(Cabinet.id))
+        keys, descending = (Cabinet.name, Cabinet.id), False
         if search_q and (q := search_q.strip()):
-            esc = _escape_like(q)
-            cond = or_(
-                Cabinet.name.ilike(esc + "%"),
-                Cabinet.name.ilike("% " + esc + "%"),
-            )
+            cond = text_search_condition(Cabinet.name, q, match)
             stmt = stmt.where(cond)
             count_stmt = count_stmt.where(cond)
-        total_count = await session.scalar(count_stmt) or 0
-        stmt = stmt.offset(offset).limit(limit)
-        result = await session.scalars(stmt)
-        return list(result.all()), total_count
+            if match == SearchMatch.fuzzy:
+                # Сначала наиболее похожие
+                keys, descending = (similarity(Cabinet.name, q), Cabinet.id), True
+        total_count, is_estimate = await count_total(session, count_stmt, pagination, table=Cabinet.__tablename__)
+        stmt = paginate(stmt.add_columns(keys[0].label("sort_key")), pagination, keys, descending=descending)
+        result = await session.execute(stmt)
+        rows, page = split_page(
+            result.all(),
+            pagination,
+            key=lambda r: (r.sort_key, r.Cabinet.id),
+            total_count=total_count,
+            is_estimate=is_estimate,
+        )
+        return [r.Cabinet for r in rows], page
+
+    def export(self, batch_size: int) -> AsyncIterator[list[RowMapping]]:
+        """Все записи пачками через серверный курсор."""
+        stmt = select(Cabinet.id, Cabinet.name).order_by(Cabinet.name, Cabinet.id)
+        return stream_partitions(stmt, batch_size)
 
     @with_session
     async def list_all(self, session: AsyncSession) -> list[Cabinet]:
@@ -73,13 +85,13 @@ class CabinetsRepository:
         data: CabinetUpdate,
         session: AsyncSession,
     ) -> Cabinet | None:
-        cabinet = await self.get_by_id(cabinet_id, session=session)
-        if not cabinet:
-            return None
-        for field, value in data.model_dump(exclude_unset=True).items():
-            setattr(cabinet, field, value)
-        await session.flush()
-        await session.refresh(cabinet)
+        values = data.model_dump(exclude_unset=True)
+        if not values:
+            return await self.get_by_id(cabinet_id, session=session)
+        stmt = update(Cabinet).where(Cabinet.id == cabinet_id).values(**values).returning(Cabinet)
+        cabinet = await session.scalar(stmt)
+        if cabinet is not None:
+            await notify_reference_changed(session, CABINETS)
         return cabinet
 
     @with_session
@@ -88,10 +100,8 @@ class CabinetsRepository:
         cabinet_id: UUID,
         session: AsyncSession,
     ) -> bool:
-        cabinet = await self.get_by_id(cabinet_id, session=session)
-        if not cabinet:
+        result = await session.execute(delete(Cabinet).where(Cabinet.id == cabinet_id))
+        if result.rowcount == 0:
             return False
-        await session.execute(update(Shelf).where(Shelf.cabinet_id == cabinet_id).values(cabinet_id=None))
-        await session.delete(cabinet)
-        await session.flush()
+        await notify_reference_changed(session, CABINETS)
         return True
@@ -0,0 +1,158 @@
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database import with_session
+from src.core.settings import settings
+from src.models.jobs import JOB_QUEUED_CONDITION, JOB_READY_CONDITION, Job, JobStatus
+
+
+def _now_plus(seconds: float):
+    return func.now() + timedelta(seconds=seconds)
+
+
+def _leased(job_id: int, attempt: int):
+    """Условие «аренда задачи всё ещё у этого воркера»."""
+    return (Job.id == job_id, Job.attempts == attempt, Job.status == JobStatus.running)
+
+
+async def _requeue(session: AsyncSession, job_id: int, attempt: int, **values: Any) -> bool:
+    stmt = (
+        update(Job)
+        .where(*_leased(job_id, attempt))
+        .values(status=JobStatus.queued, **values)
+        .returning(Job.id)
+    )
+    try:
+        async with session.begin_nested():
+            return await session.scalar(stmt) is not None
+    except IntegrityError:
+        # В очереди уже ждёт задача с тем же key — она и выполнит работу, эта не нужна
+        stmt = delete(Job).where(*_leased(job_id, attempt)).returning(Job.id)
+        return await session.scalar(stmt) is not None
+
+
+class JobsRepository:
+    def __init__(self, session: AsyncSession | None = None) -> None:
+        self.session = session
+
+    @with_session
+    async def enqueue(
+        self,
+        kind: str,
+        payload: dict[str, Any],
+        session: AsyncSession,
+        delay: float = 0,
+        key: str | None = None,
+        max_attempts: int | None = None,
+    ) -> int | None:
+        """
+        Ставит задачу в очередь в транзакции вызывающего (задача появится вместе с его данными).
+        С key не создаёт дубликат, если задача с таким ключом уже ждёт запуска: тогда вернёт None.
+        max_attempts по умолчанию — JOB_MAX_ATTEMPTS.
+        """
+        max_attempts = max_attempts or settings.job_max_attempts
+        values = {"kind": kind, "payload": payload, "key": key, "max_attempts": max_attempts}
+        values["run_at"] = _now_plus(delay) if delay else func.now()
+        stmt = pg_insert(Job).values(**values).returning(Job.id)
+        if key is not None:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[Job.key], index_where=JOB_QUEUED_CONDITION)
+        return await session.scalar(stmt)
+
+    @with_session
+    async def claim(
+        self,
+        kinds: list[str],
+        limit: int,
+        lease_seconds: float,
+        session: AsyncSession,
+    ) -> list[Job]:
+        """
+        Захватывает до limit готовых задач перечисленных видов: queued с наступившим run_at
+        и running с истёкшей арендой. Строки, захваченные другими воркерами, пропускаются (SKIP LOCKED).
+        """
+        ready = (
+            select(Job.id)
+            .where(
+                JOB_READY_CONDITION,
+                Job.run_at <= func.now(),
+                Job.kind.in_(kinds),
+            )
+            .order_by(Job.run_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .cte("ready")
+        )
+        stmt = (
+            update(Job)
+            .where(Job.id == ready.c.id)
+            .values(status=JobStatus.running, attempts=Job.attempts + 1, run_at=_now_plus(lease_seconds))
+            .returning(Job)
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.scalars(stmt)
+        return list(result.all())
+
+    @with_session
+    async def extend(
+        self,
+        job_id: int,
+        attempt: int,
+        lease_seconds: float,
+        session: AsyncSession,
+    ) -> bool:
+        """Продлевает аренду; False — аренда уже потеряна (истекла и задачу взял другой воркер)."""
+        stmt = update(Job).where(*_leased(job_id, attempt)).values(run_at=_now_plus(lease_seconds)).returning(Job.id)
+        return await session.scalar(stmt) is not None
+
+    @with_session
+    async def complete(
+        self,
+        job_id: int,
+        attempt: int,
+        session: AsyncSession,
+    ) -> bool:
+        stmt = delete(Job).where(*_leased(job_id, attempt)).returning(Job.id)
+        return await session.scalar(stmt) is not None
+
+    @with_session
+    async def retry(
+        self,
+        job_id: int,
+        attempt: int,
+        delay: float,
+        error: str,
+        session: AsyncSession,
+    ) -> bool:
+        return await _requeue(session, job_id, attempt, run_at=_now_plus(delay), last_error=error)
+
+    @with_session
+    async def release(
+        self,
+        job_id: int,
+        attempt: int,
+        session: AsyncSession,
+    ) -> bool:
+        """Возвращает задачу в очередь без учёта попытки (воркер останавливается)."""
+        return await _requeue(session, job_id, attempt, run_at=func.now(), attempts=Job.attempts - 1)
+
+    @with_session
+    async def fail(
+        self,
+        job_id: int,
+        attempt: int,
+        error: str,
+        session: AsyncSession,
+    ) -> bool:
+        """Попытки исчерпаны: задача остаётся в таблице со статусом failed для разбора."""
+        stmt = (
+            update(Job)
+            .where(*_leased(job_id, attempt))
+            .values(status=JobStatus.failed, last_error=error)
+            .returning(Job.id)
+        )
+        return await session.scalar(stmt) is not None
@@ -1,27 +1,32 @@
 from __future__ import annotations
 
+from typing import AsyncIterator
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import RowMapping, delete, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.database import with_session
+from src.core.database import stream_partitions, with_session
+from src.core.reference_cache import SHELVES, notify_reference_changed
 from src.models.base import PaginationRequest
 from src.models.cabinets import Cabinet
 from src.models.shelves import Shelf, ShelfCreate, ShelfUpdate, ShelfWithCabinet
+from src.utils.pagination import PageMeta, count_total, paginate, split_page
 
 
 class ShelvesRepository:
+    def __init__(self, session: AsyncSession | None = None) -> None:
+        self.session = session
+
     @with_session
     async def add(
         self,
         shelf_create: ShelfCreate,
         session: AsyncSession,
     ) -> Shelf:
-        shelf = Shelf(**(shelf_create.model_dump()))
-        session.add(shelf)
-        await session.flush()
-        await session.refresh(shelf)
+        stmt = insert(Shelf).values(**Shelf(**shelf_create.model_dump()).model_dump()).returning(Shelf)
+        shelf = await session.scalar(stmt)
+        await notify_reference_changed(session, SHELVES)
         return shelf
 
     @with_session
@@ -37,28 +42,40 @@ class ShelvesRepository:
         self,
         pagination: PaginationRequest,
         session: AsyncSession,
-    ) -> tuple[list[ShelfWithCabinet], int]:
-        offset = (pagination.page - 1) * pagination.per_page
-        limit = pagination.per_page
-        total_count = await session.scalar(select(func.count(Shelf.id))) or 0
+    ) -> tuple[list[ShelfWithCabinet], PageMeta]:
+        count_stmt = select(func.count(Shelf.id))
+        total_count, is_estimate = await count_total(session, count_stmt, pagination, table=Shelf.__tablename__)
         stmt = (
             select(Shelf, Cabinet.name.label("cabinet_name"))
             .outerjoin(Cabinet, Shelf.cabinet_id == Cabinet.id)
-            .order_by(Shelf.cabinet_id, Shelf.name)
-            .offset(offset)
-            .limit(limit)
         )
+        stmt = paginate(stmt, pagination, (Shelf.cabinet_id, Shelf.name, Shelf.id))
         result = await session.execute(stmt)
-        rows = result.all()
+        rows, page = split_page(
+            result.all(),
+            pagination,
+            key=lambda r: (r.Shelf.cabinet_id, r.Shelf.name, r.Shelf.id),
+            total_count=total_count,
+            is_estimate=is_estimate,
+        )
         return [
-            ShelfWithCabinet(
+            ShelfWithCabinet.model_construct(
                 id=s.id,
                 name=s.name,
                 cabinet_id=s.cabinet_id,
                 cabinet_name=cabinet_name,
             )
             for s, cabinet_name in rows
-        ], total_count
+        ], page
+
+    def export(self, batch_size: int) -> AsyncIterator[list[RowMapping]]:
+        """Все полки с названием шкафа пачками через серверный курсор."""
+        stmt = (
+            select(Shelf.id, Shelf.name, Shelf.cabinet_id, Cabinet.name.label("cabinet_name"))
+            .outerjoin(Cabinet, Shelf.cabinet_id == Cabinet.id)
+            .order_by(Shelf.cabinet_id, Shelf.name, Shelf.id)
+        )
+        return stream_partitions(stmt, batch_size)
 
     @with_session
     async def list_all(self, session: AsyncSession) -> list[ShelfWithCabinet]:
@@ -70,7 +87,7 @@ class ShelvesRepository:
         result = await session.execute(stmt)
         rows = result.all()
         return [
-            ShelfWithCabinet(
+            ShelfWithCabinet.model_construct(
                 id=s.id,
                 name=s.name,
                 cabinet_id=s.cabinet_id,
@@ -86,13 +103,13 @@ class ShelvesRepository:
         data: ShelfUpdate,
         session: AsyncSession,
     ) -> Shelf | None:
-        shelf = await self.get_by_id(shelf_id, session=session)
-        if not shelf:
-            return None
-        for field, value in data.model_dump(exclude_unset=True).items():
-            setattr(shelf, field, value)
-        await session.flush()
-        await session.refresh(shelf)
+        values = data.model_dump(exclude_unset=True)
+        if not values:
+            return await self.get_by_id(shelf_id, session=session)
+        stmt = update(Shelf).where(Shelf.id == shelf_id).values(**values).returning(Shelf)
+        shelf = await session.scalar(stmt)
+        if shelf is not None:
+            await notify_reference_changed(session, SHELVES)
         return shelf
 
     @with_session
@@ -101,9 +118,8 @@ class ShelvesRepository:
         shelf_id: UUID,
         session: AsyncSession,
     ) -> bool:
-        shelf = await self.get_by_id(shelf_id, session=session)
-        if not shelf:
+        result = await session.execute(delete(Shelf).where(Shelf.id == shelf_id))
+        if result.rowcount == 0:
             return False
-        await session.delete(shelf)
-        await session.flush()
+        await notify_reference_changed(session, SHELVES)
         return True
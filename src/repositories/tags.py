@@ -1,29 +1,31 @@
 from __future__ import annotations
+from typing import AsyncIterator
 from uuid import UUID
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import RowMapping, delete, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.database import with_session
-from src.models.base import PaginationRequest
+from src.core.database import stream_partitions, with_session
+from src.core.reference_cache import TAGS, notify_reference_changed
+from src.models.base import CursorPaginationRequest, SearchMatch
 from src.models.tags import Tag, TagCreate, TagUpdate
-
-
-def _escape_like(s: str) -> str:
-    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+from src.utils.pagination import PageMeta, count_total, paginate, split_page
+from src.utils.search import similarity, text_search_condition
 
 
 class TagsRepository:
+    def __init__(self, session: AsyncSession | None = None) -> None:
+        self.session = session
+
     @with_session
     async def add(
         self,
         tag_create: TagCreate,
         session: AsyncSession,
     ) -> Tag:
-        tag = Tag(**(tag_create.model_dump()))
-        session.add(tag)
-        await session.flush()
-        await session.refresh(tag)
+        stmt = insert(Tag).values(**Tag(**tag_create.model_dump()).model_dump()).returning(Tag)
+        tag = await session.scalar(stmt)
+        await notify_reference_changed(session, TAGS)
         return tag
 
     @with_session
@@ -49,26 +51,37 @@ class TagsRepository:
     @with_session
     async def list(
         self,
-        pagination: PaginationRequest,
+        pagination: CursorPaginationRequest,
         session: AsyncSession,
         search_q: str | None = None,
-    ) -> tuple[list[Tag], int]:
-        offset = (pagination.page - 1) * pagination.per_page
-        limit = pagination.per_page
-        stmt = select(Tag).order_by(Tag.name)
+        match: SearchMatch = SearchMatch.prefix,
+    ) -> tuple[list[Tag], PageMeta]:
+        stmt = select(Tag)
         count_stmt = select(func.count(Tag.id))
+        keys, descending = (Tag.name, Tag.id), False
         if search_q and (q := search_q.strip()):
-            esc = _escape_like(q)
-            cond = or_(
-                Tag.name.ilike(esc + "%"),
-                Tag.name.ilike("% " + esc + "%"),
-            )
+            cond = text_search_condition(Tag.name, q, match)
             stmt = stmt.where(cond)
             count_stmt = count_stmt.where(cond)
-        total_count = await session.scalar(count_stmt) or 0
-        stmt = stmt.offset(offset).limit(limit)
-        result = await session.scalars(stmt)
-        return list(result.all()), total_count
+            if match == SearchMatch.fuzzy:
+                # Сначала наиболее похожие
+                keys, descending = (similarity(Tag.name, q), Tag.id), True
+        total_count, is_estimate = await count_total(session, count_stmt, pagination, table=Tag.__tablename__)
+        stmt = paginate(stmt.add_columns(keys[0].label("sort_key")), pagination, keys, descending=descending)
+        result = await session.execute(stmt)
+        rows, page = split_page(
+            result.all(),
+            pagination,
+            key=lambda r: (r.sort_key, r.Tag.id),
+            total_count=total_count,
+            is_estimate=is_estimate,
+        )
+        return [r.Tag for r in rows], page
+
+    def export(self, batch_size: int) -> AsyncIterator[list[RowMapping]]:
+        """Все записи пачками через серверный курсор."""
+        stmt = select(Tag.id, Tag.name).order_by(Tag.name, Tag.id)
+        return stream_partitions(stmt, batch_size)
 
     @with_session
     async def list_all(self, session: AsyncSession) -> list[Tag]:
@@ -83,13 +96,13 @@ class TagsRepository:
         data: TagUpdate,
         session: AsyncSession,
     ) -> Tag | None:
-        tag = await self.get_by_id(tag_id, session=session)
-        if not tag:
-            return None
-        for field, value in data.model_dump(exclude_unset=True).items():
-            setattr(tag, field, value)
-        await session.flush()
-        await session.refresh(tag)
+        values = data.model_dump(exclude_unset=True)
+        if not values:
+            return await self.get_by_id(tag_id, session=session)
+        stmt = update(Tag).where(Tag.id == tag_id).values(**values).returning(Tag)
+        tag = await session.scalar(stmt)
+        if tag is not None:
+            await notify_reference_changed(session, TAGS)
         return tag
 
     @with_session
@@ -98,9 +111,8 @@ class TagsRepository:
         tag_id: UUID,
         session: AsyncSession,
     ) -> bool:
-        tag = await self.get_by_id(tag_id, session=session)
-        if not tag:
+        result = await session.execute(delete(Tag).where(Tag.id == tag_id))
+        if result.rowcount == 0:
             return False
-        await session.delete(tag)
-        await session.flush()
+        await notify_reference_changed(session, TAGS)
         return True
@@ -1,7 +1,7 @@
 from uuid import UUID
 
 from src.models.authors import Author, AuthorCreate, AuthorUpdate, ListAuthorsResponse
-from src.models.base import PaginationRequest
+from src.models.base import CursorPaginationRequest, SearchMatch
 from src.repositories.authors import AuthorsRepository
 from src.utils.pagination import build_pagination
 
@@ -18,15 +18,13 @@ class AuthorsService:
 
     async def list_authors(
         self,
-        pagination: PaginationRequest,
+        pagination: CursorPaginationRequest,
         search_q: str | None = None,
+        match: SearchMatch = SearchMatch.prefix,
     ) -> ListAuthorsResponse:
-        authors, total_count = await self.repository.list(pagination, search_q=search_q)
-        pagination_response = build_pagination(
-            total_count=total_count,
-            pagination_request=pagination,
-        )
-        return ListAuthorsResponse(authors=authors, pagination=pagination_response)
+        authors, page = await self.repository.list(pagination, search_q=search_q, match=match)
+        pagination_response = build_pagination(page=page, pagination_request=pagination)
+        return ListAuthorsResponse.model_construct(authors=authors, pagination=pagination_response)
 
     async def update_author(
         self,
@@ -1,38 +1,147 @@
+import logging
+from typing import Any, AsyncIterator
 from uuid import UUID
 
-from src.models.base import PaginationRequest
-from src.models.books import Book, BookCreate, BookDetail, BookUpdate, ListBooksResponse
+from pydantic import ValidationError
+from sqlalchemy import RowMapping
+
+from src.models.base import CursorPaginationRequest
+from src.models.books import (
+    Book,
+    BookBulkRequest,
+    BookBulkResult,
+    BookCreate,
+    BookDetail,
+    BookFilter,
+    BookImportError,
+    BookImportReport,
+    BookImportRow,
+    BookProjection,
+    BookSearchMode,
+    BookSort,
+    BookUpdate,
+    ListBooksResponse,
+)
 from src.repositories.books import BooksRepository
+from src.repositories.jobs import JobsRepository
+from src.services.enrichment import ENRICH_JOB
 from src.utils.pagination import build_pagination
 
+logger = logging.getLogger(__name__)
+
+# Книг в одной транзакции импорта и максимум ошибок в отчёте (остальные только считаются)
+IMPORT_BATCH_SIZE = 5000
+IMPORT_MAX_REPORTED_ERRORS = 1000
+# Ключ задачи обогащения всего каталога: повторный запрос не ставит вторую, пока первая ждёт
+ENRICH_ALL_KEY = f"{ENRICH_JOB}:all"
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc'])}: {err['msg'].removeprefix('Value error, ')}"
+        for err in e.errors()
+    )
+
 
 class BooksService:
-    def __init__(self, repo: BooksRepository) -> None:
+    def __init__(self, repo: BooksRepository, jobs: JobsRepository | None = None) -> None:
         self.repository = repo
+        self.jobs = jobs or JobsRepository()
 
     async def add_book(self, book: BookCreate) -> Book:
         return await self.repository.add(book)
 
+    async def import_books(
+        self,
+        records: AsyncIterator[tuple[int, dict[str, Any] | str]],
+    ) -> BookImportReport:
+        """
+        Импорт книг из потока записей (см. utils/book_import.py) пачками по IMPORT_BATCH_SIZE.
+        Каждая пачка — отдельная транзакция: уже загруженные пачки остаются при ошибке в следующей.
+        """
+        report = BookImportReport()
+
+        def add_error(line: int, error: str) -> None:
+            report.failed += 1
+            if len(report.errors) < IMPORT_MAX_REPORTED_ERRORS:
+                report.errors.append(BookImportError(line=line, error=error))
+            else:
+                report.errors_truncated = True
+
+        async def flush(batch: list[tuple[int, BookImportRow]]) -> None:
+            try:
+                report.imported += await self.repository.import_batch([row for _, row in batch])
+            except Exception as e:
+                logger.exception("book import batch failed")
+                for line, _ in batch:
+                    add_error(line, f"Пачка не загружена: {e}")
+
+        batch: list[tuple[int, BookImportRow]] = []
+        async for line, record in records:
+            if isinstance(record, str):
+                add_error(line, record)
+                continue
+            try:
+                batch.append((line, BookImportRow.model_validate(record)))
+            except ValidationError as e:
+                add_error(line, _validation_message(e))
+                continue
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+        return report
+
+    def export_books(self, batch_size: int) -> AsyncIterator[list[RowMapping]]:
+        return self.repository.export(batch_size)
+
     async def get_book(self, book_id: UUID) -> Book | None:
         return await self.repository.get_by_id(book_id)
 
-    async def get_book_detail(self, book_id: UUID) -> BookDetail | None:
-        return await self.repository.get_detail(book_id)
+    async def get_book_detail(self, book_id: UUID, projection: BookProjection | None = None) -> BookDetail | None:
+        return await self.repository.get_detail(book_id, projection=projection)
 
-    async def list_books(self, pagination: PaginationRequest, search_q: str | None = None) -> ListBooksResponse:
-        books, total_count = await self.repository.list(pagination, search_q=search_q)
-        pagination_response = build_pagination(
-            total_count=total_count,
-            pagination_request=pagination,
+    async def list_books(
+        self,
+        pagination: CursorPaginationRequest,
+        search_q: str | None = None,
+        sort: BookSort | None = None,
+        search_mode: BookSearchMode = BookSearchMode.prefix,
+        with_headline: bool = False,
+        filters: BookFilter | None = None,
+        with_facets: bool = False,
+        projection: BookProjection | None = None,
+    ) -> ListBooksResponse:
+        books, page = await self.repository.list(
+            pagination,
+            search_q=search_q,
+            sort=sort,
+            search_mode=search_mode,
+            with_headline=with_headline,
+            filters=filters,
+            projection=projection,
         )
-        return ListBooksResponse(books=books, pagination=pagination_response)
+        pagination_response = build_pagination(page=page, pagination_request=pagination)
+        facets = None
+        if with_facets:
+            facets = await self.repository.facets(search_q=search_q, search_mode=search_mode, filters=filters)
+        return ListBooksResponse.model_construct(books=books, pagination=pagination_response, facets=facets)
 
     async def update_book(
         self,
         book_id: UUID,
         data: BookUpdate,
-    ) -> Book | None:
+    ) -> BookDetail | None:
         return await self.repository.update(book_id, data)
 
+    async def bulk_update_books(self, request: BookBulkRequest) -> BookBulkResult:
+        return await self.repository.bulk_update(request)
+
     async def delete_book(self, book_id: UUID) -> bool:
         return await self.repository.delete(book_id)
+
+    async def enqueue_enrichment(self, book_ids: list[UUID]) -> int | None:
+        """Ставит в очередь заполнение описаний и обложек из Open Library (пустой список — все книги)."""
+        payload = {"book_ids": [str(book_id) for book_id in book_ids]}
+        return await self.jobs.enqueue(ENRICH_JOB, payload, key=None if book_ids else ENRICH_ALL_KEY)
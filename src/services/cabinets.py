@@ -1,6 +1,11 @@
+from typing import AsyncIterator
 from uuid import UUID
 
-from src.models.base import PaginationRequest
+from sqlalchemy import RowMapping
+
+from src.core.database import on_primary
+from src.core.reference_cache import CABINETS, reference_cache
+from src.models.base import CursorPaginationRequest, SearchMatch
 from src.models.cabinets import Cabinet, CabinetCreate, CabinetUpdate, ListCabinetsResponse
 from src.repositories.cabinets import CabinetsRepository
 from src.utils.pagination import build_pagination
@@ -18,18 +23,19 @@ class CabinetsService:
 
     async def list_cabinets(
         self,
-        pagination: PaginationRequest,
+        pagination: CursorPaginationRequest,
         search_q: str | None = None,
+        match: SearchMatch = SearchMatch.prefix,
     ) -> ListCabinetsResponse:
-        cabinets, total_count = await self.repository.list(pagination, search_q=search_q)
-        pagination_response = build_pagination(
-            total_count=total_count,
-            pagination_request=pagination,
-        )
-        return ListCabinetsResponse(cabinets=cabinets, pagination=pagination_response)
+        cabinets, page = await self.repository.list(pagination, search_q=search_q, match=match)
+        pagination_response = build_pagination(page=page, pagination_request=pagination)
+        return ListCabinetsResponse.model_construct(cabinets=cabinets, pagination=pagination_response)
+
+    def export_cabinets(self, batch_size: int) -> AsyncIterator[list[RowMapping]]:
+        return self.repository.export(batch_size)
 
     async def list_all_cabinets(self) -> list[Cabinet]:
-        return await self.repository.list_all()
+        return list(await reference_cache.get_or_load(CABINETS, on_primary(self.repository.list_all)))
 
     async def update_cabinet(
         self,
@@ -0,0 +1,206 @@
+"""
+Заполнение пустых описаний и обложек книг по данным Open Library (utils/openlibrary.py).
+
+Для каждой книги без short_description, full_description или cover_path: поиск произведения
+по названию и автору, описание — из карточки произведения, обложка — по cover_i. Книги
+обрабатываются пачками по ENRICH_BATCH_SIZE, запросы внутри пачки идут параллельно (в пределах
+пула соединений и ограничения частоты клиента), найденное записывается одним UPDATE на пачку.
+Заполняются только пустые поля: то, что задано вручную, не перезаписывается.
+
+Запуск: задача очереди ENRICH_JOB (POST /books/enrich) или вручную
+    python -m src.services.enrichment [--limit N] [--book-id ID ...] [--no-covers] [--dry-run]
+"""
+import argparse
+import asyncio
+import logging
+import re
+from dataclasses import asdict, dataclass
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import RowMapping
+
+from src.core.cover_storage import cover_storage
+from src.core.covers import CoverError, store_cover
+from src.core.jobs import job_handler
+from src.repositories.books import BooksRepository
+from src.utils.openlibrary import OpenLibraryClient
+
+logger = logging.getLogger(__name__)
+
+ENRICH_JOB = "books.enrich"
+ENRICH_BATCH_SIZE = 50
+SHORT_DESCRIPTION_MAX_LENGTH = 300
+
+# Описания Open Library часто заканчиваются списком источников или содержанием после линии «----------»
+_DESCRIPTION_TAIL = re.compile(r"\n-{3,}.*|\n\[\d+\]:.*", re.DOTALL)
+_NOT_WORD = re.compile(r"[\W_]+")
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s")
+
+
+@dataclass
+class EnrichmentReport:
+    scanned: int = 0
+    matched: int = 0
+    updated: int = 0
+    descriptions: int = 0
+    covers: int = 0
+    failed: int = 0
+
+
+def normalize_title(title: str) -> str:
+    return " ".join(_NOT_WORD.sub(" ", title.casefold().replace("ё", "е")).split())
+
+
+def pick_match(docs: list[dict[str, Any]], title: str) -> dict[str, Any] | None:
+    """Первый документ поиска с тем же названием (без учёта регистра и пунктуации); иначе None."""
+    wanted = normalize_title(title)
+    return next((doc for doc in docs if normalize_title(doc.get("title") or "") == wanted), None)
+
+
+def work_description(work: dict[str, Any] | None) -> str | None:
+    """Поле description произведения: строка или {"type": "/type/text", "value": ...}."""
+    if not work:
+        return None
+    value = work.get("description")
+    if isinstance(value, dict):
+        value = value.get("value")
+    if not isinstance(value, str):
+        return None
+    return _DESCRIPTION_TAIL.sub("", value).strip() or None
+
+
+def short_description(doc: dict[str, Any], description: str | None) -> str | None:
+    """Первое предложение: first_sentence из поиска или начало описания, не длиннее SHORT_DESCRIPTION_MAX_LENGTH."""
+    first = doc.get("first_sentence")
+    if isinstance(first, list):
+        first = first[0] if first else None
+    if not first and description:
+        first = _SENTENCE_END.split(description, maxsplit=1)[0]
+    if not isinstance(first, str) or not first.strip():
+        return None
+    first = first.strip()
+    if len(first) > SHORT_DESCRIPTION_MAX_LENGTH:
+        first = first[: SHORT_DESCRIPTION_MAX_LENGTH - 1].rstrip() + "…"
+    return first
+
+
+class BookEnricher:
+    def __init__(
+        self,
+        client: OpenLibraryClient,
+        repo: BooksRepository | None = None,
+        covers: bool = True,
+        dry_run: bool = False,
+    ) -> None:
+        self.client = client
+        self.repository = repo or BooksRepository()
+        self.covers = covers
+        self.dry_run = dry_run
+
+    async def run(self, book_ids: list[UUID] | None = None, limit: int | None = None) -> EnrichmentReport:
+        """Проход по книгам с пустыми полями (только book_ids, если заданы; не больше limit книг)."""
+        report = EnrichmentReport()
+        semaphore = asyncio.Semaphore(self.client.concurrency)
+        after_id = None
+        while limit is None or report.scanned < limit:
+            batch_size = ENRICH_BATCH_SIZE if limit is None else min(ENRICH_BATCH_SIZE, limit - report.scanned)
+            books = await self.repository.enrichment_candidates(after_id, batch_size, book_ids=book_ids)
+            if not books:
+                break
+            after_id = books[-1]["id"]
+            report.scanned += len(books)
+            results = await asyncio.gather(*(self._enrich_guarded(book, report, semaphore) for book in books))
+            updates = [update for update in results if update]
+            if updates and not self.dry_run:
+                await self.repository.fill_missing_fields(updates)
+            report.updated += len(updates)
+        return report
+
+    async def _enrich_guarded(
+        self,
+        book: RowMapping,
+        report: EnrichmentReport,
+        semaphore: asyncio.Semaphore,
+    ) -> dict[str, Any] | None:
+        async with semaphore:
+            try:
+                return await self._enrich(book, report)
+            except Exception:
+                # Одна книга не должна останавливать проход; повторный запуск возьмёт её снова
+                logger.warning("enrichment failed for book %s", book["id"], exc_info=True)
+                report.failed += 1
+                return None
+
+    async def _enrich(self, book: RowMapping, report: EnrichmentReport) -> dict[str, Any] | None:
+        doc = pick_match(await self.client.search(book["title"], book["author"]), book["title"])
+        if doc is None:
+            return None
+        report.matched += 1
+        update: dict[str, Any] = {"id": book["id"]}
+
+        need_short = book["short_description"] is None
+        need_full = book["full_description"] is None
+        description = None
+        if doc.get("key") and (need_full or (need_short and not doc.get("first_sentence"))):
+            description = work_description(await self.client.work(doc["key"]))
+        if need_full and description:
+            update["full_description"] = description
+        if need_short and (short := short_description(doc, description)):
+            update["short_description"] = short
+        if len(update) > 1:
+            report.descriptions += 1
+
+        if book["cover_path"] is None and self.covers and doc.get("cover_i"):
+            cover_path = await self._store_cover(doc["cover_i"], book["id"])
+            if cover_path is not None:
+                update["cover_path"] = cover_path
+                report.covers += 1
+        return update if len(update) > 1 else None
+
+    async def _store_cover(self, cover_id: int, book_id: UUID) -> str | None:
+        if self.dry_run:
+            return f"openlibrary:{cover_id}"
+        async with self.client.cover(cover_id) as cover:
+            if cover is None:
+                return None
+            chunks, size = cover
+            try:
+                return await store_cover(chunks, size)
+            except CoverError as e:
+                logger.info("cover %s for book %s skipped: %s", cover_id, book_id, e)
+                return None
+
+
+@job_handler(ENRICH_JOB)
+async def enrich_books_job(payload: dict[str, Any]) -> None:
+    """payload: {"book_ids": [...]} — только эти книги; пусто — все книги с незаполненными полями."""
+    book_ids = [UUID(book_id) for book_id in payload.get("book_ids") or []] or None
+    async with OpenLibraryClient() as client:
+        report = await BookEnricher(client).run(book_ids)
+    logger.info("book enrichment: %s", asdict(report))
+
+
+async def _run_once(book_ids: list[UUID] | None, limit: int | None, covers: bool, dry_run: bool) -> EnrichmentReport:
+    await cover_storage.start()
+    try:
+        async with OpenLibraryClient() as client:
+            return await BookEnricher(client, covers=covers, dry_run=dry_run).run(book_ids, limit)
+    finally:
+        await cover_storage.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=None, help="не больше N книг")
+    parser.add_argument("--book-id", type=UUID, action="append", dest="book_ids", help="только эта книга (повторяемый)")
+    parser.add_argument("--no-covers", action="store_true", help="не загружать обложки")
+    parser.add_argument("--dry-run", action="store_true", help="только посчитать, ничего не записывать")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    report = asyncio.run(_run_once(args.book_ids, args.limit, not args.no_covers, args.dry_run))
+    print(asdict(report))
+
+
+if __name__ == "__main__":
+    main()
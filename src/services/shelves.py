@@ -1,5 +1,10 @@
+from typing import AsyncIterator
 from uuid import UUID
 
+from sqlalchemy import RowMapping
+
+from src.core.database import on_primary
+from src.core.reference_cache import SHELVES, reference_cache
 from src.models.base import PaginationRequest
 from src.models.shelves import ListShelvesResponse, Shelf, ShelfCreate, ShelfUpdate, ShelfWithCabinet
 from src.repositories.shelves import ShelvesRepository
@@ -20,15 +25,15 @@ class ShelvesService:
         self,
         pagination: PaginationRequest,
     ) -> ListShelvesResponse:
-        shelves, total_count = await self.repository.list(pagination)
-        pagination_response = build_pagination(
-            total_count=total_count,
-            pagination_request=pagination,
-        )
-        return ListShelvesResponse(shelves=shelves, pagination=pagination_response)
+        shelves, page = await self.repository.list(pagination)
+        pagination_response = build_pagination(page=page, pagination_request=pagination)
+        return ListShelvesResponse.model_construct(shelves=shelves, pagination=pagination_response)
+
+    def export_shelves(self, batch_size: int) -> AsyncIterator[list[RowMapping]]:
+        return self.repository.export(batch_size)
 
     async def list_all_shelves(self) -> list[ShelfWithCabinet]:
-        return await self.repository.list_all()
+        return list(await reference_cache.get_or_load(SHELVES, on_primary(self.repository.list_all)))
 
     async def update_shelf(
         self,
@@ -1,6 +1,11 @@
+from typing import AsyncIterator
 from uuid import UUID
 
-from src.models.base import PaginationRequest
+from sqlalchemy import RowMapping
+
+from src.core.database import on_primary
+from src.core.reference_cache import TAGS, reference_cache
+from src.models.base import CursorPaginationRequest, SearchMatch
 from src.models.tags import ListTagsResponse, Tag, TagCreate, TagUpdate
 from src.repositories.tags import TagsRepository
 from src.utils.pagination import build_pagination
@@ -18,18 +23,19 @@ class TagsService:
 
     async def list_tags(
         self,
-        pagination: PaginationRequest,
+        pagination: CursorPaginationRequest,
         search_q: str | None = None,
+        match: SearchMatch = SearchMatch.prefix,
     ) -> ListTagsResponse:
-        tags, total_count = await self.repository.list(pagination, search_q=search_q)
-        pagination_response = build_pagination(
-            total_count=total_count,
-            pagination_request=pagination,
-        )
-        return ListTagsResponse(tags=tags, pagination=pagination_response)
+        tags, page = await self.repository.list(pagination, search_q=search_q, match=match)
+        pagination_response = build_pagination(page=page, pagination_request=pagination)
+        return ListTagsResponse.model_construct(tags=tags, pagination=pagination_response)
+
+    def export_tags(self, batch_size: int) -> AsyncIterator[list[RowMapping]]:
+        return self.repository.export(batch_size)
 
     async def list_all_tags(self) -> list[Tag]:
-        return await self.repository.list_all()
+        return list(await reference_cache.get_or_load(TAGS, on_primary(self.repository.list_all)))
 
     async def update_tag(
         self,
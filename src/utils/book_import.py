@@ -0,0 +1,186 @@
+"""
+Потоковый разбор тела запроса импорта книг (NDJSON или CSV) на записи.
+Тело читается по кускам, в памяти держится только незавершённая строка (не длиннее
+max_line_length символов); чтение останавливается, если тело больше max_bytes.
+"""
+import codecs
+import csv
+import json
+from enum import Enum
+from typing import Any, AsyncIterator
+
+from src.core.settings import settings
+
+# Разделитель имён тэгов в колонке tags CSV-файла
+CSV_TAGS_SEPARATOR = "|"
+
+
+class ImportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+def import_format_from_content_type(content_type: str | None) -> ImportFormat | None:
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if media_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines"):
+        return ImportFormat.ndjson
+    if media_type in ("text/csv", "application/csv"):
+        return ImportFormat.csv
+    return None
+
+
+class ImportBodyTooLarge(Exception):
+    def __init__(self, line: int, max_bytes: int) -> None:
+        super().__init__(f"Тело запроса больше {max_bytes} байт: остаток не загружен")
+        self.line = line
+
+
+def _line_too_long(max_line_length: int) -> str:
+    return f"Строка длиннее {max_line_length} символов"
+
+
+async def _iter_lines(
+    chunks: AsyncIterator[bytes],
+    max_bytes: int,
+    max_line_length: int,
+) -> AsyncIterator[tuple[int, str | None]]:
+    """
+    (номер строки с 1, строка без перевода строки); UTF-8, BOM в начале пропускается.
+    Вместо строки длиннее max_line_length — None. Перевод строки ищется только в новом куске,
+    незавершённая строка копится частями, так что разбор линеен по размеру тела.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    parts: list[str] = []
+    pending_length = 0
+    too_long = False
+    line_no = 0
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_bytes:
+            raise ImportBodyTooLarge(line_no + 1, max_bytes)
+        text = decoder.decode(chunk)
+        start = 0
+        while (end := text.find("\n", start)) >= 0:
+            line_no += 1
+            if too_long or pending_length + end - start > max_line_length:
+                yield line_no, None
+            else:
+                parts.append(text[start:end])
+                yield line_no, "".join(parts).removesuffix("\r")
+            parts, pending_length, too_long = [], 0, False
+            start = end + 1
+        if not too_long and start < len(text):
+            pending_length += len(text) - start
+            if pending_length > max_line_length:
+                # Остаток строки до перевода строки пропускается, не накапливаясь в памяти
+                parts, too_long = [], True
+            else:
+                parts.append(text[start:])
+    tail = decoder.decode(b"", final=True)
+    if too_long or pending_length + len(tail) > max_line_length:
+        yield line_no + 1, None
+    elif parts or tail:
+        parts.append(tail)
+        yield line_no + 1, "".join(parts).removesuffix("\r")
+
+
+async def _iter_ndjson(
+    chunks: AsyncIterator[bytes],
+    max_bytes: int,
+    max_line_length: int,
+) -> AsyncIterator[tuple[int, dict[str, Any] | str]]:
+    async for line_no, line in _iter_lines(chunks, max_bytes, max_line_length):
+        if line is None:
+            yield line_no, _line_too_long(max_line_length)
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, f"Некорректный JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, "Ожидается JSON-объект"
+            continue
+        yield line_no, record
+
+
+async def _iter_csv(
+    chunks: AsyncIterator[bytes],
+    max_bytes: int,
+    max_line_length: int,
+) -> AsyncIterator[tuple[int, dict[str, Any] | str]]:
+    """
+    CSV с заголовком (title, short_description, full_description, author, shelf, tags).
+    Поле в кавычках может занимать несколько строк: запись считается законченной,
+    когда число кавычек в ней чётное (экранированная кавычка удваивается).
+    Запись длиннее max_line_length символов (с учётом всех её строк) — ошибка.
+    """
+    header: list[str] | None = None
+    record_lines: list[str] = []
+    record_start = 0
+    record_length = 0
+    quotes = 0
+    async for line_no, line in _iter_lines(chunks, max_bytes, max_line_length):
+        if not record_lines:
+            record_start = line_no
+        if line is not None:
+            record_length += len(line) + 1
+        if line is None or record_length > max_line_length:
+            yield record_start, _line_too_long(max_line_length)
+            record_lines, record_length, quotes = [], 0, 0
+            continue
+        record_lines.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        text = "\n".join(record_lines)
+        record_lines, record_length, quotes = [], 0, 0
+        if not text.strip():
+            continue
+        try:
+            values = next(csv.reader([text]))
+        except csv.Error as e:
+            yield record_start, f"Некорректная строка CSV: {e}"
+            continue
+        if header is None:
+            header = [h.strip().lower() for h in values]
+            if "title" not in header:
+                yield record_start, "В заголовке CSV нет колонки title"
+                return
+            continue
+        if len(values) > len(header):
+            yield record_start, f"Ожидается не больше {len(header)} колонок, получено {len(values)}"
+            continue
+        record: dict[str, Any] = dict(zip(header, values))
+        if "tags" in record:
+            record["tags"] = record["tags"].split(CSV_TAGS_SEPARATOR) if record["tags"] else []
+        yield record_start, record
+    if record_lines:
+        yield record_start, "Незакрытая кавычка в CSV"
+
+
+async def _stop_at_limit(
+    records: AsyncIterator[tuple[int, dict[str, Any] | str]],
+) -> AsyncIterator[tuple[int, dict[str, Any] | str]]:
+    try:
+        async for record in records:
+            yield record
+    except ImportBodyTooLarge as e:
+        yield e.line, str(e)
+
+
+def iter_import_records(
+    chunks: AsyncIterator[bytes],
+    import_format: ImportFormat,
+    max_bytes: int = settings.import_max_bytes,
+    max_line_length: int = settings.import_max_line_length,
+) -> AsyncIterator[tuple[int, dict[str, Any] | str]]:
+    """
+    Записи импорта: (номер строки, словарь полей) или (номер строки, текст ошибки разбора).
+    Если тело больше max_bytes, последней идёт ошибка о превышении, дальше тело не читается.
+    """
+    parse = _iter_csv if import_format == ImportFormat.csv else _iter_ndjson
+    return _stop_at_limit(parse(chunks, max_bytes, max_line_length))
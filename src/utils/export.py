@@ -0,0 +1,89 @@
+"""
+Потоковая выгрузка таблиц: пачки строк кодируются в NDJSON или CSV (опционально gzip)
+и отдаются через StreamingResponse по мере чтения из серверного курсора.
+"""
+import csv
+import io
+import zlib
+from enum import Enum
+from typing import Any, AsyncIterator, Mapping, Sequence
+
+import orjson
+from fastapi.responses import StreamingResponse
+
+from src.utils.book_import import CSV_TAGS_SEPARATOR
+
+EXPORT_BATCH_SIZE = 1000
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+_MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv; charset=utf-8",
+}
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return CSV_TAGS_SEPARATOR.join(str(v) for v in value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+async def _encode(
+    batches: AsyncIterator[Sequence[Mapping[str, Any]]],
+    export_format: ExportFormat,
+    columns: Sequence[str],
+) -> AsyncIterator[bytes]:
+    """Одна пачка строк — один кусок ответа."""
+    if export_format == ExportFormat.csv:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        yield buffer.getvalue().encode()
+        async for batch in batches:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([_csv_value(row[c]) for c in columns] for row in batch)
+            yield buffer.getvalue().encode()
+        return
+    async for batch in batches:
+        yield b"".join(
+            orjson.dumps({c: row[c] for c in columns}, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_UTC_Z)
+            for row in batch
+        )
+
+
+async def _gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)  # формат gzip
+    async for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+    yield compressor.flush()
+
+
+def export_response(
+    batches: AsyncIterator[Sequence[Mapping[str, Any]]],
+    export_format: ExportFormat,
+    columns: Sequence[str],
+    filename: str,
+    compress: bool = False,
+) -> StreamingResponse:
+    """Ответ-вложение filename.<формат>[.gz] с колонками columns из пачек batches."""
+    body = _encode(batches, export_format, columns)
+    filename = f"{filename}.{export_format.value}"
+    media_type = _MEDIA_TYPES[export_format]
+    if compress:
+        body = _gzip(body)
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
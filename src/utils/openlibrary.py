@@ -0,0 +1,222 @@
+"""
+Асинхронный клиент Open Library API (описание — other/openLibrary.json, other/resources.md).
+
+Один aiohttp.ClientSession с пулом соединений (не больше concurrency одновременно),
+общий для всех запросов ограничитель частоты (token bucket) и кэш JSON-ответов на диске:
+повторный проход по тем же книгам не обращается к API. Ответы 429 и 5xx, таймауты и обрывы
+соединения повторяются с растущей задержкой (или по Retry-After).
+Базовые адреса задаются в настройках, так что клиент проверяется на локальном mock-сервере.
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator
+from urllib.parse import urlencode
+
+import aiohttp
+import orjson
+from anyio import to_thread
+
+from src.core.settings import settings
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 3
+RETRY_BASE_SECONDS = 1.0
+COVER_CHUNK_SIZE = 256 * 1024
+SEARCH_FIELDS = "key,title,author_name,first_sentence,cover_i,first_publish_year"
+
+
+class OpenLibraryError(Exception):
+    """Запрос не удался и после повторов (или ответ не JSON)."""
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты: rate запросов в секунду в среднем, до burst подряд.
+    Ожидающие получают токены по очереди (asyncio.Lock справедлив).
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class ResponseCache:
+    """JSON-ответы в файлах <dir>/ab/<sha256(url)>.json; запись устаревает через ttl секунд (по mtime)."""
+
+    def __init__(self, directory: Path, ttl: float) -> None:
+        self.directory = directory
+        self.ttl = ttl
+
+    def _path(self, url: str) -> Path:
+        name = hashlib.sha256(url.encode()).hexdigest()
+        return self.directory / name[:2] / f"{name}.json"
+
+    async def get(self, url: str) -> tuple[bool, Any]:
+        """(найдено, значение); значение None — закэшированный 404."""
+        if self.ttl <= 0:
+            return False, None
+        return await to_thread.run_sync(self._read, self._path(url))
+
+    async def set(self, url: str, value: Any) -> None:
+        if self.ttl > 0:
+            await to_thread.run_sync(self._write, self._path(url), orjson.dumps(value))
+
+    def _read(self, path: Path) -> tuple[bool, Any]:
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                return False, None
+            return True, orjson.loads(path.read_bytes())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return False, None
+
+    def _write(self, path: Path, data: bytes) -> None:
+        # Через временный файл: параллельный читатель не увидит запись наполовину
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_name, path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
+
+class OpenLibraryClient:
+    """
+    Использование:
+        async with OpenLibraryClient() as client:
+            docs = await client.search("Мастер и Маргарита", "Булгаков")
+    """
+
+    def __init__(
+        self,
+        base_url: str = settings.openlibrary_base_url,
+        covers_url: str = settings.openlibrary_covers_url,
+        concurrency: int = settings.openlibrary_concurrency,
+        rate_limiter: TokenBucket | None = None,
+        cache: ResponseCache | None = None,
+        timeout: float = settings.openlibrary_timeout_seconds,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.covers_url = covers_url.rstrip("/")
+        self.concurrency = concurrency
+        self.rate_limiter = rate_limiter or TokenBucket(
+            settings.openlibrary_rate_per_second, settings.openlibrary_burst
+        )
+        self.cache = cache or ResponseCache(
+            settings.openlibrary_cache_dir, settings.openlibrary_cache_ttl_seconds
+        )
+        self.timeout = timeout
+        self._session: aiohttp.ClientSession | None = None
+
+    async def __aenter__(self) -> "OpenLibraryClient":
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"User-Agent": settings.openlibrary_user_agent, "Accept": "application/json"},
+        )
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self._session.close()
+        self._session = None
+
+    async def search(self, title: str, author: str | None = None, limit: int = 5) -> list[dict[str, Any]]:
+        """Произведения по названию (и автору): документы поиска с полями SEARCH_FIELDS."""
+        params = {"title": title, "fields": SEARCH_FIELDS, "limit": str(limit)}
+        if author:
+            params["author"] = author
+        data = await self.get_json("/search.json", params)
+        return (data or {}).get("docs", [])
+
+    async def work(self, work_key: str) -> dict[str, Any] | None:
+        """Произведение по ключу вида /works/OL45883W (поле key документа поиска)."""
+        return await self.get_json(f"{work_key}.json")
+
+    async def get_json(self, path: str, params: dict[str, str] | None = None) -> Any:
+        """GET JSON через кэш; None — 404."""
+        url = self.base_url + path
+        if params:
+            url += "?" + urlencode(params)
+        found, value = await self.cache.get(url)
+        if found:
+            return value
+        async with self._request(url) as response:
+            if response.status == 404:
+                value = None
+            else:
+                try:
+                    value = await response.json(content_type=None)
+                except ValueError as e:
+                    raise OpenLibraryError(f"{url}: ответ не JSON") from e
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    raise OpenLibraryError(f"{url}: {type(e).__name__}: {e}") from e
+        await self.cache.set(url, value)
+        return value
+
+    @asynccontextmanager
+    async def cover(
+        self,
+        cover_id: int,
+        size: str = "L",
+    ) -> AsyncIterator[tuple[AsyncIterator[bytes], int | None] | None]:
+        """
+        Изображение обложки по cover_i потоком: (куски, Content-Length) или None, если обложки нет.
+        Обложки не кэшируются — сохранённая обложка сама попадает в хранилище.
+        """
+        url = f"{self.covers_url}/b/id/{cover_id}-{size}.jpg?default=false"
+        async with self._request(url) as response:
+            if response.status == 404:
+                yield None
+            else:
+                yield response.content.iter_chunked(COVER_CHUNK_SIZE), response.content_length
+
+    @asynccontextmanager
+    async def _request(self, url: str) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Ответ 2xx или 404; остальное — повторы, затем OpenLibraryError."""
+        if self._session is None:
+            raise RuntimeError("OpenLibraryClient используется вне async with")
+        for attempt in range(MAX_RETRIES + 1):
+            await self.rate_limiter.acquire()
+            delay = RETRY_BASE_SECONDS * 2 ** attempt
+            try:
+                response = await self._session.get(url)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = f"{url}: {type(e).__name__}: {e}"
+            else:
+                if response.ok or response.status == 404:
+                    try:
+                        yield response
+                    finally:
+                        response.release()
+                    return
+                error = f"{url}: HTTP {response.status}"
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    delay = float(retry_after)
+                response.release()
+                if response.status not in RETRY_STATUSES:
+                    raise OpenLibraryError(error)
+            if attempt < MAX_RETRIES:
+                await asyncio.sleep(delay)
+        raise OpenLibraryError(error)
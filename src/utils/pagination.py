@@ -1,16 +1,191 @@
+import base64
+import binascii
+import json
+from datetime import datetime
 from math import ceil
+from typing import Any, Callable, NamedTuple, Sequence
+from uuid import UUID
 
-from src.models.base import Pagination, PaginationRequest
+from sqlalchemy import DateTime, Float, Select, Uuid, bindparam, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from src.models.base import CountMode, CursorPaginationRequest, Pagination, PaginationRequest
+from src.utils.ttl_cache import TTLCache
+
+# Кэш точных count для режима count=cached: ключ — текст запроса и его параметры.
+COUNT_CACHE_TTL_SECONDS = 30.0
+_count_cache = TTLCache(maxsize=1024, ttl=COUNT_CACHE_TTL_SECONDS)
+
+_RELTUPLES_STMT = text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)").bindparams(
+    bindparam("table")
+)
+
+
+class InvalidCursorError(ValueError):
+    """Курсор не удалось разобрать или он не подходит к выбранной сортировке."""
+
+
+class PageMeta(NamedTuple):
+    """Что репозиторий знает о странице помимо самих строк."""
+
+    total_count: int | None = None
+    is_estimate: bool = False
+    has_next: bool | None = None
+    next_cursor: str | None = None
 
 
 def build_pagination(
-    total_count: int,
+    page: PageMeta,
     pagination_request: PaginationRequest,
 ) -> Pagination:
     """
-    Создаёт объект Pagination по общему количеству записей и параметрам запроса.
+    Создаёт объект Pagination по метаданным страницы и параметрам запроса.
+    Без общего количества (режим курсора или count=none) возвращает только has_next/next_cursor.
+    Все поля задаются явно, чтобы ответы без незаданных полей (exclude_unset) их не теряли.
     """
+    if page.total_count is None:
+        return Pagination.model_construct(
+            current_page=pagination_request.page,
+            total_pages=pagination_request.page + (1 if page.has_next else 0),
+            next_cursor=page.next_cursor,
+            total_count=None,
+            has_next=page.has_next,
+            is_estimate=False,
+        )
     per_page = max(pagination_request.per_page, 1)
-    total_pages = ceil(total_count / per_page) if total_count > 0 else 1
+    total_pages = ceil(page.total_count / per_page) if page.total_count > 0 else 1
     current_page = min(max(pagination_request.page, 1), total_pages)
-    return Pagination(current_page=current_page, total_pages=total_pages)
+    return Pagination.model_construct(
+        current_page=current_page,
+        total_pages=total_pages,
+        next_cursor=None,
+        total_count=page.total_count,
+        has_next=current_page < total_pages,
+        is_estimate=page.is_estimate,
+    )
+
+
+def is_cursor_mode(pagination: PaginationRequest) -> bool:
+    return isinstance(pagination, CursorPaginationRequest) and pagination.cursor is not None
+
+
+async def count_total(
+    session: AsyncSession,
+    count_stmt: Select,
+    pagination: PaginationRequest,
+    table: str,
+) -> tuple[int | None, bool]:
+    """
+    Считает общее количество строк согласно pagination.count. Возвращает (количество, это_оценка).
+    Оценка берётся из pg_class.reltuples таблицы table и применяется только к count без WHERE,
+    для отфильтрованных списков режим estimate работает как exact. Режим window (count в запросе
+    страницы) поддерживает только список книг, здесь он тоже работает как exact.
+    """
+    if is_cursor_mode(pagination) or pagination.count == CountMode.none:
+        return None, False
+    if pagination.count == CountMode.estimate and count_stmt.whereclause is None:
+        estimate = await session.scalar(_RELTUPLES_STMT, {"table": table})
+        # reltuples = -1, пока таблица ни разу не анализировалась
+        if estimate is not None and estimate >= 0:
+            return int(estimate), True
+    if pagination.count == CountMode.cached:
+        compiled = count_stmt.compile()
+        key = (str(compiled), repr(sorted(compiled.params.items())))
+        total_count = _count_cache.get(key)
+        if total_count is None:
+            total_count = await session.scalar(count_stmt) or 0
+            _count_cache.set(key, total_count)
+        return total_count, False
+    return await session.scalar(count_stmt) or 0, False
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Кодирует значения ключа сортировки последней строки в непрозрачный курсор."""
+    raw = [
+        str(v) if isinstance(v, UUID) else v.isoformat() if isinstance(v, datetime) else v
+        for v in values
+    ]
+    data = json.dumps(raw, ensure_ascii=False, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    """Обратная операция к encode_cursor (значения остаются строками/числами JSON)."""
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(data)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursorError("Некорректный курсор") from e
+    if not isinstance(values, list) or not values:
+        raise InvalidCursorError("Некорректный курсор")
+    return values
+
+
+def _coerce(column: ColumnElement, value: Any) -> Any:
+    """Приводит значение из курсора к типу колонки ключа (UUID, datetime, число или строка)."""
+    if value is None:
+        return None
+    if isinstance(column.type, Uuid):
+        return UUID(str(value))
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, Float):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise TypeError(f"{value!r} is not a number")
+        return float(value)
+    if not isinstance(value, str):
+        raise TypeError(f"{value!r} is not str")
+    return value
+
+
+def paginate(
+    stmt: Select,
+    pagination: PaginationRequest,
+    keys: Sequence[ColumnElement],
+    descending: bool = False,
+) -> Select:
+    """
+    Сортирует stmt по ключам keys (последний ключ должен быть уникальным, обычно id)
+    и ограничивает выборку страницей.
+    В режиме курсора вместо OFFSET добавляет условие (keys) > (значения из курсора).
+    В режиме курсора и при count=none запрашивает per_page + 1 строк, чтобы понять, есть ли следующая страница.
+    """
+    stmt = stmt.order_by(*(k.desc() if descending else k for k in keys))
+    if not is_cursor_mode(pagination):
+        offset = (pagination.page - 1) * pagination.per_page
+        extra = 1 if pagination.count == CountMode.none else 0
+        return stmt.offset(offset).limit(pagination.per_page + extra)
+    if pagination.cursor:
+        values = decode_cursor(pagination.cursor)
+        if len(values) != len(keys):
+            raise InvalidCursorError("Курсор не соответствует сортировке")
+        try:
+            values = [_coerce(k, v) for k, v in zip(keys, values)]
+        except (TypeError, ValueError) as e:
+            raise InvalidCursorError("Курсор не соответствует сортировке") from e
+        key_tuple, value_tuple = tuple_(*keys), tuple_(*values)
+        stmt = stmt.where(key_tuple < value_tuple if descending else key_tuple > value_tuple)
+    return stmt.limit(pagination.per_page + 1)
+
+
+def split_page(
+    items: list,
+    pagination: PaginationRequest,
+    key: Callable[[Any], Sequence[Any]],
+    total_count: int | None = None,
+    is_estimate: bool = False,
+) -> tuple[list, PageMeta]:
+    """
+    Отрезает лишнюю строку, запрошенную paginate(), и собирает PageMeta:
+    has_next и курсор следующей страницы (по ключу последнего элемента, в режиме курсора).
+    """
+    if total_count is not None:
+        has_next = pagination.page * pagination.per_page < total_count
+        return items, PageMeta(total_count=total_count, is_estimate=is_estimate, has_next=has_next)
+    has_next = len(items) > pagination.per_page
+    items = items[: pagination.per_page]
+    next_cursor = None
+    if has_next and is_cursor_mode(pagination):
+        next_cursor = encode_cursor(key(items[-1]))
+    return items, PageMeta(has_next=has_next, next_cursor=next_cursor)
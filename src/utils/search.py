@@ -0,0 +1,36 @@
+from sqlalchemy import Float, func, literal, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+from src.models.base import SearchMatch
+
+
+def escape_like(s: str) -> str:
+    """Экранирует символы % и _ для использования в LIKE/ILIKE."""
+    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def text_search_condition(
+    column: ColumnElement,
+    q: str,
+    match: SearchMatch = SearchMatch.prefix,
+) -> ColumnElement:
+    """
+    Условие поиска по текстовой колонке без учёта регистра.
+    Все режимы используют GIN-индекс gin_trgm_ops (pg_trgm) на колонке:
+    prefix — одно из слов начинается с q, contains — q входит в строку,
+    fuzzy — похожее слово (word_similarity выше pg_trgm.word_similarity_threshold).
+    """
+    if match == SearchMatch.fuzzy:
+        return literal(q).op("<%")(column)
+    esc = escape_like(q)
+    if match == SearchMatch.contains:
+        return column.ilike("%" + esc + "%")
+    return or_(
+        column.ilike(esc + "%"),
+        column.ilike("% " + esc + "%"),
+    )
+
+
+def similarity(column: ColumnElement, q: str) -> ColumnElement:
+    """Степень похожести q на слово в колонке (0..1) для сортировки в режиме fuzzy; pg_trgm не учитывает регистр."""
+    return func.word_similarity(q, column, type_=Float)
@@ -0,0 +1,48 @@
+"""
+Отдельный воркер очереди фоновых задач (core/jobs.py):
+    python -m src.worker [--concurrency N]
+
+Отдельный модуль, а не `python -m src.core.jobs`: запущенный так файл загружается как __main__,
+и обработчики регистрировались бы в другой копии модуля src.core.jobs.
+"""
+import argparse
+import asyncio
+import logging
+import signal
+
+from src.core.cover_storage import cover_storage
+from src.core.jobs import JobWorker, load_job_handlers
+from src.core.settings import settings
+
+
+async def run_worker(concurrency: int) -> None:
+    load_job_handlers()
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+    await cover_storage.start()
+    worker = JobWorker(concurrency=concurrency)
+    worker.start()
+    try:
+        await stopping.wait()
+    finally:
+        await worker.stop()
+        await cover_storage.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=max(settings.job_workers, 1),
+        help="сколько задач выполнять одновременно",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_worker(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
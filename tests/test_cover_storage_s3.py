@@ -0,0 +1,158 @@
+"""
+Драйвер S3 для обложек (core/cover_storage_s3.py) на moto в режиме сервера: multipart upload,
+копирование под ключ по хэшу, abort, а также редирект GET /covers/{path}.
+С MinIO вместо moto: COVER_S3_TEST_ENDPOINT_URL=http://localhost:9000 (ключи — COVER_S3_TEST_ACCESS_KEY_ID
+и COVER_S3_TEST_SECRET_ACCESS_KEY, бакет должен позволять создание).
+
+    python -m pytest tests
+"""
+import asyncio
+import os
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+pytest.importorskip("aiobotocore")
+
+from src.api import covers as covers_api  # noqa: E402
+from src.core.cover_storage import UPLOAD_TEMP_PREFIX  # noqa: E402
+from src.core.cover_storage_s3 import S3CoverStorage  # noqa: E402
+from src.core.settings import settings  # noqa: E402
+
+PART_SIZE = 5 * 1024 * 1024
+DIGEST = "ab" * 32
+HASHED_KEY = f"ab/ab/{DIGEST}.jpg"
+
+
+@pytest.fixture(scope="module")
+def s3_endpoint():
+    endpoint = os.environ.get("COVER_S3_TEST_ENDPOINT_URL")
+    if endpoint:
+        yield endpoint
+        return
+    moto_server = pytest.importorskip("moto.server")
+    server = moto_server.ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    yield f"http://{host}:{port}"
+    server.stop()
+
+
+@pytest.fixture
+def storage(s3_endpoint, monkeypatch):
+    monkeypatch.setattr(settings, "cover_s3_endpoint_url", s3_endpoint)
+    monkeypatch.setattr(settings, "cover_s3_bucket", f"covers-{uuid4().hex[:12]}")
+    monkeypatch.setattr(settings, "cover_s3_force_path_style", True)
+    monkeypatch.setattr(settings, "cover_s3_part_size", PART_SIZE)
+    monkeypatch.setattr(settings, "cover_s3_public_url", None)
+    monkeypatch.setattr(settings, "cover_s3_access_key_id", os.environ.get("COVER_S3_TEST_ACCESS_KEY_ID", "test"))
+    monkeypatch.setattr(
+        settings, "cover_s3_secret_access_key", os.environ.get("COVER_S3_TEST_SECRET_ACCESS_KEY", "test")
+    )
+    return S3CoverStorage()
+
+
+def run(storage: S3CoverStorage, scenario):
+    async def main():
+        await storage.start()
+        try:
+            await storage.client.create_bucket(Bucket=storage.bucket)
+            return await scenario(storage)
+        finally:
+            await storage.close()
+
+    return asyncio.run(main())
+
+
+async def _upload(storage: S3CoverStorage, key: str, chunks: list[bytes]) -> None:
+    upload = await storage.open_upload()
+    for chunk in chunks:
+        await upload.write(chunk)
+    await upload.commit(key, "image/jpeg")
+
+
+async def _state(storage: S3CoverStorage) -> tuple[dict[str, int], list[str]]:
+    """(ключ -> размер всех объектов бакета, ключи незавершённых multipart upload)."""
+    objects = await storage.client.list_objects_v2(Bucket=storage.bucket)
+    uploads = await storage.client.list_multipart_uploads(Bucket=storage.bucket)
+    return (
+        {obj["Key"]: obj["Size"] for obj in objects.get("Contents", [])},
+        [upload["Key"] for upload in uploads.get("Uploads", [])],
+    )
+
+
+def test_small_file_is_put_under_final_key(storage):
+    async def scenario(storage):
+        await _upload(storage, HASHED_KEY, [b"x" * 1000, b"y" * 24])
+        head = await storage.head(HASHED_KEY)
+        return await _state(storage), head
+
+    (objects, uploads), head = run(storage, scenario)
+    assert objects == {HASHED_KEY: 1024}
+    assert uploads == []
+    assert head["ContentType"] == "image/jpeg"
+    assert "immutable" in head["CacheControl"]
+
+
+def test_multipart_upload_is_copied_and_temp_object_removed(storage):
+    async def scenario(storage):
+        await _upload(storage, HASHED_KEY, [b"a" * PART_SIZE, b"b" * 1024 * 1024, b"c" * 10])
+        body = await storage.client.get_object(Bucket=storage.bucket, Key=HASHED_KEY)
+        async with body["Body"] as stream:
+            data = await stream.read()
+        return await _state(storage), body["ContentType"], data
+
+    (objects, uploads), content_type, data = run(storage, scenario)
+    assert objects == {HASHED_KEY: PART_SIZE + 1024 * 1024 + 10}
+    assert uploads == []
+    assert content_type == "image/jpeg"
+    assert data == b"a" * PART_SIZE + b"b" * 1024 * 1024 + b"c" * 10
+
+
+def test_abort_removes_started_multipart_upload(storage):
+    async def scenario(storage):
+        upload = await storage.open_upload()
+        await upload.write(b"a" * PART_SIZE)
+        started = await _state(storage)
+        await upload.abort()
+        return started, await _state(storage)
+
+    (_, started_uploads), (objects, uploads) = run(storage, scenario)
+    assert len(started_uploads) == 1 and started_uploads[0].startswith(UPLOAD_TEMP_PREFIX)
+    assert objects == {}
+    assert uploads == []
+
+
+def test_commit_of_existing_key_keeps_object_and_drops_upload(storage):
+    async def scenario(storage):
+        await _upload(storage, HASHED_KEY, [b"a" * 100])
+        await _upload(storage, HASHED_KEY, [b"a" * PART_SIZE, b"a"])
+        return await _state(storage)
+
+    objects, uploads = run(storage, scenario)
+    assert objects == {HASHED_KEY: 100}
+    assert uploads == []
+
+
+def _cover_request(path: str) -> Request:
+    return Request({"type": "http", "method": "GET", "path": f"/covers/{path}", "headers": []})
+
+
+def test_cover_route_redirects_hashed_and_checks_legacy_keys(storage, monkeypatch):
+    monkeypatch.setattr(covers_api, "cover_storage", storage)
+
+    async def scenario(storage):
+        await _upload(storage, "legacy.jpg", [b"x"])
+        hashed = await covers_api.get_cover(HASHED_KEY, _cover_request(HASHED_KEY))
+        legacy = await covers_api.get_cover("legacy.jpg", _cover_request("legacy.jpg"))
+        with pytest.raises(HTTPException) as missing:
+            await covers_api.get_cover("missing.jpg", _cover_request("missing.jpg"))
+        return hashed, legacy, missing.value
+
+    hashed, legacy, missing = run(storage, scenario)
+    # Файла с хэшем нет, но редирект выдаётся без запроса к S3
+    assert hashed.status_code == 302
+    assert legacy.status_code == 302 and "legacy.jpg" in legacy.headers["location"]
+    assert missing.status_code == 404
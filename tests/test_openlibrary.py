@@ -0,0 +1,239 @@
+"""
+Клиент Open Library (utils/openlibrary.py) и заполнение описаний и обложек (services/enrichment.py)
+на локальном mock-сервере aiohttp: повторы и Retry-After, кэш ответов (в том числе 404) на диске,
+ограничение частоты, выбор совпадения и правило «заполняются только пустые поля».
+
+    python -m pytest tests
+"""
+import asyncio
+import os
+import time
+from uuid import uuid4
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.services import enrichment
+from src.services.enrichment import BookEnricher, pick_match
+from src.utils import openlibrary
+from src.utils.openlibrary import OpenLibraryClient, OpenLibraryError, ResponseCache, TokenBucket
+
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 60
+
+
+class MockOpenLibrary:
+    """Ответы по пути: список (статус, тело, заголовки), последний повторяется; журнал запросов."""
+
+    def __init__(self) -> None:
+        self.routes: dict[str, list[tuple[int, object, dict[str, str]]]] = {}
+        self.requests: list[str] = []
+
+    def add(self, path: str, *responses: tuple[int, object] | tuple[int, object, dict[str, str]]) -> None:
+        self.routes[path] = [(r[0], r[1], r[2] if len(r) > 2 else {}) for r in responses]
+
+    def hits(self, path: str) -> int:
+        return sum(1 for p in self.requests if p == path)
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        self.requests.append(request.path)
+        responses = self.routes.get(request.path)
+        if not responses:
+            return web.json_response({"error": "not found"}, status=404)
+        status, body, headers = responses.pop(0) if len(responses) > 1 else responses[0]
+        if isinstance(body, bytes):
+            return web.Response(status=status, body=body, headers=headers, content_type="image/jpeg")
+        return web.json_response(body, status=status, headers=headers)
+
+
+def run(mock: MockOpenLibrary, scenario):
+    async def main():
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", mock.handle)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            return await scenario(str(server.make_url("")).rstrip("/"))
+        finally:
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def make_client(base_url: str, cache_dir, ttl: float = 3600) -> OpenLibraryClient:
+    return OpenLibraryClient(
+        base_url=base_url,
+        covers_url=base_url,
+        concurrency=4,
+        rate_limiter=TokenBucket(rate=1000, burst=1000),
+        cache=ResponseCache(cache_dir, ttl),
+        timeout=5,
+    )
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Задержки перед повторами записываются, а не выжидаются."""
+    recorded: list[float] = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay: float) -> None:
+        # sleep(0) — переключение задач внутри aiohttp, не задержка клиента
+        if delay:
+            recorded.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(openlibrary.asyncio, "sleep", fake_sleep)
+    return recorded
+
+
+def test_retries_5xx_with_backoff_and_honours_retry_after(tmp_path, sleeps):
+    mock = MockOpenLibrary()
+    mock.add("/works/OL1W.json", (503, {}), (429, {}, {"Retry-After": "7"}), (200, {"title": "ok"}))
+
+    async def scenario(base_url):
+        async with make_client(base_url, tmp_path) as client:
+            return await client.work("/works/OL1W")
+
+    assert run(mock, scenario) == {"title": "ok"}
+    assert mock.hits("/works/OL1W.json") == 3
+    assert sleeps == [openlibrary.RETRY_BASE_SECONDS, 7.0]
+
+
+def test_gives_up_after_max_retries_and_on_other_errors(tmp_path, sleeps):
+    mock = MockOpenLibrary()
+    mock.add("/works/OL1W.json", (500, {}))
+    mock.add("/works/OL2W.json", (400, {}))
+
+    async def scenario(base_url):
+        async with make_client(base_url, tmp_path) as client:
+            with pytest.raises(OpenLibraryError, match="HTTP 500"):
+                await client.work("/works/OL1W")
+            with pytest.raises(OpenLibraryError, match="HTTP 400"):
+                await client.work("/works/OL2W")
+
+    run(mock, scenario)
+    assert mock.hits("/works/OL1W.json") == openlibrary.MAX_RETRIES + 1
+    # 400 не повторяется
+    assert mock.hits("/works/OL2W.json") == 1
+    assert len(sleeps) == openlibrary.MAX_RETRIES
+
+
+def test_not_found_is_cached(tmp_path):
+    mock = MockOpenLibrary()
+
+    async def scenario(base_url):
+        async with make_client(base_url, tmp_path) as client:
+            return [await client.work("/works/OL404W") for _ in range(2)]
+
+    assert run(mock, scenario) == [None, None]
+    assert mock.hits("/works/OL404W.json") == 1
+
+
+def test_disk_cache_hit_skips_network_until_ttl(tmp_path):
+    mock = MockOpenLibrary()
+    mock.add("/search.json", (200, {"docs": [{"title": "Мастер и Маргарита"}]}))
+
+    async def scenario(base_url):
+        async with make_client(base_url, tmp_path) as client:
+            first = await client.search("Мастер и Маргарита", "Булгаков")
+        # Новый клиент (другой процесс) читает тот же кэш на диске
+        async with make_client(base_url, tmp_path) as client:
+            second = await client.search("Мастер и Маргарита", "Булгаков")
+        hits_before_expiry = mock.hits("/search.json")
+        for path in tmp_path.rglob("*.json"):
+            os.utime(path, (time.time() - 7200, time.time() - 7200))
+        async with make_client(base_url, tmp_path) as client:
+            await client.search("Мастер и Маргарита", "Булгаков")
+        return first, second, hits_before_expiry
+
+    first, second, hits_before_expiry = run(mock, scenario)
+    assert first == second == [{"title": "Мастер и Маргарита"}]
+    assert hits_before_expiry == 1
+    assert mock.hits("/search.json") == 2
+
+
+def test_token_bucket_limits_rate_after_burst():
+    async def scenario():
+        bucket = TokenBucket(rate=50, burst=3)
+        started = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(13)))
+        return time.monotonic() - started
+
+    # 3 токена сразу, остальные 10 — по одному в 1/50 с
+    elapsed = asyncio.run(scenario())
+    assert 0.18 <= elapsed < 1.0
+
+
+def test_pick_match_ignores_case_punctuation_and_yo():
+    docs = [
+        {"title": "Мастер и Маргарита: роман"},
+        {"title": "ЁЖИК В ТУМАНЕ!", "key": "/works/OL2W"},
+    ]
+    assert pick_match(docs, "Ежик в тумане") == docs[1]
+    assert pick_match(docs, "Мастер и Маргарита") is None
+    assert pick_match([], "Ежик в тумане") is None
+
+
+class FakeBooksRepository:
+    def __init__(self, books: list[dict]) -> None:
+        self.books = books
+        self.updates: list[dict] = []
+
+    async def enrichment_candidates(self, after_id, limit, book_ids=None):
+        if after_id is not None:
+            return []
+        return self.books[:limit]
+
+    async def fill_missing_fields(self, updates: list[dict]) -> None:
+        self.updates.extend(updates)
+
+
+def _book(title: str, **fields) -> dict:
+    values = {"short_description": None, "full_description": None, "cover_path": None}
+    values.update(fields)
+    return {"id": uuid4(), "title": title, "author": "Автор", **values}
+
+
+def test_enricher_fills_only_empty_fields(tmp_path, monkeypatch):
+    mock = MockOpenLibrary()
+    mock.add(
+        "/search.json",
+        (200, {"docs": [{"title": "Книга", "key": "/works/OL1W", "cover_i": 42, "first_sentence": ["Начало."]}]}),
+    )
+    mock.add("/works/OL1W.json", (200, {"description": {"type": "/type/text", "value": "Полное описание."}}))
+    mock.add("/b/id/42-L.jpg", (200, JPEG))
+    stored: list[bytes] = []
+
+    async def fake_store_cover(chunks, size_hint=None):
+        stored.append(b"".join([chunk async for chunk in chunks]))
+        return "covers/ab/cd/stored.jpg"
+
+    monkeypatch.setattr(enrichment, "store_cover", fake_store_cover)
+    empty = _book("Книга")
+    has_short_and_cover = _book("Книга", short_description="Своё", cover_path="covers/own.jpg")
+    complete = _book("Книга", short_description="Своё", full_description="Своё", cover_path="covers/own.jpg")
+    no_match = _book("Другая книга")
+    repo = FakeBooksRepository([empty, has_short_and_cover, complete, no_match])
+
+    async def scenario(base_url):
+        async with make_client(base_url, tmp_path) as client:
+            return await BookEnricher(client, repo=repo).run()
+
+    report = run(mock, scenario)
+    updates = {update["id"]: update for update in repo.updates}
+    assert updates[empty["id"]] == {
+        "id": empty["id"],
+        "short_description": "Начало.",
+        "full_description": "Полное описание.",
+        "cover_path": "covers/ab/cd/stored.jpg",
+    }
+    # Заданные вручную краткое описание и обложка не перезаписываются
+    assert updates[has_short_and_cover["id"]] == {
+        "id": has_short_and_cover["id"],
+        "full_description": "Полное описание.",
+    }
+    assert complete["id"] not in updates and no_match["id"] not in updates
+    assert stored == [JPEG]
+    assert mock.hits("/b/id/42-L.jpg") == 1
+    assert (report.scanned, report.matched, report.updated, report.covers, report.failed) == (4, 3, 2, 1, 0)